@@ -0,0 +1,155 @@
+# agents/ec2_agent/_ec2_helpers.py
+
+"""
+Shared helpers for EC2 rules.
+Security group analysis and volume batching used by several rules during a scan.
+"""
+
+from bisect import bisect_right
+from functools import lru_cache
+from collections import namedtuple
+from typing import NamedTuple, Tuple
+
+
+ALL_PORTS = (0, 65535)
+WORLD_CIDR_V4 = '0.0.0.0/0'
+WORLD_CIDR_V6 = '::/0'
+
+
+# A single permission open to the world; from_port/to_port are None for all ports
+OpenRule = namedtuple('OpenRule', 'sg_id sg_name protocol from_port to_port cidr')
+
+
+class SGAnalysis(NamedTuple):
+    """Per-security-group flags shared by the EC2 rules."""
+    open_v4: bool
+    open_v6: bool
+    http_open: bool
+    https_open: bool
+    ssh_open_world: bool
+    open_rules: Tuple[OpenRule, ...]
+
+
+def sg_key(sg):
+    """
+    Hashable rendering of a security group for analyze_sg.
+    
+    Each permission becomes (protocol, from_port, to_port, ipv4_cidrs, ipv6_cidrs),
+    so any change to the group's rules produces a different key.
+    """
+    permissions = tuple(
+        (
+            rule.get('IpProtocol', 'Unknown'),
+            rule.get('FromPort'),
+            rule.get('ToPort'),
+            tuple(ip_range.get('CidrIp') for ip_range in rule.get('IpRanges', [])),
+            tuple(ipv6_range.get('CidrIpv6') for ipv6_range in rule.get('Ipv6Ranges', []))
+        )
+        for rule in sg.get('IpPermissions', [])
+    )
+    return (sg['GroupId'], sg.get('GroupName', 'Unknown'), permissions)
+
+
+def _merge_intervals(intervals):
+    """Sort and merge (lo, hi) port ranges into a disjoint list."""
+    intervals.sort()
+    
+    # Merge overlapping ranges so a single bisect finds the covering interval
+    merged = []
+    for lo, hi in intervals:
+        if merged and lo <= merged[-1][1]:
+            if hi > merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def port_open(intervals, port):
+    """Check whether a port falls within any interval of a sorted, disjoint list."""
+    idx = bisect_right(intervals, (port, ALL_PORTS[1])) - 1
+    return idx >= 0 and intervals[idx][0] <= port <= intervals[idx][1]
+
+
+@lru_cache(maxsize=4096)
+def analyze_sg(sg_tuple):
+    """
+    Compute the flags every rule needs from a security group, once per revision.
+    
+    sg_tuple is the output of sg_key(); permissions without FromPort/ToPort
+    (e.g. protocol -1) cover all ports. open_rules lists one entry per
+    permission and CIDR open to the world, in IpPermissions order.
+    """
+    sg_id, sg_name, permissions = sg_tuple
+    
+    intervals = []
+    world_intervals = []
+    open_rules = []
+    open_v4 = open_v6 = False
+    
+    for protocol, from_port, to_port, cidrs_v4, cidrs_v6 in permissions:
+        port_range = (
+            ALL_PORTS[0] if from_port is None else from_port,
+            ALL_PORTS[1] if to_port is None else to_port
+        )
+        intervals.append(port_range)
+        
+        world_v4 = WORLD_CIDR_V4 in cidrs_v4
+        world_v6 = WORLD_CIDR_V6 in cidrs_v6
+        if world_v4:
+            world_intervals.append(port_range)
+        open_v4 = open_v4 or world_v4
+        open_v6 = open_v6 or world_v6
+        
+        for cidr in cidrs_v4 + cidrs_v6:
+            if cidr != WORLD_CIDR_V4 and cidr != WORLD_CIDR_V6:
+                continue
+            open_rules.append(OpenRule(sg_id, sg_name, protocol, from_port, to_port, cidr))
+    
+    intervals = _merge_intervals(intervals)
+    world_intervals = _merge_intervals(world_intervals)
+    
+    return SGAnalysis(
+        open_v4=open_v4,
+        open_v6=open_v6,
+        http_open=port_open(intervals, 80),
+        https_open=port_open(intervals, 443),
+        ssh_open_world=port_open(world_intervals, 22),
+        open_rules=tuple(open_rules)
+    )
+
+
+class VolumeBatcher:
+    """
+    Fetch EBS volumes for many instances with as few describe_volumes calls as possible.
+    Instance IDs are sent in chunks of FILTER_LIMIT through the attachment filter.
+    """
+    
+    FILTER_LIMIT = 200  # Max values per EC2 filter
+    PAGE_SIZE = 500  # Max results per DescribeVolumes page
+    
+    def __init__(self, client):
+        self.client = client
+    
+    def get_for_instances(self, instance_ids):
+        """Return {instance_id: [volume, ...]} for the given instances."""
+        instance_ids = list(instance_ids)
+        volumes_by_instance = {instance_id: [] for instance_id in instance_ids}
+        
+        paginator = self.client.get_paginator('describe_volumes')
+        for start in range(0, len(instance_ids), self.FILTER_LIMIT):
+            chunk = instance_ids[start:start + self.FILTER_LIMIT]
+            pages = paginator.paginate(
+                Filters=[{'Name': 'attachment.instance-id', 'Values': chunk}],
+                PaginationConfig={'PageSize': self.PAGE_SIZE}
+            )
+            # Index each page as it arrives instead of building the full result first
+            for page in pages:
+                for volume in page.get('Volumes', []):
+                    # Multi-attach volumes belong to every instance they are attached to
+                    for attachment in volume.get('Attachments', []):
+                        attached_to = volumes_by_instance.get(attachment.get('InstanceId'))
+                        if attached_to is not None:
+                            attached_to.append(volume)
+        
+        return volumes_by_instance
@@ -10,11 +10,12 @@ import json
 from typing import Dict, List, Optional, Any
 
 from agents.ec2_agent.executor import EC2Executor
+from agents.ec2_agent._ec2_helpers import VolumeBatcher
 from agents.utils.llm_security_analyzer import LLMSecurityAnalyzer
 from agents.utils.rag_security_search import RAGSecuritySearch
 from .doc_search import DocSearch
 from .llm_fallback import LLMFallback
-from .intent_detector import EC2IntentDetector
+from .intent_detector import EC2Intent, EC2IntentDetector
 
 
 class EC2Agent:
@@ -55,6 +56,13 @@ class EC2Agent:
         self.rag_search = RAGSecuritySearch()
         self.llm_analyzer = None
         
+        # Volumes prefetched per scan: {instance_id: [volume, ...]}
+        self._volumes_by_instance = None
+        
+        # Result objects from the last scan's stateless rules, keyed by (rule_id, instance_id);
+        # apply_fix passes them to fix() as result=
+        self._check_results = {}
+        
         # Initialize LLM only if API key exists
         try:
             self.llm_analyzer = LLMSecurityAnalyzer()
@@ -87,6 +95,7 @@ class EC2Agent:
             scope: "all", "running", "stopped", specific instance ID, or list of instance IDs
         """
         findings = []
+        self._check_results = {}
         
         # Determine scan scope
         instances_to_scan = self._get_scan_instances(scope)
@@ -95,6 +104,15 @@ class EC2Agent:
             print("⚠️ No instances found to scan")
             return self.executor.format_for_fixer([])
         
+        # Fetch EBS volumes for the whole fleet in batched calls
+        try:
+            self._volumes_by_instance = VolumeBatcher(self.client).get_for_instances(
+                instance['InstanceId'] for instance in instances_to_scan
+            )
+        except Exception as e:
+            print(f"⚠️ Batched volume lookup failed, falling back to per-instance calls: {e}")
+            self._volumes_by_instance = None
+        
         # Step 1: Intent-aware rules-based detection
         for instance in instances_to_scan:
             instance_id = instance['InstanceId']
@@ -126,21 +144,25 @@ class EC2Agent:
                     # Pass intent context to rule
                     if hasattr(rule, 'check_with_intent'):
                         # Intent-aware rules
-                        if rule.id in ["ec2_intent_conversion"]:
-                            rule.intent_confidence = confidence  # Store confidence for auto_safe decision
                         issue_found = rule.check_with_intent(self.client, instance_id, intent, recommendations)
                     else:
                         # Standard rules - pass instance ID and client
                         issue_found = self._call_rule_check(rule, instance_id, instance)
                         
                     if issue_found:
+                        # Stateless rules return a result object carrying the fix details;
+                        # rules that return True keep them on the rule instance
+                        details = rule if issue_found is True else issue_found
+                        if details is not rule:
+                            self._check_results[(rule.id, instance_id)] = details
+                        
                         # Adjust auto_safe based on intent
-                        auto_safe = self._should_auto_apply(rule, intent, instance_id, instance)
+                        auto_safe = self._should_auto_apply(rule, intent, instance_id, instance, confidence)
                         
                         # Get rule fix information
-                        fix_instructions = getattr(rule, 'fix_instructions', None)
-                        can_auto_fix = getattr(rule, 'can_auto_fix', False)
-                        fix_type = getattr(rule, 'fix_type', None)
+                        fix_instructions = getattr(details, 'fix_instructions', None)
+                        can_auto_fix = getattr(details, 'can_auto_fix', False)
+                        fix_type = getattr(details, 'fix_type', None)
                         
                         # DEBUG: Log for instruction details
                         print(f"DEBUG: Rule {rule.id} - fix_instructions: {fix_instructions}")
@@ -151,7 +173,7 @@ class EC2Agent:
                         finding = {
                             "service": "ec2",
                             "resource": instance_id,
-                            "issue": rule.detection,
+                            "issue": getattr(details, 'detection', rule.detection),
                             "rule_id": rule.id,
                             "auto_safe": auto_safe,
                             "source": "rule",
@@ -322,47 +344,27 @@ class EC2Agent:
         try:
             if scope == "all":
                 # Get all instances (running and stopped)
-                response = self.client.describe_instances()
-                instances = []
-                for reservation in response['Reservations']:
-                    instances.extend(reservation['Instances'])
-                return instances
+                return self._describe_instances()
             
             elif scope == "running":
                 # Get only running instances
-                response = self.client.describe_instances(
+                return self._describe_instances(
                     Filters=[{'Name': 'instance-state-name', 'Values': ['running']}]
                 )
-                instances = []
-                for reservation in response['Reservations']:
-                    instances.extend(reservation['Instances'])
-                return instances
             
             elif scope == "stopped":
                 # Get only stopped instances
-                response = self.client.describe_instances(
+                return self._describe_instances(
                     Filters=[{'Name': 'instance-state-name', 'Values': ['stopped']}]
                 )
-                instances = []
-                for reservation in response['Reservations']:
-                    instances.extend(reservation['Instances'])
-                return instances
             
             elif isinstance(scope, str) and scope.startswith("i-"):
                 # Single instance ID
-                response = self.client.describe_instances(InstanceIds=[scope])
-                instances = []
-                for reservation in response['Reservations']:
-                    instances.extend(reservation['Instances'])
-                return instances
+                return self._describe_instances(InstanceIds=[scope])
             
             elif isinstance(scope, list):
                 # Multiple instance IDs
-                response = self.client.describe_instances(InstanceIds=scope)
-                instances = []
-                for reservation in response['Reservations']:
-                    instances.extend(reservation['Instances'])
-                return instances
+                return self._describe_instances(InstanceIds=scope)
             
             else:
                 print(f"⚠️ Unknown scope: {scope}. Defaulting to running instances.")
@@ -372,13 +374,25 @@ class EC2Agent:
             print(f"❌ Error getting instances for scope '{scope}': {e}")
             return []
 
+    def _describe_instances(self, **kwargs):
+        """Collect instances from every describe_instances page."""
+        # MaxResults cannot be combined with explicit InstanceIds
+        if 'InstanceIds' not in kwargs:
+            kwargs['PaginationConfig'] = {'PageSize': 1000}
+        
+        instances = []
+        for page in self.client.get_paginator('describe_instances').paginate(**kwargs):
+            for reservation in page['Reservations']:
+                instances.extend(reservation['Instances'])
+        return instances
+
     def _call_rule_check(self, rule, instance_id, instance):
         """Call rule check method with appropriate parameters."""
         try:
             if rule.id == "ec2_open_security_group":
                 return rule.check(self.client, instance_id)
             elif rule.id == "ec2_unencrypted_ebs":
-                return rule.check(self.client, instance_id)
+                return rule.check(self.client, instance_id, volumes_by_instance=self._volumes_by_instance)
             elif rule.id == "ec2_missing_backups":
                 return rule.check(self.client, instance_id)
             elif rule.id == "ec2_unused_instance":
@@ -398,19 +412,17 @@ class EC2Agent:
             print(f"⚠️ Error calling rule check for {rule.id}: {e}")
             return False
 
-    def _should_auto_apply(self, rule, intent, instance_id, instance):
+    def _should_auto_apply(self, rule, intent, instance_id, instance, confidence=0.0):
         """
         Determine if a rule should be auto-applied based on intent context.
         
         This prevents dangerous auto-fixes like stopping production instances.
         """
-        from .intent_detector import EC2Intent
-        
         instance_state = instance.get('State', {}).get('Name', 'unknown')
         
         # Intent conversion rule - check confidence for explicit user intent
         if rule.id == "ec2_intent_conversion":
-            rule_confidence = getattr(rule, 'intent_confidence', 0.0)
+            rule_confidence = confidence
             print(f"DEBUG: Intent conversion rule confidence: {rule_confidence}")
             if rule_confidence >= 1.0:  # Explicit user intent
                 print(f"✅ Explicit user intent ({rule_confidence:.2f}) - auto-enabling intent conversion")
@@ -541,22 +553,26 @@ class EC2Agent:
         """Call rule fix method with appropriate parameters."""
         instance_id = finding['resource']
         
+        # Stateless rules need the result object their check returned
+        result = self._check_results.get((rule.id, instance_id))
+        fix_kwargs = {'result': result} if result is not None else {}
+        
         try:
             if rule.id == "ec2_open_security_group":
-                return rule.fix(self.client, instance_id)
+                return rule.fix(self.client, instance_id, **fix_kwargs)
             elif rule.id == "ec2_unencrypted_ebs":
-                return rule.fix(self.client, instance_id)
+                return rule.fix(self.client, instance_id, **fix_kwargs)
             elif rule.id == "ec2_missing_backups":
-                return rule.fix(self.client, instance_id)
+                return rule.fix(self.client, instance_id, **fix_kwargs)
             elif rule.id == "ec2_unused_instance":
-                return rule.fix(self.client, instance_id, auto_approve=True)
+                return rule.fix(self.client, instance_id, auto_approve=True, **fix_kwargs)
             elif rule.id == "ec2_missing_monitoring":
-                return rule.fix(self.client, instance_id)
+                return rule.fix(self.client, instance_id, **fix_kwargs)
             elif rule.id == "ec2_intent_conversion":
-                return rule.fix(self.client, instance_id)
+                return rule.fix(self.client, instance_id, **fix_kwargs)
             else:
                 # Try generic fix method
-                return rule.fix(self.client, instance_id)
+                return rule.fix(self.client, instance_id, **fix_kwargs)
         except Exception as e:
             return {"success": False, "message": str(e)}
 
@@ -655,9 +671,12 @@ class EC2Agent:
             config['security_groups'] = []
         
         try:
-            config['volumes'] = self.client.describe_volumes(
-                Filters=[{'Name': 'attachment.instance-id', 'Values': [instance_id]}]
-            ).get('Volumes', [])
+            if self._volumes_by_instance is not None and instance_id in self._volumes_by_instance:
+                config['volumes'] = self._volumes_by_instance[instance_id]
+            else:
+                config['volumes'] = self.client.describe_volumes(
+                    Filters=[{'Name': 'attachment.instance-id', 'Values': [instance_id]}]
+                ).get('Volumes', [])
         except Exception:
             config['volumes'] = []
         
@@ -1,9 +1,12 @@
 # agents/ec2_agent/rules/missing_backups_rule.py
 
+import logging
 import boto3
 from botocore.exceptions import ClientError
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
 
 class MissingBackupsRule:
     """
@@ -80,13 +83,13 @@ class MissingBackupsRule:
             if volumes_without_backups:
                 self.volumes_without_backups = volumes_without_backups
                 self._set_fix_instructions(volumes_without_backups, instance_id)
-                print(f"🔴 Found {len(volumes_without_backups)} volumes without recent backups for {instance_id}")
+                logger.warning("🔴 Found %d volumes without recent backups for %s", len(volumes_without_backups), instance_id)
                 return True
             
             return False
             
         except ClientError as e:
-            print(f"❌ Error checking backups for {instance_id}: {e}")
+            logger.error("❌ Error checking backups for %s: %s", instance_id, e)
             return False
     
     def _get_device_name(self, instance, volume_id):
@@ -161,12 +164,12 @@ class MissingBackupsRule:
                         'size': volume['size']
                     })
                     
-                    print(f"✅ Created snapshot {response['SnapshotId']} for volume {volume['volume_id']}")
+                    logger.info("✅ Created snapshot %s for volume %s", response['SnapshotId'], volume['volume_id'])
                     
                 except ClientError as e:
                     error_msg = f"Failed to create snapshot for volume {volume['volume_id']}: {e}"
                     errors.append(error_msg)
-                    print(f"❌ {error_msg}")
+                    logger.error("❌ %s", error_msg)
             
             return {
                 "success": len(created_snapshots) > 0,
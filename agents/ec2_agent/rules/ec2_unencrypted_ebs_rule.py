@@ -1,114 +1,153 @@
 # agents/ec2_agent/rules/unencrypted_ebs_rule.py
 
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+
 import boto3
 from botocore.exceptions import ClientError
 
+logger = logging.getLogger(__name__)
+
+
+ENCRYPTION_STEPS = (
+    "🔧 Encryption Process:",
+    "1. Create encrypted snapshot of unencrypted volume",
+    "2. Create new encrypted volume from encrypted snapshot",
+    "3. Stop the EC2 instance",
+    "4. Detach original volume and attach encrypted volume",
+    "5. Update device mapping if necessary",
+    "6. Start instance and verify functionality",
+    "💡 Alternative: Enable encryption by default for new volumes",
+    "1. Go to EC2 > Settings > EBS encryption",
+    "2. Enable 'Always encrypt new EBS volumes'",
+    "⚠️ Impact: Instance downtime required for encryption"
+)
+
+
+@dataclass(slots=True)
+class UnencryptedVolume:
+    """An unencrypted EBS volume attached to the checked instance."""
+    volume_id: str
+    size: int
+    type: str
+    device: str
+    state: str
+
+
+@dataclass(frozen=True)
+class UnencryptedEBSFinding:
+    """Result of an EBS encryption check for a single instance."""
+    instance_id: str
+    unencrypted_volumes: List[UnencryptedVolume]
+    detection: str
+    fix_instructions: List[str]
+    can_auto_fix: bool = False  # Requires downtime
+    fix_type: str = "encrypt_ebs_volumes"
+
+
+def _format_volume(vol):
+    """Instruction lines describing a single unencrypted volume."""
+    return (
+        f"• Volume ID: {vol.volume_id}",
+        f"  Device: {vol.device}, Size: {vol.size} GB, Type: {vol.type}",
+        f"  State: {vol.state}"
+    )
+
+
+def format_fix_instructions(instance_id, unencrypted_volumes):
+    """Build instructions for encrypting EBS volumes."""
+    total_size = sum(vol.size for vol in unencrypted_volumes)
+    
+    return [
+        f"🔐 Unencrypted EBS Volumes for {instance_id}",
+        f"Found {len(unencrypted_volumes)} unencrypted volumes ({total_size} GB total):",
+        *(line for vol in unencrypted_volumes for line in _format_volume(vol)),
+        *ENCRYPTION_STEPS
+    ]
+
 
 class UnencryptedEBSRule:
     """
     Rule to detect EC2 instances with unencrypted EBS volumes.
+    
+    The rule keeps no per-instance state; results are returned as
+    UnencryptedEBSFinding objects so one instance can be shared across threads.
     """
     
     id = "ec2_unencrypted_ebs"
     detection = "EC2 instance has unencrypted EBS volumes"
     auto_safe = False  # Encryption requires instance restart
     
-    def __init__(self):
-        self.fix_instructions = None
-        self.can_auto_fix = False
-        self.fix_type = None
-        self.unencrypted_volumes = None
-    
-    def check(self, client, instance_id):
-        """Check for unencrypted EBS volumes."""
+    def check(self, client, instance_id, volumes_by_instance=None) -> Optional[UnencryptedEBSFinding]:
+        """
+        Check for unencrypted EBS volumes.
+        
+        volumes_by_instance: optional {instance_id: [volume, ...]} prefetched with
+        VolumeBatcher; when omitted the instance and its volumes are described directly.
+        """
         try:
-            # Get instance details
-            response = client.describe_instances(InstanceIds=[instance_id])
-            if not response['Reservations']:
-                return False
-            
-            instance = response['Reservations'][0]['Instances'][0]
-            
-            # Get EBS volume IDs
-            volume_ids = []
-            for bdm in instance.get('BlockDeviceMappings', []):
-                if 'Ebs' in bdm:
-                    volume_ids.append(bdm['Ebs']['VolumeId'])
-            
-            if not volume_ids:
-                return False
+            if volumes_by_instance is not None:
+                volumes = volumes_by_instance.get(instance_id, [])
+                device_map = {
+                    attachment['VolumeId']: attachment.get('Device', 'Unknown')
+                    for volume in volumes
+                    for attachment in volume.get('Attachments', [])
+                    if attachment.get('InstanceId') == instance_id
+                }
+            else:
+                # Get instance details
+                response = client.describe_instances(InstanceIds=[instance_id])
+                if not response['Reservations']:
+                    return None
+                
+                instance = response['Reservations'][0]['Instances'][0]
+                
+                # Map EBS volume IDs to their device names
+                device_map = {
+                    bdm['Ebs']['VolumeId']: bdm.get('DeviceName', 'Unknown')
+                    for bdm in instance.get('BlockDeviceMappings', [])
+                    if 'Ebs' in bdm
+                }
+                
+                if not device_map:
+                    return None
+                
+                # Check encryption status of volumes
+                volumes = client.describe_volumes(VolumeIds=list(device_map))['Volumes']
             
-            # Check encryption status of volumes
-            volumes_response = client.describe_volumes(VolumeIds=volume_ids)
             unencrypted_volumes = []
             
-            for volume in volumes_response['Volumes']:
+            for volume in volumes:
                 if not volume.get('Encrypted', False):
-                    unencrypted_volumes.append({
-                        'volume_id': volume['VolumeId'],
-                        'size': volume['Size'],
-                        'type': volume['VolumeType'],
-                        'device': self._get_device_name(instance, volume['VolumeId']),
-                        'state': volume['State']
-                    })
+                    unencrypted_volumes.append(UnencryptedVolume(
+                        volume_id=volume['VolumeId'],
+                        size=volume['Size'],
+                        type=volume['VolumeType'],
+                        device=device_map.get(volume['VolumeId'], 'Unknown'),
+                        state=volume['State']
+                    ))
             
             if unencrypted_volumes:
-                self.unencrypted_volumes = unencrypted_volumes
-                self._set_fix_instructions(unencrypted_volumes, instance_id)
-                print(f"🔴 Found {len(unencrypted_volumes)} unencrypted EBS volumes for {instance_id}")
-                return True
+                logger.warning("🔴 Found %d unencrypted EBS volumes for %s", len(unencrypted_volumes), instance_id)
+                return UnencryptedEBSFinding(
+                    instance_id=instance_id,
+                    unencrypted_volumes=unencrypted_volumes,
+                    detection=self.detection,
+                    fix_instructions=format_fix_instructions(instance_id, unencrypted_volumes)
+                )
             
-            return False
+            return None
             
         except ClientError as e:
-            print(f"❌ Error checking EBS encryption for {instance_id}: {e}")
-            return False
-    
-    def _get_device_name(self, instance, volume_id):
-        """Get device name for volume."""
-        for bdm in instance.get('BlockDeviceMappings', []):
-            if bdm.get('Ebs', {}).get('VolumeId') == volume_id:
-                return bdm.get('DeviceName', 'Unknown')
-        return 'Unknown'
-    
-    def _set_fix_instructions(self, unencrypted_volumes, instance_id):
-        """Set instructions for encrypting EBS volumes."""
-        total_size = sum(vol['size'] for vol in unencrypted_volumes)
-        
-        self.fix_instructions = [
-            f"🔐 Unencrypted EBS Volumes for {instance_id}",
-            f"Found {len(unencrypted_volumes)} unencrypted volumes ({total_size} GB total):"
-        ]
-        
-        for vol in unencrypted_volumes:
-            self.fix_instructions.extend([
-                f"• Volume ID: {vol['volume_id']}",
-                f"  Device: {vol['device']}, Size: {vol['size']} GB, Type: {vol['type']}",
-                f"  State: {vol['state']}"
-            ])
-        
-        self.fix_instructions.extend([
-            "🔧 Encryption Process:",
-            "1. Create encrypted snapshot of unencrypted volume",
-            "2. Create new encrypted volume from encrypted snapshot",
-            "3. Stop the EC2 instance",
-            "4. Detach original volume and attach encrypted volume",
-            "5. Update device mapping if necessary", 
-            "6. Start instance and verify functionality",
-            "💡 Alternative: Enable encryption by default for new volumes",
-            "1. Go to EC2 > Settings > EBS encryption",
-            "2. Enable 'Always encrypt new EBS volumes'",
-            "⚠️ Impact: Instance downtime required for encryption"
-        ])
-        
-        self.can_auto_fix = False  # Requires downtime
-        self.fix_type = "encrypt_ebs_volumes"
+            logger.error("❌ Error checking EBS encryption for %s: %s", instance_id, e)
+            return None
     
-    def fix(self, client, instance_id):
+    def fix(self, client, instance_id, result=None):
         """Fix unencrypted EBS volumes - requires manual process."""
         return {
             "success": False,
             "message": "EBS encryption requires instance downtime and manual process",
-            "unencrypted_volumes": len(self.unencrypted_volumes) if self.unencrypted_volumes else 0,
+            "unencrypted_volumes": len(result.unencrypted_volumes) if result else 0,
             "recommendation": "Follow the encryption process in fix instructions"
         }
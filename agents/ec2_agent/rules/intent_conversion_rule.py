@@ -1,42 +1,64 @@
 # agents/ec2_agent/rules/intent_conversion_rule.py
 
+import logging
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
 import boto3
 from botocore.exceptions import ClientError
 
+from agents.ec2_agent._ec2_helpers import analyze_sg, sg_key
+from agents.ec2_agent.intent_detector import EC2Intent
+
+logger = logging.getLogger(__name__)
+
+
+# Instance families suited to database workloads (memory-optimized / general purpose)
+_DB_TYPE_RE = re.compile(r'^(?:r4|r5|r6|m5|m6i)')
+
+# Instance types considered too expensive for development/testing
+_EXPENSIVE_RE = re.compile(r'^(?:p3|p4|x1|r5\.(?:large|xlarge)$|m5\.(?:large|xlarge)$)')
+
+
+@dataclass(frozen=True)
+class IntentConflictFinding:
+    """Result of an intent conflict check for a single instance."""
+    instance_id: str
+    conflicts: List[dict]
+    detection: str
+    fix_instructions: List[str]
+    can_auto_fix: bool
+    fix_type: str
+
 
 class EC2IntentConversionRule:
     """
     Rule to handle intent conflicts - when user specifies one intent 
     but EC2 configuration conflicts with that intent.
+    
+    The rule keeps no per-instance state; results are returned as
+    IntentConflictFinding objects so one instance can be shared across threads.
     """
     
     id = "ec2_intent_conversion"
     detection = "EC2 configuration conflicts with user intent"
     auto_safe = False  # Always manual review for intent conflicts
     
-    def __init__(self):
-        self.fix_instructions = None
-        self.can_auto_fix = False
-        self.fix_type = None
-        self.conflict_details = None
-        self.intent_confidence = 0.0
-    
-    def check_with_intent(self, client, instance_id, intent, recommendations):
+    def check_with_intent(self, client, instance_id, intent, recommendations) -> Optional[IntentConflictFinding]:
         """Check for intent vs configuration conflicts."""
         conflicts = []
         
-        from agents.ec2_agent.intent_detector import EC2Intent
-        
         # Get instance details
         try:
             response = client.describe_instances(InstanceIds=[instance_id])
             if not response['Reservations']:
-                return False
+                return None
             
             instance = response['Reservations'][0]['Instances'][0]
         except Exception as e:
-            print(f"Error getting instance details: {e}")
-            return False
+            logger.error("Error getting instance details: %s", e)
+            return None
         
         # Check different types of intent conflicts
         if intent == EC2Intent.WEB_SERVER:
@@ -56,12 +78,18 @@ class EC2IntentConversionRule:
             conflicts.extend(bastion_conflicts)
         
         if conflicts:
-            self.conflict_details = conflicts
-            self._set_conversion_instructions(conflicts[0], intent, instance_id)
-            print(f"⚠️ Intent conflict: User wants {intent.value} but found {len(conflicts)} configuration conflicts")
-            return True
+            fix_instructions, can_auto_fix, fix_type = self._conversion_instructions(conflicts[0])
+            logger.warning("⚠️ Intent conflict: User wants %s but found %d configuration conflicts", intent.value, len(conflicts))
+            return IntentConflictFinding(
+                instance_id=instance_id,
+                conflicts=conflicts,
+                detection=self.detection,
+                fix_instructions=fix_instructions,
+                can_auto_fix=can_auto_fix,
+                fix_type=fix_type
+            )
         
-        return False
+        return None
     
     def _check_web_server_conflicts(self, client, instance_id, instance):
         """Check for conflicts with web server intent."""
@@ -73,18 +101,9 @@ class EC2IntentConversionRule:
             if sg_ids:
                 sg_response = client.describe_security_groups(GroupIds=sg_ids)
                 
-                has_http = False
-                has_https = False
-                
-                for sg in sg_response['SecurityGroups']:
-                    for rule in sg.get('IpPermissions', []):
-                        from_port = rule.get('FromPort')
-                        to_port = rule.get('ToPort')
-                        
-                        if from_port == 80 or (from_port <= 80 <= to_port):
-                            has_http = True
-                        if from_port == 443 or (from_port <= 443 <= to_port):
-                            has_https = True
+                analyses = [analyze_sg(sg_key(sg)) for sg in sg_response['SecurityGroups']]
+                has_http = any(analysis.http_open for analysis in analyses)
+                has_https = any(analysis.https_open for analysis in analyses)
                 
                 if not has_http and not has_https:
                     conflicts.append({
@@ -106,7 +125,7 @@ class EC2IntentConversionRule:
                 })
         
         except ClientError as e:
-            print(f"Error checking web server conflicts: {e}")
+            logger.error("Error checking web server conflicts: %s", e)
         
         return conflicts
     
@@ -127,7 +146,7 @@ class EC2IntentConversionRule:
             
             # Check instance type suitability
             instance_type = instance.get('InstanceType', '')
-            if not any(db_type in instance_type for db_type in ['r5', 'r6', 'r4', 'm5', 'm6i']):
+            if not _DB_TYPE_RE.match(instance_type):
                 conflicts.append({
                     "type": "inappropriate_instance_type",
                     "current_config": f"Using {instance_type} for database workload",
@@ -137,7 +156,7 @@ class EC2IntentConversionRule:
                 })
         
         except Exception as e:
-            print(f"Error checking database conflicts: {e}")
+            logger.error("Error checking database conflicts: %s", e)
         
         return conflicts
     
@@ -148,9 +167,8 @@ class EC2IntentConversionRule:
         try:
             # Check if using expensive instance types for development
             instance_type = instance.get('InstanceType', '')
-            expensive_types = ['p3', 'p4', 'x1', 'r5.large', 'r5.xlarge', 'm5.large', 'm5.xlarge']
             
-            if any(exp_type in instance_type for exp_type in expensive_types):
+            if _EXPENSIVE_RE.match(instance_type):
                 conflicts.append({
                     "type": "expensive_dev_instance",
                     "current_config": f"Using expensive instance type {instance_type} for development",
@@ -173,7 +191,7 @@ class EC2IntentConversionRule:
                 })
         
         except Exception as e:
-            print(f"Error checking development conflicts: {e}")
+            logger.error("Error checking development conflicts: %s", e)
         
         return conflicts
     
@@ -187,14 +205,10 @@ class EC2IntentConversionRule:
             if sg_ids:
                 sg_response = client.describe_security_groups(GroupIds=sg_ids)
                 
-                ssh_open_to_world = False
-                for sg in sg_response['SecurityGroups']:
-                    for rule in sg.get('IpPermissions', []):
-                        if rule.get('FromPort') == 22:
-                            for ip_range in rule.get('IpRanges', []):
-                                if ip_range.get('CidrIp') == '0.0.0.0/0':
-                                    ssh_open_to_world = True
-                                    break
+                ssh_open_to_world = any(
+                    analyze_sg(sg_key(sg)).ssh_open_world
+                    for sg in sg_response['SecurityGroups']
+                )
                 
                 if ssh_open_to_world:
                     conflicts.append({
@@ -206,15 +220,16 @@ class EC2IntentConversionRule:
                     })
         
         except Exception as e:
-            print(f"Error checking bastion conflicts: {e}")
+            logger.error("Error checking bastion conflicts: %s", e)
         
         return conflicts
     
-    def _set_conversion_instructions(self, conflict, intent, instance_id):
-        """Set specific instructions based on conflict type and intent."""
+    @staticmethod
+    def _conversion_instructions(conflict):
+        """Return (fix_instructions, can_auto_fix, fix_type) for a conflict."""
         
         if conflict["type"] == "web_ports_blocked":
-            self.fix_instructions = [
+            fix_instructions = [
                 f"Current: {conflict['current_config']}",
                 f"User Intent: {conflict['user_intent']}",
                 "",
@@ -229,11 +244,11 @@ class EC2IntentConversionRule:
                 "",
                 "💡 Alternative: Use Application Load Balancer for better scalability"
             ]
-            self.can_auto_fix = False  # Requires manual review for security changes
-            self.fix_type = "configure_web_server_access"
+            can_auto_fix = False  # Requires manual review for security changes
+            fix_type = "configure_web_server_access"
         
         elif conflict["type"] == "database_public_access":
-            self.fix_instructions = [
+            fix_instructions = [
                 f"Current: {conflict['current_config']}",
                 f"User Intent: {conflict['user_intent']}",
                 "🔧 Database Security Configuration:",
@@ -245,11 +260,11 @@ class EC2IntentConversionRule:
                 "6. Test database connectivity from application servers",
                 "⚠️ This will require application configuration changes"
             ]
-            self.can_auto_fix = False  # Requires network changes
-            self.fix_type = "move_database_to_private_subnet"
+            can_auto_fix = False  # Requires network changes
+            fix_type = "move_database_to_private_subnet"
         
         elif conflict["type"] == "expensive_dev_instance":
-            self.fix_instructions = [
+            fix_instructions = [
                 f"Current: {conflict['current_config']}",
                 f"User Intent: {conflict['user_intent']}",
                 "🔧 Development Instance Optimization:",
@@ -260,11 +275,11 @@ class EC2IntentConversionRule:
                 "5. Set up Instance Scheduler for automatic stop/start",
                 "💰 Estimated savings: 50-80% on compute costs"
             ]
-            self.can_auto_fix = False  # Requires testing
-            self.fix_type = "optimize_dev_instance_type"
+            can_auto_fix = False  # Requires testing
+            fix_type = "optimize_dev_instance_type"
         
         else:
-            self.fix_instructions = [
+            fix_instructions = [
                 f"Current: {conflict['current_config']}",
                 f"User Intent: {conflict['user_intent']}",
                 "",
@@ -276,36 +291,45 @@ class EC2IntentConversionRule:
                 "",
                 "⚠️ Changes may affect instance functionality"
             ]
-            self.can_auto_fix = False
-            self.fix_type = "manual_intent_alignment"
+            can_auto_fix = False
+            fix_type = "manual_intent_alignment"
+        
+        return fix_instructions, can_auto_fix, fix_type
     
     def check(self, client, instance_id):
         """Legacy check method - not used for intent conversion."""
-        return False
+        return None
     
-    def fix(self, client, instance_id):
-        """Fix intent conversion conflicts."""
-        if not self.conflict_details:
-            return {"success": False, "message": "No conflicts to fix"}
+    def fix(self, client, instance_id, result=None):
+        """
+        Fix intent conversion conflicts.
         
-        if not self.can_auto_fix:
+        result: IntentConflictFinding from check_with_intent. Without it the
+        conflicts are unknown, so manual resolution is requested.
+        """
+        if result is None:
             return {
                 "success": False,
                 "message": "Intent conflicts require manual resolution",
-                "conflicts": len(self.conflict_details),
-                "fix_instructions": self.fix_instructions
+                "recommendation": "Follow the fix instructions in the finding"
+            }
+        
+        if not result.can_auto_fix:
+            return {
+                "success": False,
+                "message": "Intent conflicts require manual resolution",
+                "conflicts": len(result.conflicts),
+                "fix_instructions": result.fix_instructions
             }
         
         # Handle safe auto-fixes
         try:
-            conflict = self.conflict_details[0]
-            
-            if self.fix_type == "configure_web_server_access":
+            if result.fix_type == "configure_web_server_access":
                 return self._configure_web_server_fix(client, instance_id)
             else:
                 return {
                     "success": False,
-                    "message": f"Auto-fix not implemented for {self.fix_type}",
+                    "message": f"Auto-fix not implemented for {result.fix_type}",
                     "recommendation": "Follow manual fix instructions"
                 }
         
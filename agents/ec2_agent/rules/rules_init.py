@@ -5,15 +5,56 @@ EC2 Agent Rules Module
 Contains detection and remediation rules for common EC2 misconfigurations
 """
 
-from .ec2_open_security_group_rule import OpenSecurityGroupRule
-from .ec2_unencrypted_ebs_rule import UnencryptedEBSRule
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+from .ec2_open_security_group_rule import OpenSecurityGroupRule, OpenSGFinding
+from .ec2_unencrypted_ebs_rule import UnencryptedEBSRule, UnencryptedEBSFinding, UnencryptedVolume
 from .ec2_missing_backups_rule import MissingBackupsRule
-from .intent_conversion_rule import EC2IntentConversionRule
+from .intent_conversion_rule import EC2IntentConversionRule, IntentConflictFinding
+
+
+class _RootForwardingHandler(logging.Handler):
+    """Hand queued records to the root logger's handlers (or logging.lastResort)."""
+    
+    def emit(self, record):
+        handlers = logging.getLogger().handlers or [logging.lastResort]
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def configure_rule_logging():
+    """
+    Route EC2 rule log records through a queue.
+    Threads scanning instances only enqueue records; a single listener
+    thread formats and writes them using the root logger's handlers.
+    """
+    rules_logger = logging.getLogger("agents.ec2_agent.rules")
+    if any(isinstance(handler, QueueHandler) for handler in rules_logger.handlers):
+        return
+    
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, _RootForwardingHandler())
+    rules_logger.addHandler(QueueHandler(log_queue))
+    rules_logger.propagate = False
+    listener.start()
+    atexit.register(listener.stop)
+
+
+configure_rule_logging()
 
 # Export all rules
 __all__ = [
     'OpenSecurityGroupRule',
     'UnencryptedEBSRule',
     'MissingBackupsRule', 
-    'EC2IntentConversionRule'
+    'EC2IntentConversionRule',
+    'OpenSGFinding',
+    'UnencryptedEBSFinding',
+    'UnencryptedVolume',
+    'IntentConflictFinding',
+    'configure_rule_logging'
 ]
@@ -0,0 +1,123 @@
+# agents/iam_agent/_iam_cache.py
+
+"""
+Process-wide cache of account-level IAM data shared by the IAM rules.
+Entries are keyed by a hash of account, region and data set, and expire after a few minutes.
+"""
+
+import csv
+import hashlib
+import io
+import itertools
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+from cachetools import LRUCache, TTLCache
+
+
+# Account-level data sets kept per process and how long they stay fresh (seconds)
+_CACHE_SIZE = 64
+_CACHE_TTL = 300
+
+# Account ids kept per process, one per access key id seen
+_ACCOUNT_IDS_SIZE = 256
+
+# generate_credential_report polls before giving up on the report
+_REPORT_POLL_ATTEMPTS = 10
+_REPORT_POLL_INTERVAL = 1  # seconds
+
+_cache = TTLCache(maxsize=_CACHE_SIZE, ttl=_CACHE_TTL)
+_cache_lock = threading.Lock()
+
+# Account id per access key id, so every client built from the same credentials shares entries
+_account_ids = LRUCache(maxsize=_ACCOUNT_IDS_SIZE)
+_account_ids_lock = threading.Lock()
+
+# Clients whose credentials cannot be read are scoped to themselves
+_client_accounts = weakref.WeakKeyDictionary()
+_client_tokens = itertools.count()
+
+
+def _client_credentials(client):
+    """Frozen credentials the client signs with, or None if it does not expose them."""
+    credentials = getattr(getattr(client, '_request_signer', None), '_credentials', None)
+    return credentials.get_frozen_credentials() if credentials is not None else None
+
+
+def account_id(client):
+    """Account id of the client's credentials, resolved with one GetCallerIdentity call per access key id."""
+    credentials = _client_credentials(client)
+    if credentials is None:
+        with _account_ids_lock:
+            account = _client_accounts.get(client)
+            if account is None:
+                account = _client_accounts[client] = f"client-{next(_client_tokens)}"
+        return account
+
+    with _account_ids_lock:
+        account = _account_ids.get(credentials.access_key)
+    if account is None:
+        try:
+            # GetCallerIdentity needs no permissions and, unlike GetUser, works for role sessions
+            account = boto3.Session(
+                aws_access_key_id=credentials.access_key,
+                aws_secret_access_key=credentials.secret_key,
+                aws_session_token=credentials.token,
+                region_name=client.meta.region_name,
+            ).client('sts').get_caller_identity()['Account']
+        except (BotoCoreError, ClientError, KeyError):
+            # The access key id still identifies the credentials across clients
+            account = f"key-{credentials.access_key}"
+        with _account_ids_lock:
+            _account_ids[credentials.access_key] = account
+    return account
+
+
+def cache_key(client, name):
+    """SHA-256 key for one data set of the client's account and region."""
+    return hashlib.sha256(f"{account_id(client)}|{client.meta.region_name}|{name}".encode()).hexdigest()
+
+
+def fetch_credential_report(client):
+    """Return the IAM credential report as {user_name: row}, or None if it cannot be generated."""
+    try:
+        for _ in range(_REPORT_POLL_ATTEMPTS):
+            if client.generate_credential_report().get('State') == 'COMPLETE':
+                break
+            time.sleep(_REPORT_POLL_INTERVAL)
+        else:
+            return None
+        content = client.get_credential_report()['Content']
+    except ClientError:
+        return None
+
+    rows = csv.DictReader(io.StringIO(content.decode('utf-8')))
+    return {row['user']: row for row in rows if row['user'] != '<root_account>'}
+
+
+def report_date(value):
+    """Naive UTC datetime for a credential report timestamp, or None for 'N/A' and similar."""
+    try:
+        return datetime.fromisoformat(value).astimezone(timezone.utc).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_credential_report(client):
+    """Credential report for the client's account, cached for _CACHE_TTL; the dict is shared, treat it as read-only."""
+    key = cache_key(client, "cred_report")
+    with _cache_lock:
+        report = _cache.get(key)
+
+    if report is None:
+        report = fetch_credential_report(client)
+        # Failures are not cached so the next rule can retry
+        if report is not None:
+            with _cache_lock:
+                _cache[key] = report
+
+    return report
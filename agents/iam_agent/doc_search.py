@@ -1,155 +1,313 @@
 # agents/iam_agent/doc_search.py
 
+import functools
+import re
+from collections import Counter, defaultdict
+from types import MappingProxyType
+
+try:
+    import numpy as np
+except ImportError:  # search_batch falls back to per-issue search
+    np = None
+
+try:
+    import ahocorasick
+except ImportError:  # _fallback_search uses _FALLBACK_RE instead
+    ahocorasick = None
+
+
+# Fallback categories in priority order: keywords and the result returned on a match
+_FALLBACK_CATEGORIES = (
+    # Security-related issues
+    ("security", ('mfa', 'password', 'access key', 'rotation', 'authentication', 'login'), {
+        "category": "security",
+        "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/security.html",
+        "suggestion": "This appears to be a security-related IAM issue. Check AWS security best practices."
+    }),
+    # Policy-related issues
+    ("policies", ('policy', 'permission', 'privilege', 'access denied', 'unauthorized'), {
+        "category": "policies",
+        "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/access_policies.html",
+        "suggestion": "This appears to be a policy-related IAM issue. Review IAM policy documentation."
+    }),
+    # Role-related issues
+    ("roles", ('role', 'assume', 'trust policy', 'cross-account', 'service role'), {
+        "category": "roles",
+        "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_roles.html",
+        "suggestion": "This appears to be a role-related IAM issue. Check IAM roles documentation."
+    }),
+    # User management issues
+    ("users", ('user', 'group', 'console access', 'login profile'), {
+        "category": "users",
+        "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_users.html",
+        "suggestion": "This appears to be a user management IAM issue. Review IAM users documentation."
+    })
+)
+
+_FALLBACK_RESULTS = {name: MappingProxyType(result) for name, _, result in _FALLBACK_CATEGORIES}
+
+# Category name -> priority rank (0 is checked first)
+_FALLBACK_RANKS = {name: rank for rank, (name, _, _) in enumerate(_FALLBACK_CATEGORIES)}
+
+# Zero-width lookahead with one named group per category: finditer() walks the
+# issue once and reports every keyword occurrence, including overlapping ones
+# (e.g. "policy" inside "trust policy"), so the best rank can be taken over all hits
+_FALLBACK_RE = re.compile(
+    "(?=" + "|".join(
+        f"(?P<{name}>{'|'.join(map(re.escape, keywords))})"
+        for name, keywords, _ in _FALLBACK_CATEGORIES
+    ) + ")"
+)
+
+
+def _build_fallback_automaton():
+    """Aho-Corasick automaton mapping each fallback keyword to its category's priority rank."""
+    automaton = ahocorasick.Automaton()
+    for rank, (_, keywords, _) in enumerate(_FALLBACK_CATEGORIES):
+        for keyword in keywords:
+            automaton.add_word(keyword, rank)
+    automaton.make_automaton()
+    return automaton
+
+
+# Single-pass keyword scanner when pyahocorasick is installed
+_FALLBACK_AUTOMATON = _build_fallback_automaton() if ahocorasick is not None else None
+
+
+# Remediation guides by issue type, shared by all DocSearch instances
+_REMEDIATION_GUIDES = MappingProxyType({
+    "mfa_missing": MappingProxyType({
+        "steps": (
+            "1. Navigate to IAM > Users > [Username] > Security credentials",
+            "2. In Multi-factor authentication (MFA) section, choose 'Manage'",
+            "3. Select 'Virtual MFA device' for mobile app authentication",
+            "4. Follow setup wizard to scan QR code with authenticator app",
+            "5. Enter two consecutive MFA codes to complete setup"
+        ),
+        "validation": "Verify MFA is working by signing out and back in",
+        "automation": "Consider using AWS CLI or SDK to automate MFA setup for bulk users"
+    }),
+    "access_key_old": MappingProxyType({
+        "steps": (
+            "1. Create new access key: aws iam create-access-key --user-name [USERNAME]",
+            "2. Update applications to use new access key",
+            "3. Test applications with new key for 24-48 hours",
+            "4. Deactivate old key: aws iam update-access-key --access-key-id [KEY] --status Inactive",
+            "5. Monitor for errors, then delete old key if no issues"
+        ),
+        "validation": "Confirm all applications work with new key before deleting old one",
+        "automation": "Set up automated key rotation using AWS Lambda and Secrets Manager"
+    }),
+    "excessive_permissions": MappingProxyType({
+        "steps": (
+            "1. Review current permissions using IAM Access Advisor",
+            "2. Identify unused permissions over past 90 days",
+            "3. Create new policy with only required permissions",
+            "4. Test new policy in development environment",
+            "5. Apply new policy and remove excessive permissions"
+        ),
+        "validation": "Monitor CloudTrail for access denied errors after policy change",
+        "automation": "Use AWS Config Rules to detect and alert on excessive permissions"
+    })
+})
+
+_REMEDIATION_DEFAULT = MappingProxyType({
+    "steps": ("Refer to AWS documentation for specific remediation steps",),
+    "validation": "Test changes in non-production environment first",
+    "automation": "Consider automating this fix using AWS Config or Lambda"
+})
+
+
+# Intent-specific documentation references, built once at import and shared by all instances
+_INTENT_DOCS = MappingProxyType({
+    "least_privilege": {
+        "common_issues": [
+            "Users have admin permissions unnecessarily",
+            "Policies contain wildcard actions (*)",
+            "Missing conditions on sensitive actions",
+            "Direct policy attachments instead of groups",
+            "Overly broad resource specifications"
+        ],
+        "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/best-practices.html#grant-least-privilege",
+        "best_practices": [
+            "Grant minimal permissions required for tasks",
+            "Use managed policies instead of inline policies",
+            "Add conditions to restrict access (MFA, IP, time)",
+            "Use groups for common permission sets",
+            "Regular access reviews and permission audits"
+        ]
+    },
+    "strong_security": {
+        "common_issues": [
+            "Users without MFA enabled",
+            "Old access keys not rotated",
+            "Missing password policy requirements",
+            "No session duration limits on roles",
+            "Insufficient logging and monitoring"
+        ],
+        "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/best-practices.html#enable-mfa",
+        "best_practices": [
+            "Enable MFA for all users with console access",
+            "Rotate access keys regularly (90 days max)",
+            "Implement strong password policies",
+            "Set appropriate session durations for roles",
+            "Enable CloudTrail for API activity logging",
+            "Use conditions to enforce security requirements"
+        ]
+    },
+    "service_account": {
+        "common_issues": [
+            "Service accounts with unnecessary console access",
+            "Using long-term access keys instead of roles",
+            "Overly permissive trust policies",
+            "Missing source IP or VPC conditions",
+            "Service accounts with human user permissions"
+        ],
+        "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_roles_use-cases.html",
+        "best_practices": [
+            "Use IAM roles instead of access keys when possible",
+            "Restrict trust policies to specific AWS services",
+            "Add source IP or VPC endpoint conditions",
+            "Use minimal permissions for specific services only",
+            "Implement credential rotation automation",
+            "Monitor for unusual API usage patterns"
+        ]
+    },
+    "developer_flexibility": {
+        "common_issues": [
+            "Developers with production access unnecessarily",
+            "No separation between dev/staging/production",
+            "Missing time-bound access controls",
+            "Insufficient self-service capabilities",
+            "No sandbox environments for testing"
+        ],
+        "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/tutorial_cross-account-with-roles.html",
+        "best_practices": [
+            "Separate development, staging, and production access",
+            "Use cross-account roles for production access",
+            "Implement time-limited access tokens",
+            "Create sandbox environments for experimentation",
+            "Use developer groups for common permissions",
+            "Provide self-service role assumption capabilities"
+        ]
+    },
+    "compliance": {
+        "common_issues": [
+            "Insufficient audit logging enabled",
+            "Missing read-only access for auditors",
+            "No approval process for privilege changes",
+            "Inadequate access review procedures",
+            "Missing compliance reporting capabilities"
+        ],
+        "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/tutorial_billing-permissions.html",
+        "best_practices": [
+            "Enable comprehensive CloudTrail logging",
+            "Create read-only roles for audit purposes",
+            "Implement approval workflows for privilege changes",
+            "Conduct regular access reviews and certifications",
+            "Document all permission grants and justifications",
+            "Set up automated compliance reporting"
+        ]
+    },
+    "admin_access": {
+        "common_issues": [
+            "Too many users with admin permissions",
+            "Admin access without MFA requirements",
+            "No break-glass procedures for emergencies",
+            "Missing monitoring for admin activities",
+            "Permanent admin access instead of temporary"
+        ],
+        "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/best-practices.html#use-roles-with-cross-account-access",
+        "best_practices": [
+            "Minimize number of admin users",
+            "Require MFA for all admin operations",
+            "Use just-in-time access for admin privileges",
+            "Implement break-glass procedures for emergencies",
+            "Monitor and alert on admin activities",
+            "Use multi-person approval for critical changes"
+        ]
+    },
+    "operational_efficiency": {
+        "common_issues": [
+            "Manual permission management processes",
+            "Inconsistent access patterns across environments",
+            "Lack of federated identity integration",
+            "No automation for common tasks",
+            "Inefficient cross-account access patterns"
+        ],
+        "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_roles_providers.html",
+        "best_practices": [
+            "Implement federated identity providers (SAML, OIDC)",
+            "Use AWS SSO for centralized access management",
+            "Automate role and policy provisioning",
+            "Standardize cross-account access patterns",
+            "Create reusable permission templates",
+            "Implement self-service access request systems"
+        ]
+    },
+    "automation_role": {
+        "common_issues": [
+            "Automation roles with excessive permissions",
+            "Missing conditions on automation access",
+            "No separation between CI/CD environments",
+            "Hardcoded credentials in automation",
+            "Insufficient monitoring of automation activities"
+        ],
+        "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_roles_use-cases.html#id_roles_use-cases_aws-services",
+        "best_practices": [
+            "Use minimal permissions for automation tasks",
+            "Separate CI/CD roles by environment (dev/prod)",
+            "Add source IP and time-based conditions",
+            "Use OIDC providers for GitHub Actions/GitLab CI",
+            "Implement credential-free automation workflows",
+            "Monitor automation role usage patterns",
+            "Set up alerts for unusual automation activities"
+        ]
+    }
+})
+
 
 class DocSearch:
     def __init__(self):
-        # Intent-specific documentation references
-        self.intent_docs = {
-            "least_privilege": {
-                "common_issues": [
-                    "Users have admin permissions unnecessarily",
-                    "Policies contain wildcard actions (*)",
-                    "Missing conditions on sensitive actions",
-                    "Direct policy attachments instead of groups",
-                    "Overly broad resource specifications"
-                ],
-                "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/best-practices.html#grant-least-privilege",
-                "best_practices": [
-                    "Grant minimal permissions required for tasks",
-                    "Use managed policies instead of inline policies",
-                    "Add conditions to restrict access (MFA, IP, time)",
-                    "Use groups for common permission sets",
-                    "Regular access reviews and permission audits"
-                ]
-            },
-            "strong_security": {
-                "common_issues": [
-                    "Users without MFA enabled",
-                    "Old access keys not rotated",
-                    "Missing password policy requirements",
-                    "No session duration limits on roles",
-                    "Insufficient logging and monitoring"
-                ],
-                "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/best-practices.html#enable-mfa",
-                "best_practices": [
-                    "Enable MFA for all users with console access",
-                    "Rotate access keys regularly (90 days max)",
-                    "Implement strong password policies",
-                    "Set appropriate session durations for roles",
-                    "Enable CloudTrail for API activity logging",
-                    "Use conditions to enforce security requirements"
-                ]
-            },
-            "service_account": {
-                "common_issues": [
-                    "Service accounts with unnecessary console access",
-                    "Using long-term access keys instead of roles",
-                    "Overly permissive trust policies",
-                    "Missing source IP or VPC conditions",
-                    "Service accounts with human user permissions"
-                ],
-                "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_roles_use-cases.html",
-                "best_practices": [
-                    "Use IAM roles instead of access keys when possible",
-                    "Restrict trust policies to specific AWS services",
-                    "Add source IP or VPC endpoint conditions",
-                    "Use minimal permissions for specific services only",
-                    "Implement credential rotation automation",
-                    "Monitor for unusual API usage patterns"
-                ]
-            },
-            "developer_flexibility": {
-                "common_issues": [
-                    "Developers with production access unnecessarily",
-                    "No separation between dev/staging/production",
-                    "Missing time-bound access controls",
-                    "Insufficient self-service capabilities",
-                    "No sandbox environments for testing"
-                ],
-                "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/tutorial_cross-account-with-roles.html",
-                "best_practices": [
-                    "Separate development, staging, and production access",
-                    "Use cross-account roles for production access",
-                    "Implement time-limited access tokens",
-                    "Create sandbox environments for experimentation",
-                    "Use developer groups for common permissions",
-                    "Provide self-service role assumption capabilities"
-                ]
-            },
-            "compliance": {
-                "common_issues": [
-                    "Insufficient audit logging enabled",
-                    "Missing read-only access for auditors",
-                    "No approval process for privilege changes",
-                    "Inadequate access review procedures",
-                    "Missing compliance reporting capabilities"
-                ],
-                "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/tutorial_billing-permissions.html",
-                "best_practices": [
-                    "Enable comprehensive CloudTrail logging",
-                    "Create read-only roles for audit purposes",
-                    "Implement approval workflows for privilege changes",
-                    "Conduct regular access reviews and certifications",
-                    "Document all permission grants and justifications",
-                    "Set up automated compliance reporting"
-                ]
-            },
-            "admin_access": {
-                "common_issues": [
-                    "Too many users with admin permissions",
-                    "Admin access without MFA requirements",
-                    "No break-glass procedures for emergencies",
-                    "Missing monitoring for admin activities",
-                    "Permanent admin access instead of temporary"
-                ],
-                "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/best-practices.html#use-roles-with-cross-account-access",
-                "best_practices": [
-                    "Minimize number of admin users",
-                    "Require MFA for all admin operations",
-                    "Use just-in-time access for admin privileges",
-                    "Implement break-glass procedures for emergencies",
-                    "Monitor and alert on admin activities",
-                    "Use multi-person approval for critical changes"
-                ]
-            },
-            "operational_efficiency": {
-                "common_issues": [
-                    "Manual permission management processes",
-                    "Inconsistent access patterns across environments",
-                    "Lack of federated identity integration",
-                    "No automation for common tasks",
-                    "Inefficient cross-account access patterns"
-                ],
-                "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_roles_providers.html",
-                "best_practices": [
-                    "Implement federated identity providers (SAML, OIDC)",
-                    "Use AWS SSO for centralized access management",
-                    "Automate role and policy provisioning",
-                    "Standardize cross-account access patterns",
-                    "Create reusable permission templates",
-                    "Implement self-service access request systems"
-                ]
-            },
-            "automation_role": {
-                "common_issues": [
-                    "Automation roles with excessive permissions",
-                    "Missing conditions on automation access",
-                    "No separation between CI/CD environments",
-                    "Hardcoded credentials in automation",
-                    "Insufficient monitoring of automation activities"
-                ],
-                "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_roles_use-cases.html#id_roles_use-cases_aws-services",
-                "best_practices": [
-                    "Use minimal permissions for automation tasks",
-                    "Separate CI/CD roles by environment (dev/prod)",
-                    "Add source IP and time-based conditions",
-                    "Use OIDC providers for GitHub Actions/GitLab CI",
-                    "Implement credential-free automation workflows",
-                    "Monitor automation role usage patterns",
-                    "Set up alerts for unusual automation activities"
-                ]
-            }
-        }
+        # Intent-specific documentation references (shared, read-only)
+        self.intent_docs = _INTENT_DOCS
+        
+        # Inverted index per intent: keyword -> indices of common issues containing it,
+        # plus each common issue's keyword count, so search() only scores candidates
+        # sharing at least one keyword with the query
+        self._postings = {}
+        self._issue_lens = {}
+        for intent, docs in self.intent_docs.items():
+            postings = defaultdict(list)
+            issue_lens = []
+            for idx, common_issue in enumerate(docs["common_issues"]):
+                keywords = set(common_issue.lower().split())
+                for keyword in keywords:
+                    postings[keyword].append(idx)
+                issue_lens.append(len(keywords))
+            self._postings[intent] = dict(postings)
+            self._issue_lens[intent] = issue_lens
+        
+        # Token presence matrices for search_batch: one column per keyword across
+        # all intents, one row per common issue
+        if np is not None:
+            self._token_ids = {}
+            for docs in self.intent_docs.values():
+                for common_issue in docs["common_issues"]:
+                    for keyword in common_issue.lower().split():
+                        self._token_ids.setdefault(keyword, len(self._token_ids))
+            
+            self._token_matrix = {}
+            self._issue_len_array = {}
+            for intent, docs in self.intent_docs.items():
+                matrix = np.zeros((len(docs["common_issues"]), len(self._token_ids)), dtype=np.int32)
+                for row, common_issue in enumerate(docs["common_issues"]):
+                    matrix[row, [self._token_ids[k] for k in set(common_issue.lower().split())]] = 1
+                self._token_matrix[intent] = matrix
+                self._issue_len_array[intent] = matrix.sum(axis=1)
+        
+        # Findings repeat the same (issue, intent) pairs across a scan
+        self._search_cached = functools.lru_cache(maxsize=512)(self._search_impl)
     
     def search(self, issue, intent=None):
         """
@@ -159,6 +317,13 @@ class DocSearch:
             issue: The detected IAM issue
             intent: User's detected intent (e.g., "least_privilege", "service_account")
         """
+        result = self._search_cached(issue, intent)
+        
+        # Cached results are read-only; hand each caller its own dict
+        return dict(result) if isinstance(result, MappingProxyType) else result
+    
+    def _search_impl(self, issue, intent):
+        """Uncached search; results are frozen so they can be shared from the cache."""
         if intent and intent in self.intent_docs:
             docs = self.intent_docs[intent]
             
@@ -166,71 +331,110 @@ class DocSearch:
             relevant_issue = None
             best_match_score = 0
             
-            for common_issue in docs["common_issues"]:
-                # Calculate relevance score based on keyword matching
-                issue_keywords = set(issue.lower().split())
-                common_issue_keywords = set(common_issue.lower().split())
+            # Calculate relevance score based on keyword matching
+            issue_keywords = set(issue.lower().split())
+            postings = self._postings[intent]
+            issue_lens = self._issue_lens[intent]
+            
+            issue_len = len(issue_keywords)
+            
+            # Count shared keywords for every common issue the query touches
+            match_counts = Counter()
+            for keyword in issue_keywords:
+                match_counts.update(postings.get(keyword, ()))
+            
+            # Visit candidates in catalog order so ties keep the earliest issue
+            for idx in sorted(match_counts):
+                # The best possible score is min/max of the two keyword counts;
+                # skip issues that cannot clear the 20% threshold
+                common_len = issue_lens[idx]
+                if min(issue_len, common_len) * 5 <= max(issue_len, common_len):
+                    continue
                 
-                # Find intersection and calculate match score
-                matches = len(issue_keywords.intersection(common_issue_keywords))
-                match_score = matches / max(len(issue_keywords), len(common_issue_keywords))
+                match_score = match_counts[idx] / max(issue_len, common_len)
                 
                 if match_score > best_match_score and match_score > 0.2:  # At least 20% match
                     best_match_score = match_score
-                    relevant_issue = common_issue
+                    relevant_issue = docs["common_issues"][idx]
             
             if relevant_issue:
-                return {
-                    "issue_type": relevant_issue,
-                    "intent": intent,
-                    "aws_docs": docs["aws_docs"],
-                    "best_practices": docs["best_practices"],
-                    "suggestion": f"This appears to be a {intent.replace('_', ' ')} issue. {relevant_issue} is a common problem in this scenario.",
-                    "match_score": best_match_score
-                }
+                return MappingProxyType(self._intent_result(intent, relevant_issue, best_match_score))
         
         # Enhanced fallback search with IAM-specific categories
         return self._fallback_search(issue)
     
+    def _intent_result(self, intent, relevant_issue, match_score):
+        """Search result for a common issue matched under an intent."""
+        docs = self.intent_docs[intent]
+        return {
+            "issue_type": relevant_issue,
+            "intent": intent,
+            "aws_docs": docs["aws_docs"],
+            "best_practices": docs["best_practices"],
+            "suggestion": f"This appears to be a {intent.replace('_', ' ')} issue. {relevant_issue} is a common problem in this scenario.",
+            "match_score": match_score
+        }
+    
+    def search_batch(self, issues, intent=None):
+        """
+        Search many issues under one intent at once.
+        
+        Keyword overlap with every common issue is computed as a single
+        matrix product over token presence vectors. Returns the same results
+        as calling search() on each issue; falls back to that when NumPy is
+        not installed or the intent has no docs.
+        """
+        issues = list(issues)
+        if np is None or not intent or intent not in self.intent_docs:
+            return [self.search(issue, intent) for issue in issues]
+        
+        token_ids = self._token_ids
+        query_keywords = [set(issue.lower().split()) for issue in issues]
+        
+        # Token presence matrix for the queries (batch x vocabulary)
+        queries = np.zeros((len(issues), len(token_ids)), dtype=np.int32)
+        for row, keywords in enumerate(query_keywords):
+            queries[row, [token_ids[k] for k in keywords if k in token_ids]] = 1
+        query_lens = np.array([len(keywords) for keywords in query_keywords])
+        
+        # Shared keyword counts and scores for every (query, common issue) pair
+        issue_matrix = self._token_matrix[intent]
+        issue_lens = self._issue_len_array[intent]
+        scores = (queries @ issue_matrix.T) / np.maximum(query_lens[:, None], issue_lens[None, :])
+        
+        # argmax returns the first maximum, matching search()'s tie-breaking
+        best = scores.argmax(axis=1)
+        common_issues = self.intent_docs[intent]["common_issues"]
+        
+        results = []
+        for row, issue in enumerate(issues):
+            match_score = float(scores[row, best[row]])
+            if match_score > 0.2:  # At least 20% match
+                results.append(self._intent_result(intent, common_issues[best[row]], match_score))
+            else:
+                results.append(self.search(issue, intent))
+        return results
+    
     def _fallback_search(self, issue):
         """Fallback search for issues not covered by intent-specific docs."""
         issue_lower = issue.lower()
         
-        # Security-related issues
-        security_keywords = ['mfa', 'password', 'access key', 'rotation', 'authentication', 'login']
-        if any(keyword in issue_lower for keyword in security_keywords):
-            return {
-                "category": "security",
-                "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/security.html",
-                "suggestion": "This appears to be a security-related IAM issue. Check AWS security best practices."
-            }
+        # Priority ranks of every keyword found in a single scan of the issue
+        if _FALLBACK_AUTOMATON is not None:
+            ranks = (rank for _, rank in _FALLBACK_AUTOMATON.iter(issue_lower))
+        else:
+            ranks = (_FALLBACK_RANKS[match.lastgroup] for match in _FALLBACK_RE.finditer(issue_lower))
         
-        # Policy-related issues
-        policy_keywords = ['policy', 'permission', 'privilege', 'access denied', 'unauthorized']
-        if any(keyword in issue_lower for keyword in policy_keywords):
-            return {
-                "category": "policies",
-                "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/access_policies.html",
-                "suggestion": "This appears to be a policy-related IAM issue. Review IAM policy documentation."
-            }
+        # The highest-priority category wins; nothing outranks rank 0
+        best_rank = None
+        for rank in ranks:
+            if best_rank is None or rank < best_rank:
+                best_rank = rank
+                if rank == 0:
+                    break
         
-        # Role-related issues
-        role_keywords = ['role', 'assume', 'trust policy', 'cross-account', 'service role']
-        if any(keyword in issue_lower for keyword in role_keywords):
-            return {
-                "category": "roles",
-                "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_roles.html",
-                "suggestion": "This appears to be a role-related IAM issue. Check IAM roles documentation."
-            }
-        
-        # User management issues
-        user_keywords = ['user', 'group', 'console access', 'login profile']
-        if any(keyword in issue_lower for keyword in user_keywords):
-            return {
-                "category": "users",
-                "aws_docs": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_users.html",
-                "suggestion": "This appears to be a user management IAM issue. Review IAM users documentation."
-            }
+        if best_rank is not None:
+            return _FALLBACK_RESULTS[_FALLBACK_CATEGORIES[best_rank][0]]
         
         # Generic fallback
         return f"No direct rule found. Refer to AWS IAM Documentation for: {issue}"
@@ -268,44 +472,6 @@ class DocSearch:
     
     def get_remediation_guidance(self, issue_type, intent=None):
         """Get specific remediation guidance for an issue."""
-        remediation_guides = {
-            "mfa_missing": {
-                "steps": [
-                    "1. Navigate to IAM > Users > [Username] > Security credentials",
-                    "2. In Multi-factor authentication (MFA) section, choose 'Manage'",
-                    "3. Select 'Virtual MFA device' for mobile app authentication",
-                    "4. Follow setup wizard to scan QR code with authenticator app",
-                    "5. Enter two consecutive MFA codes to complete setup"
-                ],
-                "validation": "Verify MFA is working by signing out and back in",
-                "automation": "Consider using AWS CLI or SDK to automate MFA setup for bulk users"
-            },
-            "access_key_old": {
-                "steps": [
-                    "1. Create new access key: aws iam create-access-key --user-name [USERNAME]",
-                    "2. Update applications to use new access key",
-                    "3. Test applications with new key for 24-48 hours",
-                    "4. Deactivate old key: aws iam update-access-key --access-key-id [KEY] --status Inactive",
-                    "5. Monitor for errors, then delete old key if no issues"
-                ],
-                "validation": "Confirm all applications work with new key before deleting old one",
-                "automation": "Set up automated key rotation using AWS Lambda and Secrets Manager"
-            },
-            "excessive_permissions": {
-                "steps": [
-                    "1. Review current permissions using IAM Access Advisor",
-                    "2. Identify unused permissions over past 90 days",
-                    "3. Create new policy with only required permissions",
-                    "4. Test new policy in development environment",
-                    "5. Apply new policy and remove excessive permissions"
-                ],
-                "validation": "Monitor CloudTrail for access denied errors after policy change",
-                "automation": "Use AWS Config Rules to detect and alert on excessive permissions"
-            }
-        }
-        
-        return remediation_guides.get(issue_type, {
-            "steps": ["Refer to AWS documentation for specific remediation steps"],
-            "validation": "Test changes in non-production environment first",
-            "automation": "Consider automating this fix using AWS Config or Lambda"
-        })
\ No newline at end of file
+        # Guides are shared read-only constants; return a copy per caller with steps as a list
+        guide = _REMEDIATION_GUIDES.get(issue_type, _REMEDIATION_DEFAULT)
+        return {**guide, "steps": list(guide["steps"])}
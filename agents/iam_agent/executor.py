@@ -1,5 +1,156 @@
 # agents/iam_agent/executor.py
 
+import sys
+from array import array
+from collections import Counter, defaultdict
+
+from agents.iam_agent.schema import (
+    MISSING_FIELDS,
+    REQUIRED_FIELDS,
+    REQUIRED_MASK,
+    Finding,
+    required_mask
+)
+
+
+# High priority security issues
+_HIGH_PRIORITY_RULES = frozenset({
+    "iam_mfa_enforcement",
+    "iam_least_privilege",
+    "iam_access_key_rotation"
+})
+
+# High priority intents
+_HIGH_PRIORITY_INTENTS = frozenset({
+    "admin_access",
+    "strong_security"
+})
+
+# Medium priority operational issues
+_MEDIUM_PRIORITY_RULES = frozenset({
+    "iam_inactive_user",
+    "iam_intent_conversion"
+})
+
+# Auto-safe rules whose fixes can run immediately
+_IMMEDIATE_RULES = frozenset({
+    "iam_mfa_enforcement",
+    "iam_inactive_user",
+    "iam_access_key_rotation"
+})
+
+# rule_id -> builder(resource_name, resource_type) for rules with a dedicated fix action
+_FIX_BUILDERS = {
+    "iam_mfa_enforcement": lambda resource_name, resource_type: {
+        "action": "enforce_mfa",
+        "params": {
+            "resource_name": resource_name,
+            "resource_type": resource_type
+        }
+    },
+    "iam_access_key_rotation": lambda resource_name, resource_type: {
+        "action": "deactivate_unused_keys",
+        "params": {
+            "user_name": resource_name
+        }
+    },
+    "iam_inactive_user": lambda resource_name, resource_type: {
+        "action": "disable_inactive_user",
+        "params": {
+            "user_name": resource_name,
+            "fix_option": "disable"
+        }
+    },
+    "iam_least_privilege": lambda resource_name, resource_type: {
+        "action": "add_mfa_conditions",
+        "params": {
+            "resource_name": resource_name,
+            "resource_type": resource_type
+        }
+    },
+    "iam_intent_conversion": lambda resource_name, resource_type: {
+        "action": "rule_based_fix",
+        "params": {
+            "rule_id": "iam_intent_conversion",
+            "resource_name": resource_name,
+            "resource_type": resource_type
+        }
+    }
+}
+
+
+# rule_id -> (summary bucket, action, impact, effort) used by generate_fix_summary
+_SUMMARY_TEMPLATES = {
+    "iam_mfa_enforcement": (
+        "security_improvements", "Enable MFA",
+        "Significantly improves account security", "Low"
+    ),
+    "iam_access_key_rotation": (
+        "security_improvements", "Rotate old access keys",
+        "Reduces credential compromise risk", "Medium"
+    ),
+    "iam_inactive_user": (
+        "cost_optimizations", "Disable inactive users",
+        "Reduces attack surface and management overhead", "Low"
+    ),
+    "iam_least_privilege": (
+        "compliance_actions", "Implement least privilege access",
+        "Improves compliance posture", "High"
+    ),
+    "iam_intent_conversion": (
+        "operational_improvements", "Align configuration with intent",
+        "Improves operational clarity", "Medium"
+    )
+}
+
+
+# Output schema of format_for_fixer as (field, default) pairs, in output order
+_FIXER_FIELDS = (
+    ("service", "iam"),
+    ("resource", None),
+    ("resource_type", "user"),
+    ("issue", None),
+    ("fix", None),
+    ("auto_safe", False),
+    ("note", None),
+    ("rule_id", None),
+    # Preserve additional metadata
+    ("intent", None),
+    ("intent_confidence", None),
+    ("intent_reasoning", None),
+    ("fix_instructions", None),
+    ("can_auto_fix", None),
+    ("fix_type", None),
+    ("source", None),
+    ("tier", None),
+    ("severity", None),
+    ("description", None)
+)
+
+# Fields whose values repeat across findings and are interned
+_INTERN_FIELDS = ("service", "resource_type", "rule_id", "intent", "fix_type")
+
+
+def _intern(value):
+    """Intern short, highly repeated string values; other values pass through."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _as_dict(finding):
+    """
+    A finding as a schema dict; dicts pass through.
+    
+    Unset (None) fields of a Finding are left out, so defaults apply as for a dict without them.
+    """
+    if not isinstance(finding, Finding):
+        return finding
+    return {key: value for key, value in finding.to_dict().items() if value is not None}
+
+
+def _as_dicts(findings):
+    """Every finding as a schema dict, in order."""
+    return [_as_dict(finding) for finding in findings]
+
 
 class IAMExecutor:
     def format_for_fixer(self, findings):
@@ -8,172 +159,134 @@ class IAMExecutor:
         Ensures schema consistency while preserving auto-fix actions.
         """
         normalized = []
-        for f in findings:
-            # Handle different finding formats from different tiers
-            # Rules have 'issue', RAG has 'title', LLM has 'issue'
-            issue = f.get("issue") or f.get("title") or f.get("description") or "Unknown issue"
-            
+        for f in _as_dicts(findings):
             # Skip findings without required fields
             if not f.get("resource"):
                 continue
             
-            # Use existing fix action if provided, otherwise create default
-            fix_action = f.get("fix")
-            if not fix_action:
-                fix_action = self._get_fix_action(f.get("rule_id"), f.get("resource"), f.get("resource_type"))
+            # Copy every schema field in one pass, filling in defaults
+            out = {key: f.get(key, default) for key, default in _FIXER_FIELDS}
             
-            normalized.append({
-                "service": f.get("service", "iam"),
-                "resource": f["resource"],
-                "resource_type": f.get("resource_type", "user"),
-                "issue": issue,
-                "fix": fix_action,
-                "auto_safe": f.get("auto_safe", False),
-                "note": f.get("note", None),
-                "rule_id": f.get("rule_id"),
-                # Preserve additional metadata
-                "intent": f.get("intent"),
-                "intent_confidence": f.get("intent_confidence"),
-                "intent_reasoning": f.get("intent_reasoning"),
-                "fix_instructions": f.get("fix_instructions"),
-                "can_auto_fix": f.get("can_auto_fix"),
-                "fix_type": f.get("fix_type"),
-                "source": f.get("source"),
-                "tier": f.get("tier"),
-                "severity": f.get("severity"),
-                "description": f.get("description")
-            })
+            # Handle different finding formats from different tiers
+            # Rules have 'issue', RAG has 'title', LLM has 'issue'
+            out["issue"] = f.get("issue") or f.get("title") or f.get("description") or "Unknown issue"
+            
+            # Use existing fix action if provided, otherwise create default;
+            # its resource_type matches the normalized finding's
+            if not out["fix"]:
+                out["fix"] = self._get_fix_action(out["rule_id"], out["resource"], out["resource_type"])
+            
+            # Service, resource type, rule, intent and fix type repeat across
+            # findings; interning them shares one string object per value
+            for key in _INTERN_FIELDS:
+                out[key] = _intern(out[key])
+            
+            normalized.append(out)
         return normalized
     
     def _get_fix_action(self, rule_id, resource_name, resource_type):
         """Map rule IDs to proper fix actions for legacy support."""
-        if rule_id == "iam_mfa_enforcement":
-            return {
-                "action": "enforce_mfa",
-                "params": {
-                    "resource_name": resource_name,
-                    "resource_type": resource_type
-                }
-            }
-        elif rule_id == "iam_access_key_rotation":
-            return {
-                "action": "deactivate_unused_keys",
-                "params": {
-                    "user_name": resource_name
-                }
-            }
-        elif rule_id == "iam_inactive_user":
-            return {
-                "action": "disable_inactive_user",
-                "params": {
-                    "user_name": resource_name,
-                    "fix_option": "disable"
-                }
-            }
-        elif rule_id == "iam_least_privilege":
-            return {
-                "action": "add_mfa_conditions",
-                "params": {
-                    "resource_name": resource_name,
-                    "resource_type": resource_type
-                }
-            }
-        elif rule_id == "iam_intent_conversion":
-            return {
-                "action": "rule_based_fix",
-                "params": {
-                    "rule_id": rule_id,
-                    "resource_name": resource_name,
-                    "resource_type": resource_type
-                }
-            }
-        else:
-            # All other rules default to manual review
-            # This includes complex policy changes and high-risk modifications
-            return {
-                "action": "manual_review",
-                "params": {
-                    "rule_id": rule_id,
-                    "resource_name": resource_name,
-                    "resource_type": resource_type
-                }
+        builder = _FIX_BUILDERS.get(rule_id)
+        if builder:
+            return builder(resource_name, resource_type)
+        
+        # All other rules default to manual review
+        # This includes complex policy changes and high-risk modifications
+        return {
+            "action": "manual_review",
+            "params": {
+                "rule_id": rule_id,
+                "resource_name": resource_name,
+                "resource_type": resource_type
             }
+        }
+    
+    def create_remediation_plan(self, findings, lazy=False):
+        """
+        Create a structured remediation plan from findings.
+        
+        Priority levels are collected as arrays of indices into findings. By
+        default these are materialized into the "high_priority", "medium_priority"
+        and "low_priority" summary lists. With lazy=True the plan keeps only the
+        "*_priority_idx" arrays; use get_priority_findings() to expand them.
+        """
+        findings = _as_dicts(findings)
+        plan = self._new_plan(findings)
+        
+        for i, finding in enumerate(findings):
+            self._add_to_plan(plan, i, finding, finding.get("rule_id", ""), finding.get("auto_safe", False), finding["resource"])
+        
+        self._finish_plan(plan, findings, lazy)
+        
+        return plan
     
-    def create_remediation_plan(self, findings):
-        """Create a structured remediation plan from findings."""
-        plan = {
+    def get_priority_findings(self, plan, findings, priority):
+        """Summaries of the findings at one priority level ("high", "medium" or "low")."""
+        return [self._plan_entry(_as_dict(findings[i])) for i in plan[f"{priority}_priority_idx"]]
+    
+    def _finish_plan(self, plan, findings, lazy):
+        """Convert grouping counters to plain dicts and expand priorities unless lazy."""
+        plan["by_resource_type"] = dict(plan["by_resource_type"])
+        plan["by_intent"] = dict(plan["by_intent"])
+        
+        if not lazy:
+            # Replace the priority index arrays with high/medium/low summary lists
+            for priority in ("high", "medium", "low"):
+                plan[f"{priority}_priority"] = self.get_priority_findings(plan, findings, priority)
+                del plan[f"{priority}_priority_idx"]
+    
+    def _new_plan(self, findings):
+        """Empty remediation plan for a list of findings."""
+        return {
             "total_issues": len(findings),
             "auto_fixable": 0,
             "manual_review": 0,
-            "high_priority": [],
-            "medium_priority": [],
-            "low_priority": [],
-            "by_resource_type": {},
-            "by_intent": {}
+            "high_priority_idx": array("i"),
+            "medium_priority_idx": array("i"),
+            "low_priority_idx": array("i"),
+            "by_resource_type": defaultdict(list),
+            "by_intent": Counter()
+        }
+    
+    def _plan_entry(self, finding):
+        """Lightweight projection of a finding used in the priority lists."""
+        return {
+            "resource": finding["resource"],
+            "resource_type": finding.get("resource_type", "user"),
+            "issue": finding["issue"],
+            "rule_id": finding.get("rule_id"),
+            "auto_safe": finding.get("auto_safe", False),
+            "intent": finding.get("intent", "unknown")
         }
+    
+    def _add_to_plan(self, plan, index, finding, rule_id, auto_safe, resource):
+        """Count, prioritize and group a single finding into a remediation plan."""
+        # Count auto-fixable vs manual
+        if auto_safe:
+            plan["auto_fixable"] += 1
+        else:
+            plan["manual_review"] += 1
         
-        for finding in findings:
-            # Count auto-fixable vs manual
-            if finding.get("auto_safe"):
-                plan["auto_fixable"] += 1
-            else:
-                plan["manual_review"] += 1
-            
-            # Categorize by priority based on rule and intent
-            priority = self._determine_priority(finding)
-            plan[f"{priority}_priority"].append({
-                "resource": finding["resource"],
-                "resource_type": finding.get("resource_type", "user"),
-                "issue": finding["issue"],
-                "rule_id": finding.get("rule_id"),
-                "auto_safe": finding.get("auto_safe", False),
-                "intent": finding.get("intent", "unknown")
-            })
-            
-            # Group by resource type
-            resource_type = finding.get("resource_type", "user")
-            if resource_type not in plan["by_resource_type"]:
-                plan["by_resource_type"][resource_type] = []
-            plan["by_resource_type"][resource_type].append(finding["resource"])
-            
-            # Group by intent
-            intent = finding.get("intent", "unknown")
-            if intent not in plan["by_intent"]:
-                plan["by_intent"][intent] = 0
-            plan["by_intent"][intent] += 1
+        # Categorize by priority based on rule and intent
+        priority = self._determine_priority(finding)
+        plan[f"{priority}_priority_idx"].append(index)
         
-        return plan
+        # Group by resource type and intent
+        plan["by_resource_type"][finding.get("resource_type", "user")].append(resource)
+        plan["by_intent"][finding.get("intent", "unknown")] += 1
     
     def _determine_priority(self, finding):
         """Determine priority level for a finding."""
         rule_id = finding.get("rule_id", "")
         intent = finding.get("intent", "")
+        issue = finding.get("issue") or ""
         
-        # High priority security issues
-        high_priority_rules = [
-            "iam_mfa_enforcement",
-            "iam_least_privilege",  
-            "iam_access_key_rotation"
-        ]
-        
-        # High priority intents
-        high_priority_intents = [
-            "admin_access",
-            "strong_security"
-        ]
-        
-        if (rule_id in high_priority_rules or 
-            intent in high_priority_intents or
-            "admin" in finding.get("issue", "").lower()):
+        if (rule_id in _HIGH_PRIORITY_RULES or
+            intent in _HIGH_PRIORITY_INTENTS or
+            "admin" in issue.lower()):
             return "high"
         
-        # Medium priority operational issues
-        medium_priority_rules = [
-            "iam_inactive_user",
-            "iam_intent_conversion"
-        ]
-        
-        if rule_id in medium_priority_rules:
+        if rule_id in _MEDIUM_PRIORITY_RULES:
             return "medium"
         
         # Default to low priority
@@ -181,133 +294,168 @@ class IAMExecutor:
     
     def generate_fix_summary(self, findings):
         """Generate a summary of potential fixes."""
-        summary = {
+        summary = self._new_summary()
+        
+        for finding in _as_dicts(findings):
+            self._add_to_summary(summary, finding, finding.get("rule_id", ""), finding["resource"])
+        
+        return summary
+    
+    def _new_summary(self):
+        """Empty fix summary."""
+        return {
             "quick_fixes": [],
             "security_improvements": [],
             "compliance_actions": [],
             "cost_optimizations": [],
             "operational_improvements": []
         }
+    
+    def _add_to_summary(self, summary, finding, rule_id, resource):
+        """Categorize a single finding's fix into the summary."""
+        # Categorize fixes by type
+        template = _SUMMARY_TEMPLATES.get(rule_id)
+        if template:
+            bucket, action, impact, effort = template
+            summary[bucket].append({
+                "action": action,
+                "resource": resource,
+                "impact": impact,
+                "effort": effort
+            })
         
-        for finding in findings:
-            rule_id = finding.get("rule_id", "")
-            intent = finding.get("intent", "")
-            resource = finding["resource"]
-            
-            # Categorize fixes by type
-            if rule_id == "iam_mfa_enforcement":
-                summary["security_improvements"].append({
-                    "action": "Enable MFA",
-                    "resource": resource,
-                    "impact": "Significantly improves account security",
-                    "effort": "Low"
-                })
-            
-            elif rule_id == "iam_access_key_rotation":
-                summary["security_improvements"].append({
-                    "action": "Rotate old access keys",
-                    "resource": resource,
-                    "impact": "Reduces credential compromise risk",
-                    "effort": "Medium"
-                })
-            
-            elif rule_id == "iam_inactive_user":
-                summary["cost_optimizations"].append({
-                    "action": "Disable inactive users",
-                    "resource": resource,
-                    "impact": "Reduces attack surface and management overhead",
-                    "effort": "Low"
-                })
-            
-            elif rule_id == "iam_least_privilege":
-                summary["compliance_actions"].append({
-                    "action": "Implement least privilege access",
-                    "resource": resource,
-                    "impact": "Improves compliance posture",
-                    "effort": "High"
-                })
-            
-            elif rule_id == "iam_intent_conversion":
-                summary["operational_improvements"].append({
-                    "action": "Align configuration with intent",
-                    "resource": resource,
-                    "impact": "Improves operational clarity",
-                    "effort": "Medium"
-                })
-            
-            # Quick fixes for auto-safe items
-            if finding.get("auto_safe"):
-                summary["quick_fixes"].append({
-                    "action": finding.get("fix", {}).get("action", "unknown"),
-                    "resource": resource,
-                    "rule_id": rule_id
-                })
-        
-        return summary
+        # Quick fixes for auto-safe items
+        if finding.get("auto_safe"):
+            summary["quick_fixes"].append({
+                "action": finding.get("fix", {}).get("action", "unknown"),
+                "resource": resource,
+                "rule_id": rule_id
+            })
     
     def create_execution_order(self, findings):
         """Create optimal execution order for fixes."""
+        execution_groups = self._new_execution_groups()
+        
+        for finding in _as_dicts(findings):
+            group = self._execution_group(finding.get("rule_id", ""), finding.get("auto_safe", False))
+            execution_groups[group].append(finding)
+        
+        return execution_groups
+    
+    def _new_execution_groups(self):
+        """Empty execution groups."""
         # Group findings by dependency and risk
-        execution_groups = {
+        return {
             "immediate": [],    # High-impact, low-risk fixes
             "short_term": [],   # Medium impact fixes
             "long_term": []     # Complex changes requiring planning
         }
+    
+    def _execution_group(self, rule_id, auto_safe):
+        """Pick the execution group for a finding."""
+        # Immediate fixes - safe and high impact
+        if auto_safe and rule_id in _IMMEDIATE_RULES:
+            return "immediate"
         
-        for finding in findings:
-            rule_id = finding.get("rule_id", "")
-            auto_safe = finding.get("auto_safe", False)
-            
-            # Immediate fixes - safe and high impact
-            if auto_safe and rule_id in ["iam_mfa_enforcement", "iam_inactive_user", "iam_access_key_rotation"]:
-                execution_groups["immediate"].append(finding)
-            
-            # Short-term fixes - require some planning
-            elif rule_id in ["iam_intent_conversion"] or not auto_safe:
-                execution_groups["short_term"].append(finding)
-            
-            # Long-term fixes - complex policy changes
-            else:
-                execution_groups["long_term"].append(finding)
+        # Short-term fixes - require some planning
+        elif rule_id == "iam_intent_conversion" or not auto_safe:
+            return "short_term"
         
-        return execution_groups
+        # Long-term fixes - complex policy changes
+        else:
+            return "long_term"
     
     def validate_findings(self, findings):
         """Validate findings format and completeness."""
-        validation_results = {
+        validation_results = self._new_validation(findings)
+        
+        for level, message in self._iter_issues(findings):
+            self._record_issue(validation_results, level, message)
+        
+        return validation_results
+    
+    def is_valid(self, findings):
+        """Return True if no finding has a validation error; stops at the first one."""
+        return next(self._iter_issues(findings, warnings=False), None) is None
+    
+    def _new_validation(self, findings):
+        """Empty validation results."""
+        return {
             "valid": True,
             "errors": [],
             "warnings": [],
             "total_findings": len(findings)
         }
+    
+    def _record_issue(self, validation_results, level, message):
+        """Add one ("error" | "warning", message) pair to validation results."""
+        if level == "error":
+            validation_results["errors"].append(message)
+            validation_results["valid"] = False
+        else:
+            validation_results["warnings"].append(message)
+    
+    def _iter_issues(self, findings, warnings=True):
+        """Yield ("error" | "warning", message) for every finding in order."""
+        for i, finding in enumerate(findings):
+            yield from self._iter_finding_issues(i, finding, warnings)
+    
+    def _iter_finding_issues(self, i, finding, warnings=True):
+        """Yield validation errors (and optionally warnings) for a single finding."""
+        typed = isinstance(finding, Finding)
         
-        required_fields = ["service", "resource", "issue", "rule_id"]
+        # Check required fields; typed findings need a single mask comparison
+        if typed:
+            mask = required_mask(finding)
+            missing_fields = () if mask == REQUIRED_MASK else MISSING_FIELDS[REQUIRED_MASK & ~mask]
+        else:
+            missing_fields = [field for field in REQUIRED_FIELDS if finding.get(field) is None]
+        
+        for field in missing_fields:
+            yield "error", f"Finding {i}: Missing required field '{field}'"
+        
+        # Check fix action format
+        fix_action = finding.fix if typed else finding.get("fix")
+        if fix_action and not isinstance(fix_action, dict):
+            yield "error", f"Finding {i}: 'fix' field must be a dictionary"
+        elif warnings and fix_action and "action" not in fix_action:
+            yield "warning", f"Finding {i}: 'fix' action missing 'action' field"
+        
+        # Check resource type (always present on typed findings)
+        if warnings and not typed and "resource_type" not in finding:
+            yield "warning", f"Finding {i}: Missing 'resource_type' field, defaulting to 'user'"
+    
+    def build_full_report(self, findings, lazy=False):
+        """
+        Build the remediation plan, fix summary, execution order and validation
+        results in a single pass over findings.
+        
+        Equivalent to calling create_remediation_plan (with the same lazy flag),
+        generate_fix_summary, create_execution_order and validate_findings separately.
+        """
+        findings = _as_dicts(findings)
+        plan = self._new_plan(findings)
+        summary = self._new_summary()
+        execution_groups = self._new_execution_groups()
+        validation_results = self._new_validation(findings)
         
         for i, finding in enumerate(findings):
-            # Check required fields
-            for field in required_fields:
-                if field not in finding or finding[field] is None:
-                    validation_results["errors"].append(
-                        f"Finding {i}: Missing required field '{field}'"
-                    )
-                    validation_results["valid"] = False
-            
-            # Check fix action format
-            fix_action = finding.get("fix")
-            if fix_action and not isinstance(fix_action, dict):
-                validation_results["errors"].append(
-                    f"Finding {i}: 'fix' field must be a dictionary"
-                )
-                validation_results["valid"] = False
-            elif fix_action and "action" not in fix_action:
-                validation_results["warnings"].append(
-                    f"Finding {i}: 'fix' action missing 'action' field"
-                )
+            # Shared per-finding values reused by every section
+            rule_id = finding.get("rule_id", "")
+            auto_safe = finding.get("auto_safe", False)
+            resource = finding["resource"]
             
-            # Check resource type
-            if "resource_type" not in finding:
-                validation_results["warnings"].append(
-                    f"Finding {i}: Missing 'resource_type' field, defaulting to 'user'"
-                )
+            self._add_to_plan(plan, i, finding, rule_id, auto_safe, resource)
+            self._add_to_summary(summary, finding, rule_id, resource)
+            execution_groups[self._execution_group(rule_id, auto_safe)].append(finding)
+            for level, message in self._iter_finding_issues(i, finding):
+                self._record_issue(validation_results, level, message)
         
-        return validation_results
+        self._finish_plan(plan, findings, lazy)
+        
+        return {
+            "remediation_plan": plan,
+            "fix_summary": summary,
+            "execution_order": execution_groups,
+            "validation": validation_results
+        }
@@ -1,53 +1,300 @@
 # agents/iam_agent/iam_agent.py
 
+import copy
+import logging
 import boto3
+from botocore.config import Config
 import pkgutil
+import threading
+import time
 import importlib
-import inspect
 from pathlib import Path
 import yaml
 import json
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
 from typing import Dict, List, Optional, Any
 
+import numpy as np
+from cachetools import TTLCache, cached
+
+try:
+    from numba import njit
+except ImportError:  # Optional: get_scan_summary falls back to np.bincount
+    njit = None
+
 from agents.iam_agent.executor import IAMExecutor
 from agents.utils.llm_security_analyzer import LLMSecurityAnalyzer
 from agents.utils.rag_security_search import RAGSecuritySearch
 from .doc_search import DocSearch
-from .llm_fallback import LLMFallback
-from .intent_detector import IAMIntentDetector
+from . import llm_fallback
+from .intent_detector import IAMIntentDetector, IAMIntent
+
+logger = logging.getLogger(__name__)
+
+
+# Entity types fetched in the account authorization snapshot
+_SNAPSHOT_FILTER = ['User', 'Role', 'Group', 'LocalManagedPolicy']
+
+# Snapshot-only keys stripped so entries match the get_user/get_role/get_policy shapes
+_USER_DETAIL_KEYS = ('UserPolicyList', 'GroupList', 'AttachedManagedPolicies')
+_GROUP_DETAIL_KEYS = ('GroupPolicyList', 'AttachedManagedPolicies')
+_ROLE_DETAIL_KEYS = ('RolePolicyList', 'AttachedManagedPolicies', 'InstanceProfileList')
+_POLICY_DETAIL_KEYS = ('PolicyVersionList',)
+
+# Role name prefixes of AWS-managed service roles, skipped in account-wide scans
+EXCLUDED_ROLE_PREFIXES = ("aws-", "AWSServiceRoleFor", "OrganizationAccountAccess")
+
+# Worker threads used to scan resources concurrently
+_SCAN_WORKERS = 16
+
+# Concurrent Gemini requests allowed during TIER 3
+_LLM_CONCURRENCY = 8
+
+# HTTP connections per IAM client; scan workers and intent lookups share one client,
+# with adaptive retries so concurrent calls back off when IAM throttles
+_MAX_POOL_CONNECTIONS = 32
+_MAX_ATTEMPTS = 10
+
+# Keep idle connections alive between calls and fail fast on unreachable endpoints (seconds)
+_CONNECT_TIMEOUT = 3
+_READ_TIMEOUT = 10
+
+# Resource configs kept between scan() calls on the same agent
+_CONFIG_CACHE_SIZE = 512
+_CONFIG_CACHE_TTL = 60  # seconds
+
+# What the RAG and LLM tiers need to know about one resource
+_ResourceContext = namedtuple('_ResourceContext', 'resource_type resource_name intent confidence config')
+
+# Output of the per-resource pass: TIER 1 findings, whether any rule hit, and TIER 2 findings
+_ResourceScan = namedtuple('_ResourceScan', 'context rule_findings rule_hit rag_findings')
+
+
+# Resource types a rule checks unless it declares its own applies_to
+_ALL_RESOURCE_TYPES = frozenset({"user", "role", "policy"})
+
+# Adapters from (rule, client, resource_type, resource_name) to each rule's check/fix signature
+_RULE_CHECKS = {
+    "iam_mfa_enforcement": lambda rule, client, resource_type, resource_name: rule.check(client, resource_name),
+    "iam_least_privilege": lambda rule, client, resource_type, resource_name: rule.check(client, resource_type, resource_name),
+    "iam_access_key_rotation": lambda rule, client, resource_type, resource_name: rule.check(client, resource_name),
+    "iam_inactive_user": lambda rule, client, resource_type, resource_name: rule.check(client, resource_name),
+}
+_DEFAULT_CHECK = lambda rule, client, resource_type, resource_name: rule.check(client, resource_type, resource_name)
+
+_RULE_FIXES = {
+    "iam_mfa_enforcement": lambda rule, client, resource_type, resource_name: rule.fix(client, resource_name),
+    "iam_least_privilege": lambda rule, client, resource_type, resource_name: rule.fix(client, resource_type, resource_name),
+    "iam_access_key_rotation": lambda rule, client, resource_type, resource_name: rule.fix(client, auto_approve=True),
+    "iam_inactive_user": lambda rule, client, resource_type, resource_name: rule.fix(client, fix_option="disable", auto_approve=True),
+    "iam_intent_conversion": lambda rule, client, resource_type, resource_name: rule.fix(client, resource_type, resource_name),
+}
+_DEFAULT_FIX = lambda rule, client, resource_type, resource_name: rule.fix(client, resource_name)
+
+# Auto-fix action builders keyed by rule id; other rules get a generic rule_based_fix action
+_AUTO_FIX_ACTIONS = {
+    "iam_mfa_enforcement": lambda resource_type, resource_name: {
+        "action": "enforce_mfa",
+        "params": {"user_name": resource_name}
+    },
+    "iam_access_key_rotation": lambda resource_type, resource_name: {
+        "action": "deactivate_unused_keys", 
+        "params": {"user_name": resource_name}
+    },
+    "iam_inactive_user": lambda resource_type, resource_name: {
+        "action": "disable_inactive_user",
+        "params": {"user_name": resource_name}
+    },
+    "iam_least_privilege": lambda resource_type, resource_name: {
+        "action": "add_mfa_conditions",
+        "params": {"resource_type": resource_type, "resource_name": resource_name}
+    },
+}
+
+
+def _low_risk_only(risk_score):
+    """Auto-fix least privilege violations only when they are low risk."""
+    if risk_score < 20:
+        return True
+    logger.info("⚠️ High-risk privilege violations detected - requiring manual review")
+    return False
+
+
+# Auto-apply decisions keyed by (rule id, intent); a callable receives the rule's risk_score.
+# Pairs not listed fall back to the rule's own auto_safe setting.
+_AUTO_APPLY = {
+    # Least privilege intent - be careful with permission reduction
+    ("iam_least_privilege", IAMIntent.LEAST_PRIVILEGE): _low_risk_only,
+    ("iam_mfa_enforcement", IAMIntent.LEAST_PRIVILEGE): True,  # Safe to auto-enforce MFA
+    
+    # Strong security intent - apply security rules
+    ("iam_mfa_enforcement", IAMIntent.STRONG_SECURITY): True,
+    ("iam_access_key_rotation", IAMIntent.STRONG_SECURITY): True,
+    ("iam_least_privilege", IAMIntent.STRONG_SECURITY): False,  # Be cautious with permission changes
+    
+    # Service account intent - be very careful
+    ("iam_mfa_enforcement", IAMIntent.SERVICE_ACCOUNT): False,  # Service accounts typically don't need MFA
+    ("iam_inactive_user", IAMIntent.SERVICE_ACCOUNT): False,  # May appear inactive but be used programmatically
+    
+    # Developer flexibility - don't restrict too much
+    ("iam_least_privilege", IAMIntent.DEVELOPER_FLEXIBILITY): False,
+    ("iam_mfa_enforcement", IAMIntent.DEVELOPER_FLEXIBILITY): True,  # Still enforce MFA for developers
+    
+    # Compliance intent - apply all security rules
+    ("iam_mfa_enforcement", IAMIntent.COMPLIANCE): True,
+    ("iam_access_key_rotation", IAMIntent.COMPLIANCE): True,
+    ("iam_inactive_user", IAMIntent.COMPLIANCE): True,
+    ("iam_least_privilege", IAMIntent.COMPLIANCE): False,  # Manual review for compliance
+    
+    # Unknown intent - be conservative
+    ("iam_mfa_enforcement", IAMIntent.UNKNOWN): False,
+    ("iam_access_key_rotation", IAMIntent.UNKNOWN): False,
+}
+
+
+# Rule modules are listed once at import so agent construction does not touch the filesystem
+_RULES_PATH = Path(__file__).parent / "rules"
+_RULE_MODULE_NAMES = tuple(module_info.name for module_info in pkgutil.iter_modules([str(_RULES_PATH)]))
+
+
+@lru_cache(maxsize=1)
+def _discover_rules_cached(module_names):
+    """
+    Import the given rules/ modules and return the rule classes they define.
+    Cached so repeated IAMAgent construction skips the imports and class scan.
+    """
+    rule_classes = []
+    for module_name in module_names:
+        module = importlib.import_module(f"agents.iam_agent.rules.{module_name}")
+        
+        # Only classes defined in the module itself, so re-exports are not loaded twice
+        for obj in vars(module).values():
+            if (isinstance(obj, type) and obj.__module__ == module.__name__
+                    and hasattr(obj, "check") and hasattr(obj, "fix")):
+                rule_classes.append(obj)
+    return tuple(rule_classes)
+
+
+def _partition_rules(rules):
+    """Group rules by the resource types they apply to, keeping load order."""
+    rules_by_type = {resource_type: [] for resource_type in _ALL_RESOURCE_TYPES}
+    for rule in rules:
+        for resource_type in getattr(rule, 'applies_to', _ALL_RESOURCE_TYPES):
+            rules_by_type.setdefault(resource_type, []).append(rule)
+    return rules_by_type
+
+
+# Severity buckets reported by get_scan_summary; any other severity gets the extra id
+_SUMMARY_SEVERITIES = ("critical", "high", "medium", "low")
+_SEVERITY_IDS = {severity: i for i, severity in enumerate(_SUMMARY_SEVERITIES)}
+_OTHER_SEVERITY_ID = len(_SUMMARY_SEVERITIES)
+
+
+def _tally_loop(rt_ids, intent_ids, sev_ids, n_types, n_intents):
+    """Count findings per resource type, intent and severity id in one pass."""
+    rt_counts = np.zeros(n_types, dtype=np.int64)
+    intent_counts = np.zeros(n_intents, dtype=np.int64)
+    sev_counts = np.zeros(_OTHER_SEVERITY_ID + 1, dtype=np.int64)
+    for i in range(rt_ids.shape[0]):
+        rt_counts[rt_ids[i]] += 1
+        intent_counts[intent_ids[i]] += 1
+        sev_counts[sev_ids[i]] += 1
+    return rt_counts, intent_counts, sev_counts
+
+
+def _tally_bincount(rt_ids, intent_ids, sev_ids, n_types, n_intents):
+    """Same counts as _tally_loop using np.bincount when Numba is not installed."""
+    return (
+        np.bincount(rt_ids, minlength=n_types),
+        np.bincount(intent_ids, minlength=n_intents),
+        np.bincount(sev_ids, minlength=_OTHER_SEVERITY_ID + 1),
+    )
+
+
+_tally = njit(cache=True)(_tally_loop) if njit is not None else _tally_bincount
+
+
+def _strip_detail(detail, keys):
+    """Copy of a snapshot entry without its detail-list keys."""
+    return {k: v for k, v in detail.items() if k not in keys}
+
+
+def _client_key(creds):
+    """Hashable (access_key, secret_key, session_token, region) for a creds dict."""
+    return (
+        creds.get("aws_access_key_id"),
+        creds.get("aws_secret_access_key"),
+        creds.get("aws_session_token"),
+        creds.get("region", "us-east-1"),
+    )
+
+
+@lru_cache(maxsize=32)
+def _get_iam_client(access_key, secret_key, session_token, region):
+    """IAM client shared by every agent and scan worker with the same credentials; client creation loads the service model."""
+    return boto3.Session(
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        aws_session_token=session_token,
+        region_name=region,
+    ).client("iam", config=Config(
+        max_pool_connections=_MAX_POOL_CONNECTIONS,
+        retries={"mode": "adaptive", "max_attempts": _MAX_ATTEMPTS},
+        tcp_keepalive=True,
+        connect_timeout=_CONNECT_TIMEOUT,
+        read_timeout=_READ_TIMEOUT,
+    ))
 
 
 class IAMAgent:
-    def __init__(self, client=None, creds=None):
+    def __init__(self, client=None, creds=None, config_cache_ttl=_CONFIG_CACHE_TTL):
         if client and hasattr(client, 'list_users'):  
             # If explicitly passed a boto3 IAM client (check it has IAM methods)
             self.client = client
         elif client and isinstance(client, dict):
             # If first param is actually credentials dict
-            self.client = boto3.client(
-                "iam",
-                aws_access_key_id=client.get("aws_access_key_id"),
-                aws_secret_access_key=client.get("aws_secret_access_key"),
-                aws_session_token=client.get("aws_session_token"),
-                region_name=client.get("region", "us-east-1"),
-            )
+            self.client = _get_iam_client(*_client_key(client))
         elif creds:  
             # Build boto3 client from creds dict
-            self.client = boto3.client(
-                "iam",
-                aws_access_key_id=creds.get("aws_access_key_id"),
-                aws_secret_access_key=creds.get("aws_secret_access_key"),
-                aws_session_token=creds.get("aws_session_token"),
-                region_name=creds.get("region", "us-east-1"),
-            )
+            self.client = _get_iam_client(*_client_key(creds))
         else:
             # Fallback: default boto3 client (uses local ~/.aws/credentials or env vars)
-            self.client = boto3.client("iam")
+            self.client = _get_iam_client(None, None, None, None)
+        
+        # One snapshot of users, roles, groups and local policies serves all per-resource lookups;
+        # scan() reloads it once it is older than config_cache_ttl, like the configs built from it
+        self._config_cache_ttl = config_cache_ttl
+        self._snapshot_lock = threading.Lock()
+        self._auth_details = self._load_auth_snapshot()
+        self._snapshot_loaded_at = time.monotonic()
+        # (resource_type, resource_name) changed by apply_fix since the snapshot was taken; read from the API instead
+        self._stale_entries = set()
             
         # Initialize components
         self.rules = self._load_rules()
+        self._rules_by_type = _partition_rules(self.rules)
+        
+        # Per-thread rule instances for concurrent scans (the client is thread-safe and shared); this thread keeps the originals
+        self._local = threading.local()
+        self._local.rules_by_type = self._rules_by_type
+        
+        # Copies of rules that flagged a resource on its latest check, keyed by (rule_id, resource_type, resource_name);
+        # fix() reads the state check() left behind, which the per-thread instances overwrite on the next resource
+        self._checked_rules = {}
+        
+        # Resource configs are reused across scan() calls for config_cache_ttl seconds
+        self._config_cache = TTLCache(maxsize=_CONFIG_CACHE_SIZE, ttl=config_cache_ttl)
+        self._resource_config = cached(
+            self._config_cache,
+            key=lambda resource_type, resource_name: (resource_type, resource_name),
+            lock=threading.Lock()
+        )(self._get_resource_config)
+        
         self.doc_search = DocSearch()
-        self.llm_fallback = LLMFallback()
+        self.llm_fallback = llm_fallback  # Stateless module functions
         self.intent_detector = IAMIntentDetector()
         self.executor = IAMExecutor()
         
@@ -58,23 +305,90 @@ class IAMAgent:
         # Initialize LLM only if API key exists
         try:
             self.llm_analyzer = LLMSecurityAnalyzer()
-            print("[IAMAgent] ✅ LLM fallback enabled (Gemini)")
+            logger.info("[IAMAgent] ✅ LLM fallback enabled (Gemini)")
         except ValueError as e:
-            print(f"[IAMAgent] ⚠️  LLM fallback disabled: {e}")
+            logger.warning("[IAMAgent] ⚠️  LLM fallback disabled: %s", e)
 
     def _load_rules(self):
-        """Dynamically import all rule classes from rules/ directory."""
-        rules = []
-        rules_path = Path(__file__).parent / "rules"
+        """
+        Dynamically import all rule classes from rules/ directory.
+        Also builds self._rule_dispatch, the per-rule-id check/fix adapters used during scans.
+        """
+        # Rules keep state from their last check, so each agent gets its own instances
+        rules = [rule_class() for rule_class in _discover_rules_cached(_RULE_MODULE_NAMES)]
+        
+        self._rule_dispatch = {
+            rule.id: {
+                "check": _RULE_CHECKS.get(rule.id, _DEFAULT_CHECK),
+                "fix": _RULE_FIXES.get(rule.id, _DEFAULT_FIX),
+                "auto_fix_action": _AUTO_FIX_ACTIONS.get(rule.id),
+                "supports_intent": hasattr(rule, 'check_with_intent'),
+            }
+            for rule in rules
+        }
+        return rules
 
-        for module_info in pkgutil.iter_modules([str(rules_path)]):
-            module_name = f"agents.iam_agent.rules.{module_info.name}"
-            module = importlib.import_module(module_name)
+    def clear_cache(self):
+        """Drop cached resource configs and intents and reload the authorization snapshot."""
+        self._config_cache.clear()
+        self.intent_detector.invalidate()
+        with self._snapshot_lock:
+            self._auth_details = self._load_auth_snapshot()
+            self._snapshot_loaded_at = time.monotonic()
+            self._stale_entries = set()
 
-            for _, obj in inspect.getmembers(module, inspect.isclass):
-                if hasattr(obj, "check") and hasattr(obj, "fix"):
-                    rules.append(obj())
-        return rules
+    def _refresh_auth_snapshot(self):
+        """Reload the authorization snapshot and drop what was built from it once it is older than the config TTL."""
+        with self._snapshot_lock:
+            if time.monotonic() - self._snapshot_loaded_at < self._config_cache_ttl:
+                return
+            self._auth_details = self._load_auth_snapshot()
+            self._snapshot_loaded_at = time.monotonic()
+            self._stale_entries = set()
+        self._config_cache.clear()
+        self.intent_detector.invalidate()
+
+    def _thread_rules(self, resource_type):
+        """Rules for a resource type on the calling thread, since rules keep state from their last check."""
+        rules_by_type = getattr(self._local, 'rules_by_type', None)
+        if rules_by_type is None:
+            rules_by_type = _partition_rules([type(rule)() for rule in self.rules])
+            self._local.rules_by_type = rules_by_type
+        return rules_by_type.get(resource_type, [])
+
+    def _load_auth_snapshot(self):
+        """
+        Fetch the account's IAM entities with one paginated GetAccountAuthorizationDetails call.
+        
+        Builds the _users_by_name, _roles_by_name and _policies_by_name indexes.
+        Returns None if the call fails, in which case lookups use per-resource API calls.
+        """
+        snapshot = {'UserDetailList': [], 'GroupDetailList': [], 'RoleDetailList': [], 'Policies': []}
+        try:
+            paginator = self.client.get_paginator('get_account_authorization_details')
+            for page in paginator.paginate(Filter=_SNAPSHOT_FILTER):
+                for key, entries in snapshot.items():
+                    entries.extend(page.get(key, []))
+        except Exception as e:
+            logger.warning("⚠️ Account authorization snapshot unavailable, using per-resource calls: %s", e)
+            self._users_by_name = {}
+            self._groups_by_name = {}
+            self._roles_by_name = {}
+            self._policies_by_name = {}
+            return None
+        
+        self._users_by_name = {u['UserName']: u for u in snapshot['UserDetailList']}
+        self._groups_by_name = {g['GroupName']: g for g in snapshot['GroupDetailList']}
+        self._roles_by_name = {r['RoleName']: r for r in snapshot['RoleDetailList']}
+        self._policies_by_name = {p['PolicyName']: p for p in snapshot['Policies']}
+        return snapshot
+
+    def _snapshot_entry(self, resource_type, resource_name):
+        """Snapshot detail for a user, role or policy; None if it is not in the snapshot or a fix has changed it."""
+        if (resource_type, resource_name) in self._stale_entries:
+            return None
+        index = {'user': self._users_by_name, 'role': self._roles_by_name, 'policy': self._policies_by_name}.get(resource_type, {})
+        return index.get(resource_name)
 
     def scan(self, user_intent_input=None, scope="account"):
         """
@@ -86,266 +400,362 @@ class IAMAgent:
                               e.g., {"user1": "least_privilege", "role1": "service_role"}
             scope: "account", "users", "roles", "policies", or specific resource name
         """
-        findings = []
+        unique_findings = {}  # (resource, normalized issue) -> first finding, in arrival order
+        # Raw (pre-dedup) finding counts; only the unique findings themselves are kept
+        resource_counts = Counter()
+        source_counts = Counter()
+        
+        # Intent is needed by every tier; detect each resource once per scan (configs are cached on the agent)
+        # and hand the detector the cached config so it does not re-fetch roles, policies and keys
+        @lru_cache(maxsize=None)
+        def _detect(resource_type, resource_name, user_intent):
+            return self.intent_detector.detect_intent(
+                resource_type, resource_name, self.client, user_intent,
+                prefetched=self._resource_config(resource_type, resource_name)
+            )
+        
+        self._refresh_auth_snapshot()
         
         # Determine scan scope
         resources_to_scan = self._get_scan_resources(scope)
         
-        # Step 1: Intent-aware rules-based detection
-        for resource_type, resource_list in resources_to_scan.items():
-            for resource in resource_list:
-                resource_name = self._get_resource_name(resource_type, resource)
-                
-                # Detect intent for this resource
-                user_intent = None
-                if user_intent_input:
-                    # Check for resource-specific intent first
-                    user_intent = user_intent_input.get(resource_name)
-                    # If no resource-specific intent, check for global intent
-                    if not user_intent:
-                        user_intent = user_intent_input.get('_global_intent')
-                
-                print(f"DEBUG: user_intent for {resource_name} ({resource_type}) = {user_intent}")
-                
-                intent, confidence, reasoning = self.intent_detector.detect_intent(
-                    resource_type, resource_name, self.client, user_intent
-                )
-                
-                print(f"🎯 Intent for {resource_name} ({resource_type}): {intent.value} (confidence: {confidence:.2f})")
-                print(f"   Reasoning: {reasoning}")
-                
-                # Get intent-specific recommendations
-                recommendations = self.intent_detector.get_intent_recommendations(intent, resource_type, resource_name)
-                
-                # Apply rules with intent context
-                for rule in self.rules:
-                    try:
-                        # Pass intent context to rule
-                        if hasattr(rule, 'check_with_intent'):
-                            # Intent-aware rules
-                            if rule.id in ["iam_intent_conversion"]:
-                                rule.intent_confidence = confidence  # Store confidence for auto_safe decision
-                            issue_found = rule.check_with_intent(self.client, resource_type, resource_name, intent, recommendations)
+        # Flatten once so every tier walks the same (resource_type, resource) pairs
+        pairs = [
+            (resource_type, resource)
+            for resource_type, resource_list in resources_to_scan.items()
+            for resource in resource_list
+        ]
+        
+        # Steps 1-2 (rules and knowledge base) run in one pass per resource on the pool.
+        # Results come back in pair order and are merged here, so no lock is needed.
+        with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as pool:
+            resource_scans = list(pool.map(lambda pair: self._scan_resource(*pair, _detect, user_intent_input), pairs))
+        
+        def iter_tier1():
+            """Step 1: Intent-aware rules-based detection, with doc search + LLM when no rule hits."""
+            for resource_scan in resource_scans:
+                yield from resource_scan.rule_findings
+            
+            # If no rule-based findings, try doc search + LLM with intent context
+            if not any(resource_scan.rule_hit for resource_scan in resource_scans):
+                for resource_type, resource_list in resources_to_scan.items():
+                    for resource in resource_list[:5]:  # Limit to first 5 for performance
+                        resource_name = self._get_resource_name(resource_type, resource)
+                        
+                        # Intent for this resource (cached by _detect for the rest of the scan)
+                        user_intent = user_intent_input.get(resource_name) if user_intent_input else None
+                        intent, confidence, reasoning = _detect(resource_type, resource_name, user_intent)
+                        
+                        # Step 2: Intent-aware doc search
+                        docs = self.doc_search.search(f"IAM {resource_type} {intent.value} misconfiguration", intent.value)
+                        if docs and isinstance(docs, dict):  # Enhanced docs with intent context
+                            yield {
+                                "service": "iam",
+                                "resource": resource_name,
+                                "resource_type": resource_type,
+                                "issue": f"Potential {intent.value} configuration issue",
+                                "note": docs,
+                                "rule_id": "doc_ref",
+                                "auto_safe": False,
+                                "source": "doc_search",
+                                "intent": intent.value,
+                                "intent_confidence": confidence
+                            }
+                        elif docs:  # Simple string response
+                            yield {
+                                "service": "iam",
+                                "resource": resource_name,
+                                "resource_type": resource_type,
+                                "issue": f"Potential {intent.value} configuration issue",
+                                "note": docs,
+                                "rule_id": "doc_ref",
+                                "auto_safe": False,
+                                "source": "doc_search",
+                                "intent": intent.value,
+                                "intent_confidence": confidence
+                            }
                         else:
-                            # Standard rules - pass appropriate parameters
-                            issue_found = self._call_rule_check(rule, resource_type, resource_name)
-                            
-                        if issue_found:
-                            # Adjust auto_safe based on intent
-                            auto_safe = self._should_auto_apply(rule, intent, resource_type, resource_name)
-                            
-                            # Get rule fix information
-                            fix_instructions = getattr(rule, 'fix_instructions', None)
-                            can_auto_fix = getattr(rule, 'can_auto_fix', False)
-                            fix_type = getattr(rule, 'fix_type', None)
-                            
-                            # DEBUG: Log for instruction details
-                            print(f"DEBUG: Rule {rule.id} - fix_instructions: {fix_instructions}")
-                            print(f"DEBUG: Rule {rule.id} - can_auto_fix: {can_auto_fix}")
-                            print(f"DEBUG: Rule {rule.id} - fix_type: {fix_type}")
-                            print(f"DEBUG: Rule {rule.id} - auto_safe: {auto_safe}")
-                            
-                            finding = {
+                            # Step 3: Intent-aware LLM fallback
+                            llm_fix = self.llm_fallback.suggest_fix(
+                                f"IAM {resource_type} {intent.value} configuration issue", 
+                                intent.value, 
+                                resource_name
+                            )
+                            yield {
                                 "service": "iam",
                                 "resource": resource_name,
                                 "resource_type": resource_type,
-                                "issue": rule.detection,
-                                "rule_id": rule.id,
-                                "auto_safe": auto_safe,
-                                "source": "rule",
+                                "issue": f"Unknown {intent.value} issue",
+                                "fix": llm_fix,
+                                "rule_id": "llm_fallback",
+                                "auto_safe": False,
+                                "source": "llm",
                                 "intent": intent.value,
-                                "intent_confidence": confidence,
-                                "intent_reasoning": reasoning,
-                                "recommendations": recommendations
+                                "intent_confidence": confidence
                             }
-                            
-                            # Add auto-fix action for auto-safe issues
-                            if auto_safe:
-                                finding["fix"] = self._create_auto_fix_action(rule, resource_type, resource_name)
-                            
-                            # Add fix info when available (for both auto and manual fixes)
-                            if fix_instructions:
-                                print(f"DEBUG: Adding fix instructions to finding for {resource_name}")
-                                finding.update({
-                                    "fix_instructions": fix_instructions,
-                                    "can_auto_fix": can_auto_fix,
-                                    "fix_type": fix_type
-                                })
-                            else:
-                                print(f"DEBUG: No fix instructions available for {resource_name}")
-                            
-                            findings.append(finding)
-                            
-                    except Exception as e:
-                        findings.append({
-                            "service": "iam",
-                            "resource": resource_name,
-                            "resource_type": resource_type,
-                            "issue": f"Error checking rule {rule.id}: {str(e)}",
-                            "rule_id": rule.id,
-                            "auto_safe": False,
-                            "source": "rule_error",
-                            "intent": intent.value if 'intent' in locals() else "unknown"
-                        })
+        
+        def iter_tier2():
+            """TIER 2: RAG-based detection (searched during the resource pass, yielded after TIER 1 to keep tier order)."""
+            logger.info("[IAMAgent] TIER 1 (Rules): Found %d total issues", source_counts['rule'])
+            
+            logger.info("[IAMAgent] TIER 2 (RAG): Starting knowledge base search...")
+            for resource_scan in resource_scans:
+                yield from resource_scan.rag_findings
+        
+        def iter_tier3():
+            """TIER 3: LLM fallback (LIMITED to 5 resources to avoid quota)."""
+            logger.info("[IAMAgent] TIER 2 (RAG): Found %d additional issues", source_counts['rag'])
+            
+            if not self.llm_analyzer:
+                logger.info("[IAMAgent] TIER 3 (LLM): Skipped - Gemini API not configured")
+                return
+            
+            max_llm_resources = 5  # Limit to avoid Gemini quota exhaustion
+            logger.info("[IAMAgent] TIER 3 (LLM): Starting Gemini analysis (limited to %d resources)...", max_llm_resources)
+            
+            # Only resources with fewer than 3 findings so far are sent to the LLM
+            llm_contexts = [
+                resource_scan.context for resource_scan in resource_scans
+                if resource_counts[resource_scan.context.resource_name] < 3
+            ]
+            if len(llm_contexts) > max_llm_resources:
+                logger.info("[IAMAgent] TIER 3 (LLM): Reached limit of %d resources, skipping remaining...", max_llm_resources)
+                llm_contexts = llm_contexts[:max_llm_resources]
+            
+            # One batched call; the analyzer keeps at most _LLM_CONCURRENCY Gemini requests in flight
+            llm_results = self.llm_analyzer.analyze_security_issues_batch(
+                service='iam',
+                items=[(ctx.resource_name, ctx.config, ctx.intent.value) for ctx in llm_contexts],
+                user_context=str(user_intent_input) if user_intent_input else "",
+                max_concurrency=_LLM_CONCURRENCY
+            )
+            
+            llm_findings_count = 0
+            for ctx, llm_findings in zip(llm_contexts, llm_results):
+                for llm_finding in llm_findings:
+                    llm_finding.update({'service': 'iam', 'source': 'llm', 'tier': 3, 'resource_type': ctx.resource_type,
+                                       'intent': ctx.intent.value, 'intent_confidence': ctx.confidence, 'rule_id': 'llm_fallback'})
+                    yield llm_finding
+                llm_findings_count += len(llm_findings)
+            
+            logger.info("[IAMAgent] TIER 3 (LLM): Found %d additional issues from %d resources", llm_findings_count, len(llm_contexts))
+        
+        # Tiers are consumed lazily in order, so TIER 3 sees the counts of TIERS 1-2
+        # and duplicates are dropped as they arrive instead of being collected first
+        log_duplicates = logger.isEnabledFor(logging.DEBUG)
+        for finding in chain(iter_tier1(), iter_tier2(), iter_tier3()):
+            resource_counts[finding.get("resource")] += 1
+            source_counts[finding.get("source")] += 1
+            
+            # Findings arrive in tier order, so the first one per key is from the preferred tier
+            key = (finding.get('resource', ''), finding.get('issue', '').casefold().strip())
+            if key not in unique_findings:
+                unique_findings[key] = finding
+            elif log_duplicates:
+                logger.debug("[IAMAgent] Dedup: Skipping duplicate from %s - %s", finding.get('source', 'unknown'), key[1])
+    
+        logger.info("[IAMAgent] Analysis Complete: %d unique findings", len(unique_findings))
+                        
+        # Step 4: Return normalized findings
+        return self.executor.format_for_fixer(list(unique_findings.values()))
+
+    def _resolve_user_intent(self, resource_name, user_intent_input):
+        """Explicit intent for a resource, falling back to the global intent."""
+        if not user_intent_input:
+            return None
+        # Check for resource-specific intent first
+        user_intent = user_intent_input.get(resource_name)
+        # If no resource-specific intent, check for global intent
+        if not user_intent:
+            user_intent = user_intent_input.get('_global_intent')
+        return user_intent
 
-        # If no rule-based findings, try doc search + LLM with intent context
-        if not any(f["source"] == "rule" for f in findings):
-            for resource_type, resource_list in resources_to_scan.items():
-                for resource in resource_list[:5]:  # Limit to first 5 for performance
-                    resource_name = self._get_resource_name(resource_type, resource)
+    def _scan_resource_rules(self, resource_type, resource, detect, user_intent_input=None):
+        """TIER 1: run every rule against one resource and return its findings; detect is the scan's intent lookup."""
+        findings = []
+        client = self.client
+        resource_name = self._get_resource_name(resource_type, resource)
+        
+        # Detect intent for this resource
+        user_intent = self._resolve_user_intent(resource_name, user_intent_input)
+        
+        logger.debug("DEBUG: user_intent for %s (%s) = %s", resource_name, resource_type, user_intent)
+        
+        intent, confidence, reasoning = detect(resource_type, resource_name, user_intent)
+        
+        logger.info("🎯 Intent for %s (%s): %s (confidence: %.2f)", resource_name, resource_type, intent.value, confidence)
+        logger.info("   Reasoning: %s", reasoning)
+        
+        # Get intent-specific recommendations
+        recommendations = self.intent_detector.get_intent_recommendations(intent, resource_type, resource_name)
+        
+        # Apply rules with intent context
+        # Only rules that apply to this resource type, e.g. no user-only rules on roles
+        for rule in self._thread_rules(resource_type):
+            try:
+                # Pass intent context to rule
+                if self._rule_dispatch[rule.id]["supports_intent"]:
+                    # Intent-aware rules
+                    if rule.id in ["iam_intent_conversion"]:
+                        rule.intent_confidence = confidence  # Store confidence for auto_safe decision
+                    issue_found = rule.check_with_intent(client, resource_type, resource_name, intent, recommendations)
+                else:
+                    # Standard rules - pass appropriate parameters
+                    issue_found = self._call_rule_check(rule, resource_type, resource_name)
                     
-                    # Get intent if not already detected
-                    if not any(f["resource"] == resource_name for f in findings):
-                        user_intent = user_intent_input.get(resource_name) if user_intent_input else None
-                        intent, confidence, reasoning = self.intent_detector.detect_intent(
-                            resource_type, resource_name, self.client, user_intent
-                        )
+                # Keep the state fix() will need, or forget it once the resource is clean
+                if issue_found:
+                    self._checked_rules[(rule.id, resource_type, resource_name)] = copy.copy(rule)
+                else:
+                    self._checked_rules.pop((rule.id, resource_type, resource_name), None)
                     
-                    # Step 2: Intent-aware doc search
-                    docs = self.doc_search.search(f"IAM {resource_type} {intent.value} misconfiguration", intent.value)
-                    if docs and isinstance(docs, dict):  # Enhanced docs with intent context
-                        findings.append({
-                            "service": "iam",
-                            "resource": resource_name,
-                            "resource_type": resource_type,
-                            "issue": f"Potential {intent.value} configuration issue",
-                            "note": docs,
-                            "rule_id": "doc_ref",
-                            "auto_safe": False,
-                            "source": "doc_search",
-                            "intent": intent.value,
-                            "intent_confidence": confidence
-                        })
-                    elif docs:  # Simple string response
-                        findings.append({
-                            "service": "iam",
-                            "resource": resource_name,
-                            "resource_type": resource_type,
-                            "issue": f"Potential {intent.value} configuration issue",
-                            "note": docs,
-                            "rule_id": "doc_ref",
-                            "auto_safe": False,
-                            "source": "doc_search",
-                            "intent": intent.value,
-                            "intent_confidence": confidence
+                if issue_found:
+                    # Adjust auto_safe based on intent
+                    auto_safe = self._should_auto_apply(rule, intent, resource_type, resource_name)
+                    
+                    # Get rule fix information
+                    fix_instructions = getattr(rule, 'fix_instructions', None)
+                    can_auto_fix = getattr(rule, 'can_auto_fix', False)
+                    fix_type = getattr(rule, 'fix_type', None)
+                    
+                    # DEBUG: Log for instruction details
+                    logger.debug("DEBUG: Rule %s - fix_instructions: %s", rule.id, fix_instructions)
+                    logger.debug("DEBUG: Rule %s - can_auto_fix: %s", rule.id, can_auto_fix)
+                    logger.debug("DEBUG: Rule %s - fix_type: %s", rule.id, fix_type)
+                    logger.debug("DEBUG: Rule %s - auto_safe: %s", rule.id, auto_safe)
+                    
+                    finding = {
+                        "service": "iam",
+                        "resource": resource_name,
+                        "resource_type": resource_type,
+                        "issue": rule.detection,
+                        "rule_id": rule.id,
+                        "auto_safe": auto_safe,
+                        "source": "rule",
+                        "intent": intent.value,
+                        "intent_confidence": confidence,
+                        "intent_reasoning": reasoning,
+                        "recommendations": recommendations
+                    }
+                    
+                    # Add auto-fix action for auto-safe issues
+                    if auto_safe:
+                        finding["fix"] = self._create_auto_fix_action(rule, resource_type, resource_name)
+                    
+                    # Add fix info when available (for both auto and manual fixes)
+                    if fix_instructions:
+                        logger.debug("DEBUG: Adding fix instructions to finding for %s", resource_name)
+                        finding.update({
+                            "fix_instructions": fix_instructions,
+                            "can_auto_fix": can_auto_fix,
+                            "fix_type": fix_type
                         })
                     else:
-                        # Step 3: Intent-aware LLM fallback
-                        llm_fix = self.llm_fallback.suggest_fix(
-                            f"IAM {resource_type} {intent.value} configuration issue", 
-                            intent.value, 
-                            resource_name
-                        )
-                        findings.append({
-                            "service": "iam",
-                            "resource": resource_name,
-                            "resource_type": resource_type,
-                            "issue": f"Unknown {intent.value} issue",
-                            "fix": llm_fix,
-                            "rule_id": "llm_fallback",
-                            "auto_safe": False,
-                            "source": "llm",
-                            "intent": intent.value,
-                            "intent_confidence": confidence
-                        })
+                        logger.debug("DEBUG: No fix instructions available for %s", resource_name)
+                    
+                    findings.append(finding)
+                    
+            except Exception as e:
+                findings.append({
+                    "service": "iam",
+                    "resource": resource_name,
+                    "resource_type": resource_type,
+                    "issue": f"Error checking rule {rule.id}: {str(e)}",
+                    "rule_id": rule.id,
+                    "auto_safe": False,
+                    "source": "rule_error",
+                    "intent": intent.value
+                })
         
-        # Count rule findings
-        rule_findings_count = sum(1 for f in findings if f.get("source") == "rule")
-        print(f"\n[IAMAgent] TIER 1 (Rules): Found {rule_findings_count} total issues")
-        
-        # TIER 2: RAG-based detection
-        print(f"\n[IAMAgent] TIER 2 (RAG): Starting knowledge base search...")
-        for resource_type, resource_list in resources_to_scan.items():
-            for resource in resource_list:
-                resource_name = self._get_resource_name(resource_type, resource)
-                user_intent = user_intent_input.get(resource_name) if user_intent_input else None
-                if not user_intent and user_intent_input:
-                    user_intent = user_intent_input.get('_global_intent')
-                
-                intent, confidence, reasoning = self.intent_detector.detect_intent(resource_type, resource_name, self.client, user_intent)
-                resource_config = self._get_resource_config(resource_type, resource_name)
-                
-                rag_findings = self.rag_search.search_security_issues(
-                    service='iam', configuration=resource_config, intent=intent.value, top_k=5
-                )
-                
-                for rag_finding in rag_findings:
-                    rag_finding.update({'resource': resource_name, 'service': 'iam', 'source': 'rag', 'tier': 2,
-                                       'intent': intent.value, 'intent_confidence': confidence, 'resource_type': resource_type})
-                    findings.append(rag_finding)
+        return findings
+
+    def _scan_resource(self, resource_type, resource, detect, user_intent_input=None):
+        """Run the rules and the knowledge base search for one resource in a single pass."""
+        rule_findings = self._scan_resource_rules(resource_type, resource, detect, user_intent_input)
+        ctx = self._resource_context(resource_type, resource, detect, user_intent_input)
         
-        rag_findings_count = sum(1 for f in findings if f.get("source") == "rag")
-        print(f"[IAMAgent] TIER 2 (RAG): Found {rag_findings_count} additional issues")
+        rag_findings = self.rag_search.search_security_issues(
+            service='iam', configuration=ctx.config, intent=ctx.intent.value, top_k=5
+        )
+        for rag_finding in rag_findings:
+            rag_finding.update({'resource': ctx.resource_name, 'service': 'iam', 'source': 'rag', 'tier': 2,
+                               'intent': ctx.intent.value, 'intent_confidence': ctx.confidence, 'resource_type': ctx.resource_type})
         
-        # TIER 3: LLM fallback (LIMITED to 5 resources to avoid quota)
-        if self.llm_analyzer:
-            print(f"\n[IAMAgent] TIER 3 (LLM): Starting Gemini analysis (limited to 5 resources)...")
-            llm_findings_count = 0
-            analyzed_count = 0
-            max_llm_resources = 5  # Limit to avoid Gemini quota exhaustion
-            
-            for resource_type, resource_list in resources_to_scan.items():
-                for resource in resource_list:
-                    if analyzed_count >= max_llm_resources:
-                        print(f"[IAMAgent] TIER 3 (LLM): Reached limit of {max_llm_resources} resources, skipping remaining...")
-                        break
-                        
-                    resource_name = self._get_resource_name(resource_type, resource)
-                    resource_findings = [f for f in findings if f.get("resource") == resource_name]
-                    
-                    if len(resource_findings) < 3:
-                        user_intent = user_intent_input.get(resource_name) if user_intent_input else None
-                        if not user_intent and user_intent_input:
-                            user_intent = user_intent_input.get('_global_intent')
-                        
-                        intent, confidence, reasoning = self.intent_detector.detect_intent(resource_type, resource_name, self.client, user_intent)
-                        resource_config = self._get_resource_config(resource_type, resource_name)
-                        
-                        llm_findings = self.llm_analyzer.analyze_security_issues(
-                            service='iam', resource_name=resource_name, configuration=resource_config,
-                            intent=intent.value, user_context=str(user_intent_input) if user_intent_input else ""
-                        )
-                        
-                        for llm_finding in llm_findings:
-                            llm_finding.update({'service': 'iam', 'source': 'llm', 'tier': 3, 'resource_type': resource_type,
-                                               'intent': intent.value, 'intent_confidence': confidence, 'rule_id': 'llm_fallback'})
-                            findings.append(llm_finding)
-                            llm_findings_count += 1
-                        
-                        analyzed_count += 1
-                
-                if analyzed_count >= max_llm_resources:
-                    break
-            
-            print(f"[IAMAgent] TIER 3 (LLM): Found {llm_findings_count} additional issues from {analyzed_count} resources")
-        else:
-            print(f"[IAMAgent] TIER 3 (LLM): Skipped - Gemini API not configured")
+        rule_hit = any(f["source"] == "rule" for f in rule_findings)
+        return _ResourceScan(ctx, rule_findings, rule_hit, rag_findings)
+
+    def _resource_context(self, resource_type, resource, detect, user_intent_input=None):
+        """Intent and configuration of one resource, as used by the RAG and LLM tiers."""
+        resource_name = self._get_resource_name(resource_type, resource)
+        user_intent = self._resolve_user_intent(resource_name, user_intent_input)
         
-        # Deduplicate
-        findings = self._deduplicate_findings(findings)
-        print(f"\n[IAMAgent] Analysis Complete: {len(findings)} unique findings\n")
-                        
-        # Step 4: Return normalized findings
-        return self.executor.format_for_fixer(findings)
+        intent, confidence, reasoning = detect(resource_type, resource_name, user_intent)
+        resource_config = self._resource_config(resource_type, resource_name)
+        return _ResourceContext(resource_type, resource_name, intent, confidence, resource_config)
 
     def _get_scan_resources(self, scope):
         """Get resources to scan based on scope."""
+        if self._auth_details is None:
+            return self._list_scan_resources(scope)
+        
+        resources = {}
+        
+        if scope == "account" or scope == "users":
+            resources['user'] = list(self._users_by_name.values())[:50]  # Limit for performance
+            
+        if scope == "account" or scope == "roles":
+            # Filter out AWS service roles to focus on customer roles, then limit for performance
+            customer_roles = (r for r in self._roles_by_name.values() if not r['RoleName'].startswith(EXCLUDED_ROLE_PREFIXES))
+            resources['role'] = list(islice(customer_roles, 50))
+            
+        if scope == "account" or scope == "policies":
+            resources['policy'] = list(self._policies_by_name.values())[:30]  # Customer managed only
+            
+        # Handle specific resource name
+        if scope not in ["account", "users", "roles", "policies"]:
+            if scope in self._users_by_name:
+                resources['user'] = [self._users_by_name[scope]]
+            elif scope in self._roles_by_name:
+                resources['role'] = [self._roles_by_name[scope]]
+            elif scope in self._policies_by_name:
+                resources['policy'] = [self._policies_by_name[scope]]
+            else:
+                matching_policy = [p for p in self._policies_by_name.values() if p['Arn'] == scope]
+                if matching_policy:
+                    resources['policy'] = matching_policy
+                else:
+                    # Not in the snapshot (e.g. an AWS managed policy ARN)
+                    return self._list_scan_resources(scope)
+                    
+        return resources
+
+    def _list_scan_resources(self, scope):
+        """Get resources to scan with per-type list calls when no snapshot is available."""
         resources = {}
         
         try:
             if scope == "account" or scope == "users":
-                users = self.client.list_users().get('Users', [])[:50]  # Limit for performance
-                resources['user'] = users
+                # MaxItems stops paginating once the limit is reached instead of dropping later pages
+                pages = self.client.get_paginator('list_users').paginate(
+                    PaginationConfig={'MaxItems': 50, 'PageSize': 50}  # Limit for performance
+                )
+                resources['user'] = pages.build_full_result().get('Users', [])
                 
             if scope == "account" or scope == "roles":
-                roles = self.client.list_roles().get('Roles', [])[:50]  # Limit for performance
-                # Filter out AWS service roles to focus on customer roles
-                customer_roles = [r for r in roles if not r['RoleName'].startswith('aws-')]
-                resources['role'] = customer_roles
+                pages = self.client.get_paginator('list_roles').paginate(PaginationConfig={'PageSize': 100})
+                # Filter out AWS service roles to focus on customer roles; pages are fetched only until 50 are found
+                customer_roles = (
+                    r for page in pages for r in page.get('Roles', [])
+                    if not r['RoleName'].startswith(EXCLUDED_ROLE_PREFIXES)
+                )
+                resources['role'] = list(islice(customer_roles, 50))  # Limit for performance
                 
             if scope == "account" or scope == "policies":
-                policies = self.client.list_policies(Scope='Local').get('Policies', [])[:30]  # Customer managed only
-                resources['policy'] = policies
+                pages = self.client.get_paginator('list_policies').paginate(
+                    Scope='Local',  # Customer managed only
+                    PaginationConfig={'MaxItems': 30, 'PageSize': 30}
+                )
+                resources['policy'] = pages.build_full_result().get('Policies', [])
                 
             # Handle specific resource name
             if scope not in ["account", "users", "roles", "policies"]:
@@ -364,16 +774,16 @@ class IAMAgent:
                                 policy = self.client.get_policy(PolicyArn=scope)
                                 resources['policy'] = [policy['Policy']]
                             else:
-                                # Search for policy by name
-                                policies = self.client.list_policies(Scope='Local').get('Policies', [])
-                                matching_policy = [p for p in policies if p['PolicyName'] == scope]
+                                # Search for policy by name across every page
+                                pages = self.client.get_paginator('list_policies').paginate(Scope='Local')
+                                matching_policy = [p for page in pages for p in page.get('Policies', []) if p['PolicyName'] == scope]
                                 if matching_policy:
                                     resources['policy'] = matching_policy
                         except:
-                            print(f"⚠️ Resource '{scope}' not found")
+                            logger.warning("⚠️ Resource '%s' not found", scope)
                             
         except Exception as e:
-            print(f"❌ Error getting scan resources: {e}")
+            logger.error("❌ Error getting scan resources: %s", e)
             
         return resources
 
@@ -391,25 +801,10 @@ class IAMAgent:
     def _call_rule_check(self, rule, resource_type, resource_name):
         """Call rule check method with appropriate parameters."""
         try:
-            if rule.id == "iam_mfa_enforcement":
-                return rule.check(self.client, resource_name)
-            elif rule.id == "iam_least_privilege":
-                return rule.check(self.client, resource_type, resource_name)
-            elif rule.id == "iam_access_key_rotation":
-                if resource_type == "user":
-                    return rule.check(self.client, resource_name)
-                else:
-                    return False  # Only applies to users
-            elif rule.id == "iam_inactive_user":
-                if resource_type == "user":
-                    return rule.check(self.client, resource_name)
-                else:
-                    return False  # Only applies to users
-            else:
-                # Try generic check method
-                return rule.check(self.client, resource_type, resource_name)
+            check = self._rule_dispatch[rule.id]["check"]
+            return check(rule, self.client, resource_type, resource_name)
         except Exception as e:
-            print(f"⚠️ Error calling rule check for {rule.id}: {e}")
+            logger.warning("⚠️ Error calling rule check for %s: %s", rule.id, e)
             return False
 
     def _should_auto_apply(self, rule, intent, resource_type, resource_name):
@@ -418,97 +813,37 @@ class IAMAgent:
         
         This prevents dangerous auto-fixes like removing admin access for service accounts.
         """
-        from .intent_detector import IAMIntent
-        
         # Intent conversion rule - check confidence for explicit user intent
         if rule.id == "iam_intent_conversion":
             rule_confidence = getattr(rule, 'intent_confidence', 0.0)
-            print(f"DEBUG: Intent conversion rule confidence: {rule_confidence}")
+            logger.debug("DEBUG: Intent conversion rule confidence: %s", rule_confidence)
             if rule_confidence >= 1.0:  # Explicit user intent
-                print(f"✅ Explicit user intent ({rule_confidence:.2f}) - auto-enabling intent conversion")
+                logger.info("✅ Explicit user intent (%.2f) - auto-enabling intent conversion", rule_confidence)
                 return True
             else:
-                print(f"⚠️ Intent conversion detected for {resource_name} - requiring manual review (confidence: {rule_confidence})")
+                logger.info("⚠️ Intent conversion detected for %s - requiring manual review (confidence: %s)", resource_name, rule_confidence)
                 return False  # Manual review for inferred intent conflicts
         
-        # Least privilege intent - be careful with permission reduction
-        if intent == IAMIntent.LEAST_PRIVILEGE:
-            if rule.id == "iam_least_privilege":
-                # Only auto-fix low-risk violations
-                risk_score = getattr(rule, 'risk_score', 50)
-                if risk_score < 20:  # Low risk
-                    return True
-                else:
-                    print(f"⚠️ High-risk privilege violations detected - requiring manual review")
-                    return False
-            elif rule.id == "iam_mfa_enforcement":
-                return True  # Safe to auto-enforce MFA for least privilege intent
-                
-        # Strong security intent - apply security rules
-        elif intent == IAMIntent.STRONG_SECURITY:
-            if rule.id in ["iam_mfa_enforcement", "iam_access_key_rotation"]:
-                return True  # Auto-apply security rules
-            elif rule.id == "iam_least_privilege":
-                # Be cautious with permission changes
-                return False
-                
-        # Service account intent - be very careful
-        elif intent == IAMIntent.SERVICE_ACCOUNT:
-            if rule.id == "iam_mfa_enforcement":
-                return False  # Service accounts typically don't need MFA
-            elif rule.id == "iam_inactive_user":
-                return False  # Service accounts may appear inactive but be used programmatically
-                
-        # Developer flexibility - don't restrict too much
-        elif intent == IAMIntent.DEVELOPER_FLEXIBILITY:
-            if rule.id == "iam_least_privilege":
-                return False  # Don't auto-restrict developer permissions
-            elif rule.id == "iam_mfa_enforcement":
-                return True   # Still enforce MFA for developers
-                
-        # Compliance intent - apply all security rules
-        elif intent == IAMIntent.COMPLIANCE:
-            if rule.id in ["iam_mfa_enforcement", "iam_access_key_rotation", "iam_inactive_user"]:
-                return True
-            elif rule.id == "iam_least_privilege":
-                return False  # Manual review for compliance
-                
-        # For unknown intent, be conservative
-        elif intent == IAMIntent.UNKNOWN:
-            if rule.id in ["iam_mfa_enforcement", "iam_access_key_rotation"]:
-                return False  # Don't auto-fix if not sure of intent
-                
+        entry = _AUTO_APPLY.get((rule.id, intent))
+        if callable(entry):
+            return entry(getattr(rule, 'risk_score', 50))
+        if entry is not None:
+            return entry
+        
         # Default to rule's original auto_safe setting
         return getattr(rule, 'auto_safe', False)
 
     def _create_auto_fix_action(self, rule, resource_type, resource_name):
         """Create auto-fix action based on rule and resource."""
-        if rule.id == "iam_mfa_enforcement":
-            return {
-                "action": "enforce_mfa",
-                "params": {"user_name": resource_name}
-            }
-        elif rule.id == "iam_access_key_rotation":
-            return {
-                "action": "deactivate_unused_keys", 
-                "params": {"user_name": resource_name}
-            }
-        elif rule.id == "iam_inactive_user":
-            return {
-                "action": "disable_inactive_user",
-                "params": {"user_name": resource_name}
-            }
-        elif rule.id == "iam_least_privilege":
-            return {
-                "action": "add_mfa_conditions",
-                "params": {"resource_type": resource_type, "resource_name": resource_name}
-            }
-        else:
-            # Generic fix - let the rule handle it
-            return {
-                "action": "rule_based_fix",
-                "params": {"rule_id": rule.id, "resource_type": resource_type, "resource_name": resource_name}
-            }
+        build_action = self._rule_dispatch[rule.id]["auto_fix_action"]
+        if build_action:
+            return build_action(resource_type, resource_name)
+        
+        # Generic fix - let the rule handle it
+        return {
+            "action": "rule_based_fix",
+            "params": {"rule_id": rule.id, "resource_type": resource_type, "resource_name": resource_name}
+        }
 
     def apply_fix(self, finding):
         """
@@ -521,6 +856,11 @@ class IAMAgent:
                         # Call rule fix with appropriate parameters
                         result = self._call_rule_fix(rule, finding)
                         if isinstance(result, dict) and result.get('success'):
+                            self._checked_rules.pop((rule.id, finding.get('resource_type', 'user'), finding['resource']), None)
+                            # The fix changed the resource, so its snapshot entry and cached lookups are stale
+                            self._stale_entries.add((finding.get('resource_type', 'user'), finding['resource']))
+                            self._config_cache.pop((finding.get('resource_type', 'user'), finding['resource']), None)
+                            self.intent_detector.invalidate(finding['resource'])
                             return f"✅ Applied fix for {rule.id} on {finding['resource']}"
                         else:
                             error_msg = result.get('message', 'Unknown error') if isinstance(result, dict) else str(result)
@@ -537,69 +877,99 @@ class IAMAgent:
         resource_type = finding.get('resource_type', 'user')
         
         try:
-            if rule.id == "iam_mfa_enforcement":
-                return rule.fix(self.client, resource_name)
-            elif rule.id == "iam_least_privilege":
-                return rule.fix(self.client, resource_type, resource_name)
-            elif rule.id == "iam_access_key_rotation":
-                return rule.fix(self.client, auto_approve=True)
-            elif rule.id == "iam_inactive_user":
-                return rule.fix(self.client, fix_option="disable", auto_approve=True)
-            elif rule.id == "iam_intent_conversion":
-                return rule.fix(self.client, resource_type, resource_name)
-            else:
-                # Try generic fix method
-                return rule.fix(self.client, resource_name)
+            fix = self._rule_dispatch[rule.id]["fix"]
+            return fix(self._checked_rule(rule, resource_type, resource_name), self.client, resource_type, resource_name)
         except Exception as e:
             return {"success": False, "message": str(e)}
 
+    def _checked_rule(self, rule, resource_type, resource_name):
+        """Rule instance holding the check state for a resource; re-checks it if this agent did not flag it."""
+        checked = self._checked_rules.get((rule.id, resource_type, resource_name))
+        if checked is None:
+            # e.g. a finding from another agent's scan; fix() needs what check() found
+            checked = type(rule)()
+            if not self._rule_dispatch[rule.id]["supports_intent"]:
+                self._rule_dispatch[rule.id]["check"](checked, self.client, resource_type, resource_name)
+        return checked
+
     def get_scan_summary(self, findings):
         """Get a summary of scan results."""
-        summary = {
-            "total_findings": len(findings),
-            "auto_fixable": len([f for f in findings if f.get("auto_safe")]),
-            "manual_review": len([f for f in findings if not f.get("auto_safe")]),
-            "by_resource_type": {},
-            "by_intent": {},
-            "by_severity": {"critical": 0, "high": 0, "medium": 0, "low": 0}
-        }
-        
+        # Intern resource types and intents to small ids (first-seen order) so counting runs on int arrays
+        resource_type_ids = {}
+        intent_ids = {}
+        rt_ids = []
+        intent_id_list = []
+        sev_ids = []
         for finding in findings:
-            # Count by resource type
-            resource_type = finding.get("resource_type", "unknown")
-            summary["by_resource_type"][resource_type] = summary["by_resource_type"].get(resource_type, 0) + 1
-            
-            # Count by intent
-            intent = finding.get("intent", "unknown")
-            summary["by_intent"][intent] = summary["by_intent"].get(intent, 0) + 1
-            
+            rt_ids.append(resource_type_ids.setdefault(finding.get("resource_type", "unknown"), len(resource_type_ids)))
+            intent_id_list.append(intent_ids.setdefault(finding.get("intent", "unknown"), len(intent_ids)))
             # Count by severity (if available in rule)
-            severity = finding.get("severity", "medium")
-            if severity in summary["by_severity"]:
-                summary["by_severity"][severity] += 1
+            sev_ids.append(_SEVERITY_IDS.get(finding.get("severity", "medium"), _OTHER_SEVERITY_ID))
+        
+        rt_counts, intent_counts, sev_counts = _tally(
+            np.array(rt_ids, dtype=np.int32),
+            np.array(intent_id_list, dtype=np.int32),
+            np.array(sev_ids, dtype=np.int32),
+            len(resource_type_ids),
+            len(intent_ids),
+        )
         
-        return summary
+        auto_fixable = sum(1 for f in findings if f.get("auto_safe"))
+        return {
+            "total_findings": len(findings),
+            "auto_fixable": auto_fixable,
+            "manual_review": len(findings) - auto_fixable,
+            "by_resource_type": {name: int(rt_counts[i]) for name, i in resource_type_ids.items()},
+            "by_intent": {name: int(intent_counts[i]) for name, i in intent_ids.items()},
+            "by_severity": {severity: int(sev_counts[i]) for i, severity in enumerate(_SUMMARY_SEVERITIES)}
+        }
 
     def _get_resource_config(self, resource_type: str, resource_name: str) -> dict:
         """Collect comprehensive resource configuration for analysis"""
         config = {'resource_type': resource_type, 'resource_name': resource_name}
+        client = self.client
         
         try:
-            if resource_type == 'user':
-                config['user'] = self.client.get_user(UserName=resource_name)
-                config['policies'] = self.client.list_attached_user_policies(UserName=resource_name).get('AttachedPolicies', [])
+            detail = self._snapshot_entry(resource_type, resource_name)
+            if resource_type == 'user' and detail is not None:
+                config['user'] = {'User': _strip_detail(detail, _USER_DETAIL_KEYS)}
+                config['policies'] = detail.get('AttachedManagedPolicies', [])
+                config['inline_policies'] = detail.get('UserPolicyList', [])
+                config['groups'] = [
+                    _strip_detail(self._groups_by_name.get(group_name, {'GroupName': group_name}), _GROUP_DETAIL_KEYS)
+                    for group_name in detail.get('GroupList', [])
+                ]
+                # Access keys and MFA devices are not part of the snapshot
+                config['access_keys'] = client.list_access_keys(UserName=resource_name).get('AccessKeyMetadata', [])
                 try:
-                    config['groups'] = self.client.list_groups_for_user(UserName=resource_name).get('Groups', [])
+                    config['mfa_devices'] = client.list_mfa_devices(UserName=resource_name).get('MFADevices', [])
+                except Exception:
+                    config['mfa_devices'] = []
+            elif resource_type == 'role' and detail is not None:
+                config['role'] = {'Role': _strip_detail(detail, _ROLE_DETAIL_KEYS)}
+                config['policies'] = detail.get('AttachedManagedPolicies', [])
+            elif resource_type == 'policy' and detail is not None:
+                config['policy'] = {'Policy': _strip_detail(detail, _POLICY_DETAIL_KEYS)}
+                default_version = next(
+                    (v for v in detail.get('PolicyVersionList', []) if v.get('IsDefaultVersion')), None
+                )
+                if default_version:
+                    config['policy_version'] = {'PolicyVersion': default_version}
+            elif resource_type == 'user':
+                config['user'] = client.get_user(UserName=resource_name)
+                config['policies'] = client.list_attached_user_policies(UserName=resource_name).get('AttachedPolicies', [])
+                try:
+                    config['groups'] = client.list_groups_for_user(UserName=resource_name).get('Groups', [])
                 except Exception:
                     config['groups'] = []  # Handle permission errors gracefully
-                config['access_keys'] = self.client.list_access_keys(UserName=resource_name).get('AccessKeyMetadata', [])
+                config['access_keys'] = client.list_access_keys(UserName=resource_name).get('AccessKeyMetadata', [])
                 try:
-                    config['mfa_devices'] = self.client.list_mfa_devices(UserName=resource_name).get('MFADevices', [])
+                    config['mfa_devices'] = client.list_mfa_devices(UserName=resource_name).get('MFADevices', [])
                 except:
                     config['mfa_devices'] = []
             elif resource_type == 'role':
-                config['role'] = self.client.get_role(RoleName=resource_name)
-                config['policies'] = self.client.list_attached_role_policies(RoleName=resource_name).get('AttachedPolicies', [])
+                config['role'] = client.get_role(RoleName=resource_name)
+                config['policies'] = client.list_attached_role_policies(RoleName=resource_name).get('AttachedPolicies', [])
             elif resource_type == 'policy':
                 # Construct full ARN if only policy name is provided
                 policy_arn = resource_name
@@ -611,37 +981,18 @@ class IAMAgent:
                         account_id = sts.get_caller_identity()['Account']
                         policy_arn = f"arn:aws:iam::{account_id}:policy/{resource_name}"
                     except Exception as e:
-                        print(f"Warning: Could not construct policy ARN for {resource_name}: {e}")
+                        logger.warning("Could not construct policy ARN for %s: %s", resource_name, e)
                         return config
                 
                 try:
-                    config['policy'] = self.client.get_policy(PolicyArn=policy_arn)
-                    config['policy_version'] = self.client.get_policy_version(
+                    config['policy'] = client.get_policy(PolicyArn=policy_arn)
+                    config['policy_version'] = client.get_policy_version(
                         PolicyArn=policy_arn,
                         VersionId=config['policy']['Policy']['DefaultVersionId']
                     )
                 except Exception as e:
-                    print(f"Warning: Could not get policy details for {policy_arn}: {e}")
+                    logger.warning("Could not get policy details for %s: %s", policy_arn, e)
         except Exception as e:
-            print(f"Error getting config for {resource_type} {resource_name}: {e}")
+            logger.error("Error getting config for %s %s: %s", resource_type, resource_name, e)
         
         return config
-
-    def _deduplicate_findings(self, findings: list) -> list:
-        """Remove duplicate findings across detection tiers (prefer rules > rag > llm)"""
-        seen = {}
-        unique = []
-        
-        for finding in sorted(findings, key=lambda x: x.get('tier', 0)):
-            resource = finding.get('resource', '')
-            issue = finding.get('issue', '').lower().strip()
-            key = (resource, issue)
-            
-            if key not in seen:
-                seen[key] = True
-                unique.append(finding)
-            else:
-                source = finding.get('source', 'unknown')
-                print(f"[IAMAgent] Dedup: Skipping duplicate from {source} - {issue}")
-        
-        return unique
@@ -2,8 +2,22 @@
 
 import re
 import json
+import logging
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
+from types import MappingProxyType
+
+from cachetools import LRUCache, TTLCache, cached
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ahocorasick
+except ImportError:  # _KeywordMatcher uses one regex per keyword list instead
+    ahocorasick = None
 
 
 class IAMIntent(Enum):
@@ -19,6 +33,279 @@ class IAMIntent(Enum):
     UNKNOWN = "unknown"
 
 
+# Lowercases an IAM name and turns the separators IAM allows (_+=,.@-) into spaces in one pass;
+# indicators contain none of them, so substring matches are unaffected
+_NAME_TABLE = str.maketrans(string.ascii_uppercase + '_+=,.@-', string.ascii_lowercase + ' ' * 7)
+
+# Threads shared by all detections for the independent IAM calls behind _auto_detect_intent
+_DETECT_WORKERS = 8
+
+# One pool for every detector; only leaf API calls are submitted, so tasks never wait on each other
+_detect_pool = ThreadPoolExecutor(max_workers=_DETECT_WORKERS, thread_name_prefix="iam-intent")
+
+# Auto-detected intents kept per (resource_type, resource_name)
+_INTENT_CACHE_SIZE = 4096
+_INTENT_CACHE_TTL = 300  # seconds
+
+# Explicit user intent phrases accepted by detect_intent (keys are casefolded)
+_USER_INTENT_MAP: Dict[str, IAMIntent] = {
+    'least privilege': IAMIntent.LEAST_PRIVILEGE,
+    'least_privilege': IAMIntent.LEAST_PRIVILEGE,
+    'minimal': IAMIntent.LEAST_PRIVILEGE,
+    'security': IAMIntent.STRONG_SECURITY,
+    'strong security': IAMIntent.STRONG_SECURITY,
+    'secure': IAMIntent.STRONG_SECURITY,
+    'service': IAMIntent.SERVICE_ACCOUNT,
+    'service account': IAMIntent.SERVICE_ACCOUNT,
+    'application': IAMIntent.SERVICE_ACCOUNT,
+    'developer': IAMIntent.DEVELOPER_FLEXIBILITY,
+    'development': IAMIntent.DEVELOPER_FLEXIBILITY,
+    'dev': IAMIntent.DEVELOPER_FLEXIBILITY,
+    'compliance': IAMIntent.COMPLIANCE,
+    'audit': IAMIntent.COMPLIANCE,
+    'admin': IAMIntent.ADMIN_ACCESS,
+    'administrator': IAMIntent.ADMIN_ACCESS,
+    'operational': IAMIntent.OPERATIONAL_EFFICIENCY,
+    'operations': IAMIntent.OPERATIONAL_EFFICIENCY,
+    'automation': IAMIntent.AUTOMATION_ROLE,
+    'deploy': IAMIntent.AUTOMATION_ROLE,
+    'deployment': IAMIntent.AUTOMATION_ROLE
+}
+
+# Description categories in priority order: intent, confidence, reasoning and keywords
+_DESCRIPTION_CATEGORIES = (
+    (IAMIntent.STRONG_SECURITY, 0.9, "Description contains security keywords",
+     ('security', 'secure', 'mfa', 'encryption', 'compliance', 'audit')),
+    (IAMIntent.SERVICE_ACCOUNT, 0.8, "Description contains service account keywords",
+     ('service', 'application', 'app', 'system', 'automated', 'lambda', 'ec2')),
+    (IAMIntent.DEVELOPER_FLEXIBILITY, 0.8, "Description contains development keywords",
+     ('developer', 'development', 'testing', 'sandbox', 'experimental')),
+    (IAMIntent.ADMIN_ACCESS, 0.8, "Description contains admin keywords",
+     ('admin', 'administrator', 'full access', 'everything', 'manage all')),
+    (IAMIntent.COMPLIANCE, 0.8, "Description contains compliance keywords",
+     ('compliance', 'audit', 'readonly', 'monitor', 'logging', 'governance')),
+    (IAMIntent.AUTOMATION_ROLE, 0.8, "Description contains automation keywords",
+     ('automation', 'deploy', 'pipeline', 'ci/cd', 'terraform', 'ansible'))
+)
+
+
+class _KeywordMatcher:
+    """
+    Find the highest-priority keyword list with a substring match in the text.
+    Uses one Aho-Corasick pass when pyahocorasick is installed, else one regex per list.
+    """
+    
+    __slots__ = ('_automaton', '_patterns', '_ranks')
+    
+    def __init__(self, keyword_lists):
+        # Keyword -> index of the first list containing it (lower is checked first)
+        self._ranks = {}
+        for rank, keywords in enumerate(keyword_lists):
+            for keyword in keywords:
+                self._ranks.setdefault(keyword, rank)
+        
+        # A keyword containing another keyword of equal or higher priority can never change
+        # the result (e.g. 'developer' contains 'dev'), so only the rest are searched for
+        searched = {
+            keyword: rank for keyword, rank in self._ranks.items()
+            if not any(other != keyword and other in keyword and other_rank <= rank
+                       for other, other_rank in self._ranks.items())
+        }
+        
+        self._automaton = None
+        self._patterns = ()
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, rank in searched.items():
+                self._automaton.add_word(keyword, rank)
+            self._automaton.make_automaton()
+        else:
+            # One alternation per list, searched in priority order; no word boundaries,
+            # so keywords still match inside longer words as a substring test would
+            by_rank = {}
+            for keyword, rank in searched.items():
+                by_rank.setdefault(rank, []).append(keyword)
+            self._patterns = tuple(
+                (rank, re.compile("|".join(map(re.escape, by_rank[rank]))))
+                for rank in sorted(by_rank)
+            )
+    
+    def first_match(self, text):
+        """Index of the first keyword list with a keyword in text, or None."""
+        # Whole-word hits are hash lookups; a hit on the first list cannot be outranked
+        if any(self._ranks.get(token) == 0 for token in text.split()):
+            return 0
+        
+        if self._automaton is not None:
+            return min((rank for _, rank in self._automaton.iter(text)), default=None)
+        return next((rank for rank, pattern in self._patterns if pattern.search(text)), None)
+
+
+_DESCRIPTION_MATCHER = _KeywordMatcher([keywords for _, _, _, keywords in _DESCRIPTION_CATEGORIES])
+
+# Attached policy name fragments (substring matches) by what they suggest
+_ADMIN_POLICY_RE = re.compile('AdministratorAccess|PowerUserAccess|IAMFullAccess')
+_READONLY_POLICY_RE = re.compile('ReadOnlyAccess|SecurityAudit|ViewOnlyAccess')
+_SERVICE_POLICY_RE = re.compile('AmazonEC2FullAccess|AmazonS3FullAccess|AWSLambdaExecute')
+
+# Policy action fragments (substring matches) counted by _classify_policy_document
+_DANGEROUS_ACTION_RE = re.compile(r'\*|iam:|sts:AssumeRole|Delete|Terminate')
+_READONLY_ACTION_RE = re.compile('List|Get|Describe|View')
+
+# Policy versions are immutable and AWS managed policy ARNs are the same in every account,
+# so (PolicyArn, VersionId) -> inferred intent can be shared by all detectors
+_POLICY_CLASSIFICATIONS = LRUCache(maxsize=2048)
+
+
+@cached(
+    _POLICY_CLASSIFICATIONS,
+    key=lambda client, policy_arn, version_id: (policy_arn, version_id),
+    lock=threading.Lock()
+)
+def _classify_policy_version(client, policy_arn, version_id):
+    """Fetch one policy version and infer intent from its actions; cached process-wide."""
+    policy_version = client.get_policy_version(PolicyArn=policy_arn, VersionId=version_id)
+    return _classify_policy_document(policy_version['PolicyVersion']['Document'])
+
+
+def _classify_policy_document(policy_document):
+    """Infer intent from the Allow actions of a policy document."""
+    statements = policy_document.get('Statement', [])
+    if isinstance(statements, dict):
+        statements = [statements]
+    
+    # Flatten the Allow statements' actions once, then classify a plain list of strings
+    allow_actions = []
+    for statement in statements:
+        if statement.get('Effect') == 'Allow':
+            actions = statement.get('Action', [])
+            if isinstance(actions, str):
+                allow_actions.append(actions)
+            else:
+                allow_actions.extend(actions)
+    
+    total_actions = len(allow_actions)
+    wildcard_actions = sum(1 for action in allow_actions if '*' in action)
+    dangerous_actions = sum(1 for action in allow_actions if _DANGEROUS_ACTION_RE.search(action))
+    readonly_actions = sum(1 for action in allow_actions if _READONLY_ACTION_RE.search(action))
+    
+    # Analyze intent based on action patterns
+    if wildcard_actions > 0 and dangerous_actions > total_actions * 0.3:
+        return IAMIntent.ADMIN_ACCESS, 0.8, f"Policy has wildcards and dangerous actions: {dangerous_actions}/{total_actions}"
+    
+    if readonly_actions > total_actions * 0.8:
+        return IAMIntent.COMPLIANCE, 0.7, f"Policy is mostly readonly: {readonly_actions}/{total_actions}"
+    
+    if total_actions > 20:
+        return IAMIntent.OPERATIONAL_EFFICIENCY, 0.6, f"Policy has many actions: {total_actions}"
+    
+    if total_actions <= 5:
+        return IAMIntent.LEAST_PRIVILEGE, 0.7, f"Policy has few actions: {total_actions}"
+    
+    return IAMIntent.SERVICE_ACCOUNT, 0.4, f"Standard policy with {total_actions} actions"
+
+
+# Recommendations per intent, built once at import and shared by all detectors
+_INTENT_RECOMMENDATIONS = MappingProxyType({
+    IAMIntent.LEAST_PRIVILEGE: {
+        "security": {
+            "mfa": "Enable MFA for all users",
+            "policies": "Use minimal required permissions only",
+            "conditions": "Add conditions for IP, time, and MFA requirements"
+        },
+        "configuration": {
+            "access_keys": "Rotate access keys regularly (90 days max)",
+            "groups": "Use groups instead of direct policy attachment",
+            "roles": "Use roles for temporary access"
+        },
+        "best_practices": {
+            "monitoring": "Enable CloudTrail for all API activities",
+            "review": "Regular access review and permission audits"
+        }
+    },
+    IAMIntent.STRONG_SECURITY: {
+        "security": {
+            "mfa": "Require MFA for all console and API access",
+            "policies": "Use deny policies for sensitive actions",
+            "conditions": "Require MFA, IP restrictions, and time bounds"
+        },
+        "configuration": {
+            "access_keys": "Short-lived access keys (30-60 days)",
+            "password_policy": "Strong password policy with complexity requirements",
+            "session_duration": "Short session duration for roles"
+        },
+        "monitoring": {
+            "alerts": "Set up alerts for privilege escalation attempts",
+            "logging": "Comprehensive logging and monitoring"
+        }
+    },
+    IAMIntent.SERVICE_ACCOUNT: {
+        "security": {
+            "mfa": "No MFA required for service accounts",
+            "access_keys": "Use IAM roles instead of access keys when possible",
+            "policies": "Minimal permissions for specific services only"
+        },
+        "configuration": {
+            "trust_policy": "Restrict trust policy to specific services",
+            "conditions": "Add source IP or VPC conditions",
+            "session_duration": "Set appropriate session duration"
+        },
+        "best_practices": {
+            "rotation": "Automate credential rotation",
+            "monitoring": "Monitor for unusual API usage patterns"
+        }
+    },
+    IAMIntent.DEVELOPER_FLEXIBILITY: {
+        "security": {
+            "mfa": "Enable MFA for console access",
+            "sandbox": "Use sandbox environments for testing",
+            "policies": "Broad permissions within development boundaries"
+        },
+        "configuration": {
+            "environment": "Separate development, staging, production access",
+            "time_bounds": "Time-limited access to production resources",
+            "groups": "Use developer groups for permission management"
+        },
+        "best_practices": {
+            "training": "Security awareness training for developers",
+            "code_review": "Review IAM changes in code reviews"
+        }
+    },
+    IAMIntent.COMPLIANCE: {
+        "security": {
+            "readonly": "Prefer readonly access for audit functions",
+            "mfa": "Require MFA for all compliance users",
+            "logging": "Enable detailed logging for all activities"
+        },
+        "configuration": {
+            "separation": "Separate compliance roles from operational roles",
+            "approval": "Require approval for privilege changes",
+            "documentation": "Document all permission grants"
+        },
+        "monitoring": {
+            "auditing": "Regular compliance audits and reviews",
+            "reporting": "Automated compliance reporting"
+        }
+    },
+    IAMIntent.ADMIN_ACCESS: {
+        "security": {
+            "mfa": "Require MFA for all admin operations",
+            "break_glass": "Use break-glass procedures for emergency access",
+            "conditions": "Strict conditions on admin permissions"
+        },
+        "configuration": {
+            "just_in_time": "Use just-in-time access for admin operations",
+            "approval": "Multi-person approval for admin changes",
+            "monitoring": "Real-time monitoring of admin activities"
+        },
+        "best_practices": {
+            "principle": "Use admin access sparingly and temporarily",
+            "delegation": "Delegate specific admin tasks to specialized roles"
+        }
+    }
+})
+
+
 class IAMIntentDetector:
     """
     Detects user intent for IAM resources through multiple methods:
@@ -28,34 +315,61 @@ class IAMIntentDetector:
     """
     
     def __init__(self):
-        self.service_account_indicators = [
+        self.service_account_indicators = frozenset([
             'service', 'app', 'application', 'system', 'api', 'lambda', 
             'ec2', 'ecs', 'batch', 'glue', 'emr', 'codebuild'
-        ]
+        ])
         
-        self.admin_indicators = [
+        self.admin_indicators = frozenset([
             'admin', 'administrator', 'root', 'superuser', 'master'
-        ]
+        ])
         
-        self.developer_indicators = [
+        self.developer_indicators = frozenset([
             'dev', 'developer', 'development', 'staging', 'test', 'sandbox'
-        ]
+        ])
         
-        self.automation_indicators = [
+        self.automation_indicators = frozenset([
             'automation', 'deploy', 'deployment', 'ci', 'cd', 'pipeline', 
             'jenkins', 'github', 'gitlab', 'terraform', 'ansible'
-        ]
+        ])
         
-        self.compliance_indicators = [
+        self.compliance_indicators = frozenset([
             'audit', 'compliance', 'security', 'readonly', 'monitor', 'logging'
-        ]
+        ])
+        
+        # Resource name categories in priority order: intent, confidence and reasoning prefix
+        self._name_categories = (
+            (IAMIntent.SERVICE_ACCOUNT, 0.7, "Resource name suggests service account"),
+            (IAMIntent.ADMIN_ACCESS, 0.8, "Resource name suggests admin access"),
+            (IAMIntent.DEVELOPER_FLEXIBILITY, 0.6, "Resource name suggests developer use"),
+            (IAMIntent.AUTOMATION_ROLE, 0.7, "Resource name suggests automation"),
+            (IAMIntent.COMPLIANCE, 0.6, "Resource name suggests compliance")
+        )
+        self._name_matcher = _KeywordMatcher([
+            self.service_account_indicators,
+            self.admin_indicators,
+            self.developer_indicators,
+            self.automation_indicators,
+            self.compliance_indicators
+        ])
+        
+        # Auto-detection reissues the same IAM calls for a resource; reuse the result for a while.
+        # The client is not part of the key: a detector serves a single account.
+        self._intent_cache = TTLCache(maxsize=_INTENT_CACHE_SIZE, ttl=_INTENT_CACHE_TTL)
+        self._intent_cache_lock = threading.Lock()
+        self._auto_detect_intent = cached(
+            self._intent_cache,
+            key=lambda resource_type, resource_name, client, prefetched=None: (resource_type, resource_name),
+            lock=self._intent_cache_lock
+        )(self._auto_detect_intent)
 
     def detect_intent(self, 
                      resource_type: str,
                      resource_name: str, 
                      client, 
                      user_intent: Optional[str] = None,
-                     user_description: Optional[str] = None) -> Tuple[IAMIntent, float, str]:
+                     user_description: Optional[str] = None,
+                     prefetched: Optional[Dict] = None) -> Tuple[IAMIntent, float, str]:
         """
         Main intent detection method.
         
@@ -65,148 +379,111 @@ class IAMIntentDetector:
             client: IAM client for API calls
             user_intent: Explicit user intent if provided
             user_description: User's description of resource purpose
+            prefetched: Resource config already fetched by the caller (IAMAgent._get_resource_config);
+                        analyses reuse its 'policies', 'role', 'policy_version', 'access_keys'
+                        and 'mfa_devices' entries instead of calling IAM again
             
         Returns:
             Tuple of (Intent, Confidence 0-1, Reasoning)
         """
-        print(f"🔍 Detecting intent for {resource_type}: {resource_name}")
-        
-        # DEBUG: Show what user intent was received
-        print(f"DEBUG: user_intent parameter = {user_intent}")
-        
-        # Priority 1: Explicit user intent
+        # Priority 1: Explicit user intent - a single lookup, no API calls or logging
         if user_intent:
             intent = self._parse_user_intent(user_intent)
-            print(f"DEBUG: Parsed user intent: {intent} (from '{user_intent}')")
             if intent != IAMIntent.UNKNOWN:
-                print(f"✅ User specified intent: {intent.value}")
                 return intent, 1.0, "Explicitly specified by user"
+            logger.debug("Unrecognized user intent '%s' for %s: %s, detecting instead", user_intent, resource_type, resource_name)
         
         # Priority 2: User description analysis
         if user_description:
             intent, confidence, reasoning = self._analyze_user_description(user_description)
             if confidence > 0.7:
-                print(f"📝 Intent from description: {intent.value} (confidence: {confidence})")
+                logger.debug("📝 Intent from description for %s: %s (confidence: %s)", resource_name, intent.value, confidence)
                 return intent, confidence, reasoning
         
         # Priority 3: Automatic detection
-        auto_intent, auto_confidence, auto_reasoning = self._auto_detect_intent(resource_type, resource_name, client)
-        print(f"🤖 Auto-detected intent: {auto_intent.value} (confidence: {auto_confidence})")
+        auto_intent, auto_confidence, auto_reasoning = self._auto_detect_intent(resource_type, resource_name, client, prefetched)
+        logger.debug("🤖 Auto-detected intent for %s: %s: %s (confidence: %s)", resource_type, resource_name, auto_intent.value, auto_confidence)
         
         return auto_intent, auto_confidence, auto_reasoning
 
+    def invalidate(self, resource_name: Optional[str] = None):
+        """Forget cached auto-detected intents for resource_name, or for every resource when omitted."""
+        with self._intent_cache_lock:
+            if resource_name is None:
+                self._intent_cache.clear()
+                return
+            for key in [key for key in self._intent_cache if key[1] == resource_name]:
+                self._intent_cache.pop(key, None)
+
     def _parse_user_intent(self, user_intent: str) -> IAMIntent:
         """Parse explicit user intent input."""
-        intent_mapping = {
-            'least privilege': IAMIntent.LEAST_PRIVILEGE,
-            'least_privilege': IAMIntent.LEAST_PRIVILEGE,
-            'minimal': IAMIntent.LEAST_PRIVILEGE,
-            'security': IAMIntent.STRONG_SECURITY,
-            'strong security': IAMIntent.STRONG_SECURITY,
-            'secure': IAMIntent.STRONG_SECURITY,
-            'service': IAMIntent.SERVICE_ACCOUNT,
-            'service account': IAMIntent.SERVICE_ACCOUNT,
-            'application': IAMIntent.SERVICE_ACCOUNT,
-            'developer': IAMIntent.DEVELOPER_FLEXIBILITY,
-            'development': IAMIntent.DEVELOPER_FLEXIBILITY,
-            'dev': IAMIntent.DEVELOPER_FLEXIBILITY,
-            'compliance': IAMIntent.COMPLIANCE,
-            'audit': IAMIntent.COMPLIANCE,
-            'admin': IAMIntent.ADMIN_ACCESS,
-            'administrator': IAMIntent.ADMIN_ACCESS,
-            'operational': IAMIntent.OPERATIONAL_EFFICIENCY,
-            'operations': IAMIntent.OPERATIONAL_EFFICIENCY,
-            'automation': IAMIntent.AUTOMATION_ROLE,
-            'deploy': IAMIntent.AUTOMATION_ROLE,
-            'deployment': IAMIntent.AUTOMATION_ROLE
-        }
-        
-        user_intent_lower = user_intent.lower().strip()
-        return intent_mapping.get(user_intent_lower, IAMIntent.UNKNOWN)
+        return _USER_INTENT_MAP.get(user_intent.casefold().strip(), IAMIntent.UNKNOWN)
 
     def _analyze_user_description(self, description: str) -> Tuple[IAMIntent, float, str]:
         """Analyze user's text description to infer intent."""
-        description_lower = description.lower()
-        
-        # Security keywords
-        security_keywords = ['security', 'secure', 'mfa', 'encryption', 'compliance', 'audit']
-        if any(keyword in description_lower for keyword in security_keywords):
-            return IAMIntent.STRONG_SECURITY, 0.9, f"Description contains security keywords"
-        
-        # Service account keywords
-        service_keywords = ['service', 'application', 'app', 'system', 'automated', 'lambda', 'ec2']
-        if any(keyword in description_lower for keyword in service_keywords):
-            return IAMIntent.SERVICE_ACCOUNT, 0.8, f"Description contains service account keywords"
-        
-        # Developer keywords
-        dev_keywords = ['developer', 'development', 'testing', 'sandbox', 'experimental']
-        if any(keyword in description_lower for keyword in dev_keywords):
-            return IAMIntent.DEVELOPER_FLEXIBILITY, 0.8, f"Description contains development keywords"
-        
-        # Admin keywords
-        admin_keywords = ['admin', 'administrator', 'full access', 'everything', 'manage all']
-        if any(keyword in description_lower for keyword in admin_keywords):
-            return IAMIntent.ADMIN_ACCESS, 0.8, f"Description contains admin keywords"
-        
-        # Compliance keywords
-        compliance_keywords = ['compliance', 'audit', 'readonly', 'monitor', 'logging', 'governance']
-        if any(keyword in description_lower for keyword in compliance_keywords):
-            return IAMIntent.COMPLIANCE, 0.8, f"Description contains compliance keywords"
-        
-        # Automation keywords
-        automation_keywords = ['automation', 'deploy', 'pipeline', 'ci/cd', 'terraform', 'ansible']
-        if any(keyword in description_lower for keyword in automation_keywords):
-            return IAMIntent.AUTOMATION_ROLE, 0.8, f"Description contains automation keywords"
+        # One pass finds the first category (security, service, dev, admin, compliance, automation) with a keyword
+        rank = _DESCRIPTION_MATCHER.first_match(description.lower())
+        if rank is not None:
+            intent, confidence, reasoning, _ = _DESCRIPTION_CATEGORIES[rank]
+            return intent, confidence, reasoning
         
         return IAMIntent.UNKNOWN, 0.3, "No clear intent indicators in description"
 
-    def _auto_detect_intent(self, resource_type: str, resource_name: str, client) -> Tuple[IAMIntent, float, str]:
+    def _auto_detect_intent(self, resource_type: str, resource_name: str, client,
+                            prefetched: Optional[Dict] = None) -> Tuple[IAMIntent, float, str]:
         """Automatically detect intent based on resource analysis."""
         evidence = []
         confidence_scores = {}
+        prefetched = prefetched or {}
         
-        # 1. Analyze resource name
-        name_intent, name_confidence, name_reason = self._analyze_resource_name(resource_name)
-        if name_confidence > 0.5:
-            evidence.append(name_reason)
-            confidence_scores[name_intent] = name_confidence
-        
-        # 2. Analyze attached policies (for users and roles)
+        # The API-backed analyses are independent, so they run concurrently on the pool:
+        # attached policies (users and roles), trust policy (roles), policy content (policies)
+        pending = []
         if resource_type in ['user', 'role']:
-            policy_intent, policy_confidence, policy_reason = self._analyze_attached_policies(client, resource_type, resource_name)
-            if policy_confidence > 0.5:
-                evidence.append(policy_reason)
-                confidence_scores[policy_intent] = confidence_scores.get(policy_intent, 0) + policy_confidence
-        
-        # 3. Check trust policy (for roles)
+            pending.append(_detect_pool.submit(
+                self._analyze_attached_policies, client, resource_type, resource_name, prefetched.get('policies')
+            ))
         if resource_type == 'role':
-            trust_intent, trust_confidence, trust_reason = self._analyze_trust_policy(client, resource_name)
-            if trust_confidence > 0.5:
-                evidence.append(trust_reason)
-                confidence_scores[trust_intent] = confidence_scores.get(trust_intent, 0) + trust_confidence
+            pending.append(_detect_pool.submit(self._analyze_trust_policy, client, resource_name, prefetched.get('role')))
+        if resource_type == 'policy':
+            pending.append(_detect_pool.submit(
+                self._analyze_policy_content, client, resource_name, prefetched.get('policy_version')
+            ))
         
-        # 4. Check access patterns (for users)
+        # Resource name analysis is local; access patterns (users) issue their own lookups on the pool
+        name_result = self._analyze_resource_name(resource_name)
+        access_result = None
         if resource_type == 'user':
-            access_intent, access_confidence, access_reason = self._analyze_user_access_patterns(client, resource_name)
-            if access_confidence > 0.5:
-                evidence.append(access_reason)
-                confidence_scores[access_intent] = confidence_scores.get(access_intent, 0) + access_confidence
+            access_result = self._analyze_user_access_patterns(
+                client, resource_name, prefetched.get('access_keys'), prefetched.get('mfa_devices')
+            )
         
-        # 5. Analyze policy content (for policies)
-        if resource_type == 'policy':
-            content_intent, content_confidence, content_reason = self._analyze_policy_content(client, resource_name)
-            if content_confidence > 0.5:
-                evidence.append(content_reason)
-                confidence_scores[content_intent] = confidence_scores.get(content_intent, 0) + content_confidence
+        results = [name_result, *(future.result() for future in pending)]
+        if access_result is not None:
+            results.append(access_result)
+        
+        # Merge in the original order so evidence and tie-breaks are unchanged,
+        # tracking the best intent as scores accumulate
+        best_intent, best_score = None, 0.0
+        for result_intent, result_confidence, result_reason in results:
+            if result_confidence > 0.5:
+                evidence.append(result_reason)
+                score = confidence_scores.get(result_intent, 0) + result_confidence
+                confidence_scores[result_intent] = score
+                if score > best_score:
+                    best_intent, best_score = result_intent, score
+                elif score == best_score and result_intent is not best_intent:
+                    # Exact ties go to the intent that scored first
+                    ranks = list(confidence_scores)
+                    if ranks.index(result_intent) < ranks.index(best_intent):
+                        best_intent = result_intent
         
         # Determine best intent
-        if confidence_scores:
-            best_intent = max(confidence_scores.items(), key=lambda x: x[1])
-            intent, total_confidence = best_intent
+        if best_intent is not None:
             # Normalize confidence (max 1.0)
-            normalized_confidence = min(total_confidence / 2.0, 1.0)
+            normalized_confidence = min(best_score / 2.0, 1.0)
             reasoning = "; ".join(evidence)
-            return intent, normalized_confidence, reasoning
+            return best_intent, normalized_confidence, reasoning
         
         # If no clear intent indicators found, default based on resource type
         if resource_type == 'role':
@@ -218,69 +495,48 @@ class IAMIntentDetector:
 
     def _analyze_resource_name(self, resource_name: str) -> Tuple[IAMIntent, float, str]:
         """Analyze resource name for intent clues."""
-        name_lower = resource_name.lower()
-        
-        # Service account patterns
-        if any(indicator in name_lower for indicator in self.service_account_indicators):
-            return IAMIntent.SERVICE_ACCOUNT, 0.7, f"Resource name suggests service account: '{resource_name}'"
-        
-        # Admin patterns
-        if any(indicator in name_lower for indicator in self.admin_indicators):
-            return IAMIntent.ADMIN_ACCESS, 0.8, f"Resource name suggests admin access: '{resource_name}'"
-        
-        # Developer patterns
-        if any(indicator in name_lower for indicator in self.developer_indicators):
-            return IAMIntent.DEVELOPER_FLEXIBILITY, 0.6, f"Resource name suggests developer use: '{resource_name}'"
-        
-        # Automation patterns
-        if any(indicator in name_lower for indicator in self.automation_indicators):
-            return IAMIntent.AUTOMATION_ROLE, 0.7, f"Resource name suggests automation: '{resource_name}'"
-        
-        # Compliance patterns
-        if any(indicator in name_lower for indicator in self.compliance_indicators):
-            return IAMIntent.COMPLIANCE, 0.6, f"Resource name suggests compliance: '{resource_name}'"
+        # One pass finds the first category (service, admin, dev, automation, compliance) with an indicator
+        rank = self._name_matcher.first_match(resource_name.translate(_NAME_TABLE))
+        if rank is not None:
+            intent, confidence, reasoning = self._name_categories[rank]
+            return intent, confidence, f"{reasoning}: '{resource_name}'"
         
         return IAMIntent.UNKNOWN, 0.0, "No intent indicators in resource name"
 
-    def _analyze_attached_policies(self, client, resource_type: str, resource_name: str) -> Tuple[IAMIntent, float, str]:
-        """Analyze attached policies to infer intent."""
+    def _analyze_attached_policies(self, client, resource_type: str, resource_name: str,
+                                   attached_policies: Optional[List] = None) -> Tuple[IAMIntent, float, str]:
+        """Analyze attached policies (fetched unless given) to infer intent."""
         try:
-            if resource_type == 'user':
-                policies = client.list_attached_user_policies(UserName=resource_name)
-            elif resource_type == 'role':
-                policies = client.list_attached_role_policies(RoleName=resource_name)
-            else:
-                return IAMIntent.UNKNOWN, 0.0, "Not applicable for this resource type"
-            
-            attached_policies = policies.get('AttachedPolicies', [])
+            # Paginate so principals with more than one page of attachments are not truncated
+            if attached_policies is None:
+                if resource_type == 'user':
+                    policies = client.get_paginator('list_attached_user_policies').paginate(UserName=resource_name).build_full_result()
+                elif resource_type == 'role':
+                    policies = client.get_paginator('list_attached_role_policies').paginate(RoleName=resource_name).build_full_result()
+                else:
+                    return IAMIntent.UNKNOWN, 0.0, "Not applicable for this resource type"
+                
+                attached_policies = policies.get('AttachedPolicies', [])
             
             if not attached_policies:
                 return IAMIntent.LEAST_PRIVILEGE, 0.4, "No attached policies suggest minimal access intent"
             
-            # Check for admin policies
-            admin_policies = [
-                'AdministratorAccess', 'PowerUserAccess', 'IAMFullAccess'
-            ]
-            for policy in attached_policies:
-                policy_name = policy['PolicyName']
-                if any(admin in policy_name for admin in admin_policies):
-                    return IAMIntent.ADMIN_ACCESS, 0.9, f"Has admin policy: {policy_name}"
-            
-            # Check for readonly/compliance policies
-            readonly_policies = ['ReadOnlyAccess', 'SecurityAudit', 'ViewOnlyAccess']
-            for policy in attached_policies:
-                policy_name = policy['PolicyName']
-                if any(readonly in policy_name for readonly in readonly_policies):
-                    return IAMIntent.COMPLIANCE, 0.7, f"Has readonly/audit policy: {policy_name}"
-            
-            # Check for service-specific policies
-            service_policies = ['AmazonEC2FullAccess', 'AmazonS3FullAccess', 'AWSLambdaExecute']
+            # One pass classifies every policy; an admin policy wins outright,
+            # otherwise the first readonly/audit policy, then service policies
+            readonly_policy = None
             service_count = 0
             for policy in attached_policies:
                 policy_name = policy['PolicyName']
-                if any(service in policy_name for service in service_policies):
+                if _ADMIN_POLICY_RE.search(policy_name):
+                    return IAMIntent.ADMIN_ACCESS, 0.9, f"Has admin policy: {policy_name}"
+                if readonly_policy is None and _READONLY_POLICY_RE.search(policy_name):
+                    readonly_policy = policy_name
+                if _SERVICE_POLICY_RE.search(policy_name):
                     service_count += 1
             
+            if readonly_policy is not None:
+                return IAMIntent.COMPLIANCE, 0.7, f"Has readonly/audit policy: {readonly_policy}"
+            
             if service_count > 0:
                 return IAMIntent.SERVICE_ACCOUNT, 0.6, f"Has {service_count} service-specific policies"
             
@@ -293,10 +549,11 @@ class IAMIntentDetector:
         except Exception as e:
             return IAMIntent.UNKNOWN, 0.0, f"Error analyzing policies: {e}"
 
-    def _analyze_trust_policy(self, client, role_name: str) -> Tuple[IAMIntent, float, str]:
-        """Analyze role trust policy to infer intent."""
+    def _analyze_trust_policy(self, client, role_name: str, role: Optional[Dict] = None) -> Tuple[IAMIntent, float, str]:
+        """Analyze role trust policy (a get_role response, fetched unless given) to infer intent."""
         try:
-            role = client.get_role(RoleName=role_name)
+            if role is None:
+                role = client.get_role(RoleName=role_name)
             trust_policy = role['Role']['AssumeRolePolicyDocument']
             
             statements = trust_policy.get('Statement', [])
@@ -336,23 +593,34 @@ class IAMIntentDetector:
         except Exception as e:
             return IAMIntent.UNKNOWN, 0.0, f"Error analyzing trust policy: {e}"
 
-    def _analyze_user_access_patterns(self, client, user_name: str) -> Tuple[IAMIntent, float, str]:
-        """Analyze user access patterns to infer intent."""
+    def _analyze_user_access_patterns(self, client, user_name: str, access_keys: Optional[List] = None,
+                                      mfa_devices: Optional[List] = None) -> Tuple[IAMIntent, float, str]:
+        """Analyze user access patterns to infer intent; key and MFA lists are fetched unless given."""
         try:
+            # The remaining lookups are independent; issue them together
+            login_profile = _detect_pool.submit(client.get_login_profile, UserName=user_name)
+            keys_future = mfa_future = None
+            if access_keys is None:
+                keys_future = _detect_pool.submit(client.list_access_keys, UserName=user_name)
+            if mfa_devices is None:
+                mfa_future = _detect_pool.submit(client.list_mfa_devices, UserName=user_name)
+            if keys_future is not None:
+                access_keys = keys_future.result().get('AccessKeyMetadata', [])
+            if mfa_future is not None:
+                mfa_devices = mfa_future.result().get('MFADevices', [])
+            
             # Check if user has console access
             try:
-                client.get_login_profile(UserName=user_name)
+                login_profile.result()
                 has_console = True
             except:
                 has_console = False
             
             # Check access keys
-            access_keys = client.list_access_keys(UserName=user_name)
-            key_count = len(access_keys.get('AccessKeyMetadata', []))
+            key_count = len(access_keys)
             
             # Check MFA devices
-            mfa_devices = client.list_mfa_devices(UserName=user_name)
-            has_mfa = len(mfa_devices.get('MFADevices', [])) > 0
+            has_mfa = len(mfa_devices) > 0
             
             # Human user patterns
             if has_console and has_mfa:
@@ -371,164 +639,20 @@ class IAMIntentDetector:
         except Exception as e:
             return IAMIntent.UNKNOWN, 0.0, f"Error analyzing access patterns: {e}"
 
-    def _analyze_policy_content(self, client, policy_arn: str) -> Tuple[IAMIntent, float, str]:
-        """Analyze policy document content to infer intent."""
+    def _analyze_policy_content(self, client, policy_arn: str,
+                                policy_version: Optional[Dict] = None) -> Tuple[IAMIntent, float, str]:
+        """Analyze policy document content (a get_policy_version response, fetched unless given) to infer intent."""
         try:
-            # Get policy document
-            policy = client.get_policy(PolicyArn=policy_arn)
-            policy_version = client.get_policy_version(
-                PolicyArn=policy_arn,
-                VersionId=policy['Policy']['DefaultVersionId']
-            )
-            
-            policy_document = policy_version['PolicyVersion']['Document']
-            statements = policy_document.get('Statement', [])
-            if isinstance(statements, dict):
-                statements = [statements]
-            
-            total_actions = 0
-            wildcard_actions = 0
-            readonly_actions = 0
-            dangerous_actions = 0
+            if policy_version is not None:
+                return _classify_policy_document(policy_version['PolicyVersion']['Document'])
             
-            dangerous_action_patterns = ['*', 'iam:', 'sts:AssumeRole', 'Delete', 'Terminate']
-            readonly_action_patterns = ['List', 'Get', 'Describe', 'View']
-            
-            for statement in statements:
-                if statement.get('Effect') == 'Allow':
-                    actions = statement.get('Action', [])
-                    if isinstance(actions, str):
-                        actions = [actions]
-                    
-                    total_actions += len(actions)
-                    
-                    for action in actions:
-                        if '*' in action:
-                            wildcard_actions += 1
-                        
-                        if any(danger in action for danger in dangerous_action_patterns):
-                            dangerous_actions += 1
-                        
-                        if any(readonly in action for readonly in readonly_action_patterns):
-                            readonly_actions += 1
-            
-            # Analyze intent based on action patterns
-            if wildcard_actions > 0 and dangerous_actions > total_actions * 0.3:
-                return IAMIntent.ADMIN_ACCESS, 0.8, f"Policy has wildcards and dangerous actions: {dangerous_actions}/{total_actions}"
-            
-            if readonly_actions > total_actions * 0.8:
-                return IAMIntent.COMPLIANCE, 0.7, f"Policy is mostly readonly: {readonly_actions}/{total_actions}"
-            
-            if total_actions > 20:
-                return IAMIntent.OPERATIONAL_EFFICIENCY, 0.6, f"Policy has many actions: {total_actions}"
-            
-            if total_actions <= 5:
-                return IAMIntent.LEAST_PRIVILEGE, 0.7, f"Policy has few actions: {total_actions}"
-            
-            return IAMIntent.SERVICE_ACCOUNT, 0.4, f"Standard policy with {total_actions} actions"
+            # Only the default version id needs a fresh call; the document analysis is cached per version
+            policy = client.get_policy(PolicyArn=policy_arn)
+            return _classify_policy_version(client, policy_arn, policy['Policy']['DefaultVersionId'])
             
         except Exception as e:
             return IAMIntent.UNKNOWN, 0.0, f"Error analyzing policy content: {e}"
 
     def get_intent_recommendations(self, intent: IAMIntent, resource_type: str, resource_name: str) -> Dict:
-        """Get recommendations based on detected intent."""
-        recommendations = {
-            IAMIntent.LEAST_PRIVILEGE: {
-                "security": {
-                    "mfa": "Enable MFA for all users",
-                    "policies": "Use minimal required permissions only",
-                    "conditions": "Add conditions for IP, time, and MFA requirements"
-                },
-                "configuration": {
-                    "access_keys": "Rotate access keys regularly (90 days max)",
-                    "groups": "Use groups instead of direct policy attachment",
-                    "roles": "Use roles for temporary access"
-                },
-                "best_practices": {
-                    "monitoring": "Enable CloudTrail for all API activities",
-                    "review": "Regular access review and permission audits"
-                }
-            },
-            IAMIntent.STRONG_SECURITY: {
-                "security": {
-                    "mfa": "Require MFA for all console and API access",
-                    "policies": "Use deny policies for sensitive actions",
-                    "conditions": "Require MFA, IP restrictions, and time bounds"
-                },
-                "configuration": {
-                    "access_keys": "Short-lived access keys (30-60 days)",
-                    "password_policy": "Strong password policy with complexity requirements",
-                    "session_duration": "Short session duration for roles"
-                },
-                "monitoring": {
-                    "alerts": "Set up alerts for privilege escalation attempts",
-                    "logging": "Comprehensive logging and monitoring"
-                }
-            },
-            IAMIntent.SERVICE_ACCOUNT: {
-                "security": {
-                    "mfa": "No MFA required for service accounts",
-                    "access_keys": "Use IAM roles instead of access keys when possible",
-                    "policies": "Minimal permissions for specific services only"
-                },
-                "configuration": {
-                    "trust_policy": "Restrict trust policy to specific services",
-                    "conditions": "Add source IP or VPC conditions",
-                    "session_duration": "Set appropriate session duration"
-                },
-                "best_practices": {
-                    "rotation": "Automate credential rotation",
-                    "monitoring": "Monitor for unusual API usage patterns"
-                }
-            },
-            IAMIntent.DEVELOPER_FLEXIBILITY: {
-                "security": {
-                    "mfa": "Enable MFA for console access",
-                    "sandbox": "Use sandbox environments for testing",
-                    "policies": "Broad permissions within development boundaries"
-                },
-                "configuration": {
-                    "environment": "Separate development, staging, production access",
-                    "time_bounds": "Time-limited access to production resources",
-                    "groups": "Use developer groups for permission management"
-                },
-                "best_practices": {
-                    "training": "Security awareness training for developers",
-                    "code_review": "Review IAM changes in code reviews"
-                }
-            },
-            IAMIntent.COMPLIANCE: {
-                "security": {
-                    "readonly": "Prefer readonly access for audit functions",
-                    "mfa": "Require MFA for all compliance users",
-                    "logging": "Enable detailed logging for all activities"
-                },
-                "configuration": {
-                    "separation": "Separate compliance roles from operational roles",
-                    "approval": "Require approval for privilege changes",
-                    "documentation": "Document all permission grants"
-                },
-                "monitoring": {
-                    "auditing": "Regular compliance audits and reviews",
-                    "reporting": "Automated compliance reporting"
-                }
-            },
-            IAMIntent.ADMIN_ACCESS: {
-                "security": {
-                    "mfa": "Require MFA for all admin operations",
-                    "break_glass": "Use break-glass procedures for emergency access",
-                    "conditions": "Strict conditions on admin permissions"
-                },
-                "configuration": {
-                    "just_in_time": "Use just-in-time access for admin operations",
-                    "approval": "Multi-person approval for admin changes",
-                    "monitoring": "Real-time monitoring of admin activities"
-                },
-                "best_practices": {
-                    "principle": "Use admin access sparingly and temporarily",
-                    "delegation": "Delegate specific admin tasks to specialized roles"
-                }
-            }
-        }
-        
-        return recommendations.get(intent, {})
\ No newline at end of file
+        """Get recommendations based on detected intent; the returned dict is shared, treat it as read-only."""
+        return _INTENT_RECOMMENDATIONS.get(intent, {})
\ No newline at end of file
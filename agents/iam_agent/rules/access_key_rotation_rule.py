@@ -2,8 +2,200 @@
 
 import boto3
 from botocore.exceptions import ClientError
-from datetime import datetime, timedelta
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Optional
+import calendar
 import json
+import logging
+
+from agents.iam_agent._iam_cache import get_credential_report, report_date
+
+logger = logging.getLogger(__name__)
+
+
+# Users whose keys are checked concurrently in an account-wide check
+_USER_CHECK_WORKERS = 16
+
+# Concurrent get_access_key_last_used lookups, shared by all users being checked
+_LAST_USED_WORKERS = 8
+
+# Concurrent update_access_key calls when deactivating unused keys
+_DEACTIVATE_WORKERS = 8
+
+# IAM allows at most two access keys per user; list_users returns up to 1000 users per page
+_MAX_KEYS_PER_USER = 2
+_LIST_USERS_PAGE_SIZE = 1000
+
+
+# One pool for every rule instance; agents create rules per worker thread
+_last_used_pool = ThreadPoolExecutor(_LAST_USED_WORKERS, thread_name_prefix="iam-key-last-used")
+
+
+def _epoch(naive_utc):
+    """Epoch seconds for a naive UTC datetime."""
+    return calendar.timegm(naive_utc.timetuple())
+
+
+def _iso(epoch_seconds):
+    """Naive UTC ISO 8601 string for epoch seconds (None passes through)."""
+    if epoch_seconds is None:
+        return None
+    return datetime.fromtimestamp(epoch_seconds, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+@dataclass(slots=True, frozen=True)
+class LastUsedInfo:
+    """When and where an access key was last used; last_used_ts is epoch seconds (UTC)."""
+    last_used_ts: Optional[int]
+    days_since_last_use: Optional[int]
+    service_name: str
+    region: str
+    never_used: bool
+    error: Optional[str] = None
+    
+    def to_json(self):
+        """Plain dict for reporting, with the last use rendered as an ISO 8601 date."""
+        info = {
+            'last_used_date': _iso(self.last_used_ts),
+            'days_since_last_use': self.days_since_last_use,
+            'service_name': self.service_name,
+            'region': self.region,
+            'never_used': self.never_used
+        }
+        if self.error is not None:
+            info['error'] = self.error
+        return info
+
+
+@dataclass(slots=True, frozen=True)
+class OldKeyRecord:
+    """An access key that needs attention; creation_ts is epoch seconds (UTC)."""
+    user_name: str
+    access_key_id: str
+    age_days: int
+    status: str
+    creation_ts: int
+    last_used: LastUsedInfo
+    severity: str
+    recommendation: str
+    
+    def to_json(self):
+        """Plain dict for reporting, with timestamps rendered as ISO 8601 dates."""
+        return {
+            'user_name': self.user_name,
+            'access_key_id': self.access_key_id,
+            'age_days': self.age_days,
+            'status': self.status,
+            'creation_date': _iso(self.creation_ts),
+            'last_used': self.last_used.to_json(),
+            'severity': self.severity,
+            'recommendation': self.recommendation
+        }
+
+
+def _last_used_info(last_used_date, service_name, region, now_utc):
+    """Last-used summary for a key; last_used_date is naive UTC or None if never used."""
+    return LastUsedInfo(
+        last_used_ts=_epoch(last_used_date) if last_used_date else None,
+        days_since_last_use=(now_utc - last_used_date).days if last_used_date else None,
+        service_name=service_name,
+        region=region,
+        never_used=last_used_date is None
+    )
+
+
+def _last_used_from_report(report_row, creation_date, now_utc):
+    """
+    Last-used summary for a key from its user's credential report row.
+    
+    The report has no key ids, so the key is matched to the access_key_1/2 slot
+    rotated at its creation time; returns None if no slot matches.
+    """
+    created_ts = _epoch(creation_date)
+    for slot in ('access_key_1', 'access_key_2'):
+        rotated = report_date(report_row.get(f'{slot}_last_rotated'))
+        if rotated is None or _epoch(rotated) != created_ts:
+            continue
+        return _last_used_info(
+            report_date(report_row.get(f'{slot}_last_used_date')),
+            report_row.get(f'{slot}_last_used_service', 'Unknown'),
+            report_row.get(f'{slot}_last_used_region', 'Unknown'),
+            now_utc
+        )
+    return None
+
+
+def _severity(active, over_rotation, over_warning, over_month, never_used):
+    """Severity of a key from its state flags; tabulated in _SEVERITY_TABLE."""
+    if not active:
+        return None  # Skip inactive keys
+    if over_rotation:
+        return 'critical' if never_used else 'high'  # Old and never used / old but used
+    if over_warning:
+        return 'medium'  # Warning - approaching rotation time
+    if over_month and never_used:
+        return 'medium'  # Unused key that's getting old
+    return None  # Key is fine
+
+
+# Severity by bitmask: active << 4 | over_rotation << 3 | over_warning << 2 | over_month << 1 | never_used
+_SEVERITY_TABLE = tuple(
+    _severity(*(bool(state & (1 << bit)) for bit in (4, 3, 2, 1, 0)))
+    for state in range(32)
+)
+
+
+# Recommendation by bitmask: never_used << 2 | over_rotation << 1 | over_warning
+_RECOMMENDATIONS = (
+    "Monitor usage and plan rotation",
+    "Schedule rotation soon - approaching policy limit",
+    "Rotate immediately - exceeds policy",
+    "Rotate immediately - exceeds policy",
+    "Consider deleting unused key or rotate if needed",
+    "Consider deleting unused key or rotate if needed",
+    "Delete unused key (never been used)",
+    "Delete unused key (never been used)"
+)
+
+
+# Rotation and cleanup steps closing every set of fix instructions
+_ROTATION_STEPS = (
+    "🔧 Access Key Rotation Process:",
+    "1. Create new access key for user",
+    "2. Update applications/services to use new key", 
+    "3. Test applications with new key",
+    "4. Deactivate old key (keep for rollback)",
+    "5. Monitor for errors for 24-48 hours",
+    "6. Delete old key once confirmed working",
+    "🔒 For Unused Keys:",
+    "1. Confirm key is truly unused",
+    "2. Deactivate key first (reversible)",
+    "3. Monitor for any service disruptions", 
+    "4. Delete key after confirmation period",
+    "⚠️ Impact: Applications using old keys will stop working after rotation"
+)
+
+
+def _format_critical_key(key):
+    """Instruction lines describing a single critical key."""
+    last_used_str = 'Never' if key.last_used.never_used else f"{key.last_used.days_since_last_use} days ago"
+    return (
+        f"• User: {key.user_name} | Key: {key.access_key_id[:8]}*** | Age: {key.age_days} days",
+        f"  Last Used: {last_used_str}",
+        f"  Action: {key.recommendation}"
+    )
+
+
+def _format_high_key(key):
+    """Instruction lines describing a single high priority key."""
+    return (
+        f"• User: {key.user_name} | Key: {key.access_key_id[:8]}*** | Age: {key.age_days} days",
+        f"  Action: {key.recommendation}"
+    )
 
 
 class AccessKeyRotationRule:
@@ -15,9 +207,11 @@ class AccessKeyRotationRule:
     id = "iam_access_key_rotation"
     detection = "IAM access keys are old and need rotation"
     auto_safe = False  # Key rotation requires careful coordination
+    applies_to = frozenset({"user"})  # Access keys and logins belong to users
     
     def __init__(self):
-        self.fix_instructions = None
+        self._fix_instructions = None
+        self._fix_context = None  # (total, critical_keys, high_keys, medium_keys) from the last check
         self.can_auto_fix = False
         self.fix_type = None
         self.old_keys = None
@@ -29,209 +223,202 @@ class AccessKeyRotationRule:
         self.rotation_threshold_days = max_key_age_days
         self.warning_threshold_days = max_key_age_days - 15
         
+        # One reference time (naive UTC) for every key age in this check
+        now_utc = datetime.utcnow()
+        
         try:
             old_keys = []
             
             if user_name:
                 # Check specific user
-                user_keys = self._check_user_access_keys(client, user_name)
+                user_keys = self._check_user_access_keys(client, user_name, now_utc)
                 old_keys.extend(user_keys)
             else:
-                # Check all users in account
-                users = client.list_users()
-                for user in users.get('Users', [])[:50]:  # Limit to first 50 users
-                    user_keys = self._check_user_access_keys(client, user['UserName'])
-                    old_keys.extend(user_keys)
+                # Check all users in account; the calls are I/O bound, so users are checked concurrently
+                report = get_credential_report(client)
+                if report is not None:
+                    # Inactive keys never need rotation, so only users with an active key are listed
+                    user_names = [
+                        name for name, row in report.items()
+                        if row.get('access_key_1_active') == 'true' or row.get('access_key_2_active') == 'true'
+                    ]
+                else:
+                    pages = client.get_paginator('list_users').paginate(PaginationConfig={'PageSize': _LIST_USERS_PAGE_SIZE})
+                    user_names = [user['UserName'] for page in pages for user in page.get('Users', [])]
+                with ThreadPoolExecutor(max_workers=_USER_CHECK_WORKERS) as pool:
+                    # The report's last-used columns replace per-key get_access_key_last_used calls
+                    check_user = lambda name: self._check_user_access_keys(
+                        client, name, now_utc, report.get(name) if report is not None else None
+                    )
+                    for user_keys in pool.map(check_user, user_names):
+                        old_keys.extend(user_keys)
             
             if old_keys:
                 self.old_keys = old_keys
                 self._set_fix_instructions(old_keys)
-                print(f"🔴 Found {len(old_keys)} old access keys requiring rotation")
+                logger.warning("🔴 Found %d old access keys requiring rotation", len(old_keys))
                 return True
             
-            print(f"✅ All access keys are within {max_key_age_days} day rotation policy")
+            logger.info("✅ All access keys are within %d day rotation policy", max_key_age_days)
             return False
             
         except ClientError as e:
-            print(f"❌ Error checking access key rotation: {e}")
+            logger.error("❌ Error checking access key rotation: %s", e)
             return False
     
-    def _check_user_access_keys(self, client, user_name):
-        """Check access keys for a specific user."""
+    def _check_user_access_keys(self, client, user_name, now_utc, report_row=None):
+        """
+        Check access keys for a specific user; ages are measured from now_utc.
+        
+        report_row is the user's credential report row, if available; last use is
+        read from it and only looked up live for keys it cannot be matched to.
+        """
         old_keys = []
         
         try:
             # Get user's access keys
-            access_keys = client.list_access_keys(UserName=user_name)
+            access_keys = client.list_access_keys(UserName=user_name, MaxItems=_MAX_KEYS_PER_USER)
+            key_metadata_list = access_keys.get('AccessKeyMetadata', [])
             
-            for key_metadata in access_keys.get('AccessKeyMetadata', []):
+            def key_last_used(key_metadata):
+                if report_row is not None:
+                    creation_date = key_metadata['CreateDate'].replace(tzinfo=None)
+                    last_used_info = _last_used_from_report(report_row, creation_date, now_utc)
+                    if last_used_info is not None:
+                        return last_used_info
+                return self._get_key_last_used(client, key_metadata['AccessKeyId'], now_utc)
+            
+            # Look up last use of every key at once
+            last_used = _last_used_pool.map(key_last_used, key_metadata_list)
+            
+            for key_metadata, last_used_info in zip(key_metadata_list, last_used):
                 access_key_id = key_metadata['AccessKeyId']
-                creation_date = key_metadata['CreateDate']
+                # boto3 returns UTC datetimes; compare them as naive UTC
+                creation_date = key_metadata['CreateDate'].replace(tzinfo=None)
                 status = key_metadata['Status']
                 
                 # Calculate key age
-                if hasattr(creation_date, 'replace'):
-                    creation_date = creation_date.replace(tzinfo=None)
-                
-                key_age_days = (datetime.utcnow() - creation_date).days
-                
-                # Get last used information
-                last_used_info = self._get_key_last_used(client, access_key_id)
+                key_age_days = (now_utc - creation_date).days
                 
                 # Determine if key needs rotation
                 severity = self._determine_key_severity(key_age_days, last_used_info, status)
                 
                 if severity:
-                    old_keys.append({
-                        'user_name': user_name,
-                        'access_key_id': access_key_id,
-                        'age_days': key_age_days,
-                        'status': status,
-                        'creation_date': creation_date.isoformat(),
-                        'last_used': last_used_info,
-                        'severity': severity,
-                        'recommendation': self._get_key_recommendation(key_age_days, last_used_info, status)
-                    })
+                    old_keys.append(OldKeyRecord(
+                        user_name=user_name,
+                        access_key_id=access_key_id,
+                        age_days=key_age_days,
+                        status=status,
+                        creation_ts=_epoch(creation_date),
+                        last_used=last_used_info,
+                        severity=severity,
+                        recommendation=self._get_key_recommendation(key_age_days, last_used_info, status)
+                    ))
                     
         except ClientError as e:
-            print(f"⚠️ Error checking access keys for user {user_name}: {e}")
+            logger.warning("⚠️ Error checking access keys for user %s: %s", user_name, e)
         
         return old_keys
     
-    def _get_key_last_used(self, client, access_key_id):
-        """Get last used information for an access key."""
+    def _get_key_last_used(self, client, access_key_id, now_utc=None):
+        """Get last used information for an access key, measured from now_utc (naive UTC, default now)."""
         try:
             response = client.get_access_key_last_used(AccessKeyId=access_key_id)
             last_used_data = response.get('AccessKeyLastUsed', {})
             
             last_used_date = last_used_data.get('LastUsedDate')
-            service_name = last_used_data.get('ServiceName', 'Unknown')
-            region = last_used_data.get('Region', 'Unknown')
-            
             if last_used_date:
-                if hasattr(last_used_date, 'replace'):
-                    last_used_date = last_used_date.replace(tzinfo=None)
-                days_since_last_use = (datetime.utcnow() - last_used_date).days
-            else:
-                days_since_last_use = None
+                last_used_date = last_used_date.replace(tzinfo=None)
             
-            return {
-                'last_used_date': last_used_date.isoformat() if last_used_date else None,
-                'days_since_last_use': days_since_last_use,
-                'service_name': service_name,
-                'region': region,
-                'never_used': last_used_date is None
-            }
+            return _last_used_info(
+                last_used_date,
+                last_used_data.get('ServiceName', 'Unknown'),
+                last_used_data.get('Region', 'Unknown'),
+                now_utc or datetime.utcnow()
+            )
             
         except ClientError as e:
-            return {
-                'last_used_date': None,
-                'days_since_last_use': None,
-                'service_name': 'Unknown',
-                'region': 'Unknown',
-                'never_used': True,
-                'error': str(e)
-            }
+            return LastUsedInfo(
+                last_used_ts=None,
+                days_since_last_use=None,
+                service_name='Unknown',
+                region='Unknown',
+                never_used=True,
+                error=str(e)
+            )
     
     def _determine_key_severity(self, key_age_days, last_used_info, status):
         """Determine the severity level for a key based on age and usage."""
-        if status == 'Inactive':
-            return None  # Skip inactive keys
-        
-        # Critical: Very old keys (> threshold)
-        if key_age_days > self.rotation_threshold_days:
-            if last_used_info.get('never_used'):
-                return 'critical'  # Old and never used
-            elif last_used_info.get('days_since_last_use', 0) > 30:
-                return 'high'  # Old and not used recently
-            else:
-                return 'high'  # Old but recently used
-        
-        # High: Approaching threshold
-        elif key_age_days > self.warning_threshold_days:
-            return 'medium'  # Warning - approaching rotation time
-        
-        # Check for never-used keys that are somewhat old
-        elif key_age_days > 30 and last_used_info.get('never_used'):
-            return 'medium'  # Unused key that's getting old
-        
-        return None  # Key is fine
+        return _SEVERITY_TABLE[
+            (status != 'Inactive') << 4
+            | (key_age_days > self.rotation_threshold_days) << 3
+            | (key_age_days > self.warning_threshold_days) << 2
+            | (key_age_days > 30) << 1
+            | bool(last_used_info.never_used)
+        ]
     
     def _get_key_recommendation(self, key_age_days, last_used_info, status):
         """Get specific recommendation for a key."""
-        if last_used_info.get('never_used') and key_age_days > self.rotation_threshold_days:
-            return "Delete unused key (never been used)"
-        elif last_used_info.get('never_used'):
-            return "Consider deleting unused key or rotate if needed"
-        elif key_age_days > self.rotation_threshold_days:
-            return "Rotate immediately - exceeds policy"
-        elif key_age_days > self.warning_threshold_days:
-            return "Schedule rotation soon - approaching policy limit"
-        else:
-            return "Monitor usage and plan rotation"
+        return _RECOMMENDATIONS[
+            last_used_info.never_used << 2
+            | (key_age_days > self.rotation_threshold_days) << 1
+            | (key_age_days > self.warning_threshold_days)
+        ]
     
     def _set_fix_instructions(self, old_keys):
         """Set instructions for rotating access keys."""
-        critical_keys = [k for k in old_keys if k['severity'] == 'critical']
-        high_keys = [k for k in old_keys if k['severity'] == 'high']
-        medium_keys = [k for k in old_keys if k['severity'] == 'medium']
-        
-        self.fix_instructions = [
-            f"🔑 Access Key Rotation Required",
-            f"Total Keys: {len(old_keys)} | Critical: {len(critical_keys)} | High: {len(high_keys)} | Medium: {len(medium_keys)}",
-            "🚨 Critical Keys (Immediate Action Required):"
-        ]
-        
-        for key in critical_keys[:5]:  # Show first 5 critical
-            last_used_str = 'Never' if key['last_used']['never_used'] else f"{key['last_used']['days_since_last_use']} days ago"
-            self.fix_instructions.extend([
-                f"• User: {key['user_name']} | Key: {key['access_key_id'][:8]}*** | Age: {key['age_days']} days",
-                f"  Last Used: {last_used_str}",
-                f"  Action: {key['recommendation']}"
-            ])
-        
-        if len(critical_keys) > 5:
-            self.fix_instructions.append(f"  ... and {len(critical_keys) - 5} more critical keys")
-        
-        self.fix_instructions.append("⚠️ High Priority Keys:")
+        # Bucket keys by severity in one pass
+        keys_by_severity = defaultdict(list)
+        for key in old_keys:
+            keys_by_severity[key.severity].append(key)
+        critical_keys = keys_by_severity['critical']
+        high_keys = keys_by_severity['high']
+        medium_keys = keys_by_severity['medium']
         
-        for key in high_keys[:3]:  # Show first 3 high priority
-            self.fix_instructions.extend([
-                f"• User: {key['user_name']} | Key: {key['access_key_id'][:8]}*** | Age: {key['age_days']} days",
-                f"  Action: {key['recommendation']}"
-            ])
-        
-        self.fix_instructions.extend([
-            "🔧 Access Key Rotation Process:",
-            "1. Create new access key for user",
-            "2. Update applications/services to use new key", 
-            "3. Test applications with new key",
-            "4. Deactivate old key (keep for rollback)",
-            "5. Monitor for errors for 24-48 hours",
-            "6. Delete old key once confirmed working",
-            "🔒 For Unused Keys:",
-            "1. Confirm key is truly unused",
-            "2. Deactivate key first (reversible)",
-            "3. Monitor for any service disruptions", 
-            "4. Delete key after confirmation period",
-            "⚠️ Impact: Applications using old keys will stop working after rotation"
-        ])
+        # The text is only formatted when fix_instructions is read
+        self._fix_context = (len(old_keys), critical_keys, high_keys, medium_keys)
+        self._fix_instructions = None
         
         # Can auto-fix only unused keys
-        unused_keys = [k for k in old_keys if k['last_used']['never_used']]
+        unused_keys = [k for k in old_keys if k.last_used.never_used]
         self.can_auto_fix = len(unused_keys) > 0
         self.fix_type = "deactivate_unused_keys" if unused_keys else "manual_rotation_required"
     
+    @property
+    def fix_instructions(self):
+        """Instructions for the keys found by the last check, built on first access (None before any findings)."""
+        if self._fix_instructions is None and self._fix_context is not None:
+            self._fix_instructions = list(self.iter_fix_instructions())
+        return self._fix_instructions
+    
+    def iter_fix_instructions(self):
+        """Yield the instruction lines for the keys found by the last check."""
+        if self._fix_context is None:
+            return
+        total, critical_keys, high_keys, medium_keys = self._fix_context
+        
+        yield f"🔑 Access Key Rotation Required"
+        yield f"Total Keys: {total} | Critical: {len(critical_keys)} | High: {len(high_keys)} | Medium: {len(medium_keys)}"
+        yield "🚨 Critical Keys (Immediate Action Required):"
+        for key in islice(critical_keys, 5):  # Show first 5 critical
+            yield from _format_critical_key(key)
+        if len(critical_keys) > 5:
+            yield f"  ... and {len(critical_keys) - 5} more critical keys"
+        yield "⚠️ High Priority Keys:"
+        for key in islice(high_keys, 3):  # Show first 3 high priority
+            yield from _format_high_key(key)
+        yield from _ROTATION_STEPS
+    
     def fix(self, client, auto_approve=False):
         """Fix access key rotation issues (limited to safe operations)."""
         try:
-            print(f"🔧 Attempting to fix access key rotation issues...")
+            logger.info("🔧 Attempting to fix access key rotation issues...")
             
             if not self.old_keys:
                 return {"success": False, "message": "No keys to process"}
             
             # Only auto-fix unused keys by deactivating them
-            unused_keys = [k for k in self.old_keys if k['last_used']['never_used'] and k['age_days'] > 30]
+            unused_keys = [k for k in self.old_keys if k.last_used.never_used and k.age_days > 30]
             
             if not unused_keys:
                 return {
@@ -249,30 +436,38 @@ class AccessKeyRotationRule:
                     "action_required": "Approve deactivation of unused keys"
                 }
             
-            # Deactivate unused keys (safe operation)
+            # Deactivate unused keys (safe operation); the updates are independent, so they run concurrently
             deactivated_keys = []
             errors = []
             
-            for key in unused_keys:
-                try:
-                    client.update_access_key(
-                        UserName=key['user_name'],
-                        AccessKeyId=key['access_key_id'],  # Use actual key ID
+            with ThreadPoolExecutor(max_workers=_DEACTIVATE_WORKERS) as pool:
+                updates = [
+                    pool.submit(
+                        client.update_access_key,
+                        UserName=key.user_name,
+                        AccessKeyId=key.access_key_id,  # Use actual key ID
                         Status='Inactive'
                     )
+                    for key in unused_keys
+                ]
+            
+            # Report in key order
+            for key, update in zip(unused_keys, updates):
+                try:
+                    update.result()
                     
                     deactivated_keys.append({
-                        'user': key['user_name'],
-                        'key_id': key['access_key_id'][:8] + '***',
-                        'age_days': key['age_days']
+                        'user': key.user_name,
+                        'key_id': f"{key.access_key_id[:8]}***",
+                        'age_days': key.age_days
                     })
                     
-                    print(f"✅ Deactivated unused key for user {key['user_name']}")
+                    logger.info("✅ Deactivated unused key for user %s", key.user_name)
                     
                 except ClientError as e:
-                    error_msg = f"Failed to deactivate key for {key['user_name']}: {e}"
+                    error_msg = f"Failed to deactivate key for {key.user_name}: {e}"
                     errors.append(error_msg)
-                    print(f"❌ {error_msg}")
+                    logger.error("❌ %s", error_msg)
             
             remaining_keys = len(self.old_keys) - len(deactivated_keys)
             
@@ -305,7 +500,7 @@ class AccessKeyRotationRule:
         """Check a specific access key for rotation needs."""
         try:
             # Get key metadata
-            access_keys = client.list_access_keys(UserName=user_name)
+            access_keys = client.list_access_keys(UserName=user_name, MaxItems=_MAX_KEYS_PER_USER)
             key_found = None
             
             for key_metadata in access_keys.get('AccessKeyMetadata', []):
@@ -316,12 +511,11 @@ class AccessKeyRotationRule:
             if not key_found:
                 return {"error": f"Access key {access_key_id} not found for user {user_name}"}
             
-            creation_date = key_found['CreateDate']
-            if hasattr(creation_date, 'replace'):
-                creation_date = creation_date.replace(tzinfo=None)
+            creation_date = key_found['CreateDate'].replace(tzinfo=None)
             
-            key_age_days = (datetime.utcnow() - creation_date).days
-            last_used_info = self._get_key_last_used(client, access_key_id)
+            now_utc = datetime.utcnow()
+            key_age_days = (now_utc - creation_date).days
+            last_used_info = self._get_key_last_used(client, access_key_id, now_utc)
             severity = self._determine_key_severity(key_age_days, last_used_info, key_found['Status'])
             
             return {
@@ -329,7 +523,7 @@ class AccessKeyRotationRule:
                 'user_name': user_name,
                 'age_days': key_age_days,
                 'status': key_found['Status'],
-                'last_used': last_used_info,
+                'last_used': last_used_info.to_json(),
                 'needs_rotation': severity is not None,
                 'severity': severity,
                 'recommendation': self._get_key_recommendation(key_age_days, last_used_info, key_found['Status'])
@@ -1,8 +1,135 @@
 # agents/iam_agent/rules/inactive_user_rule.py
 
+"""
+Inactive IAM user detection and remediation.
+check() fans out many IAM calls on the client it is given; callers should pass a client
+built with tcp_keepalive, a connection pool of at least _USER_CHECK_WORKERS and adaptive
+retries, as IAMAgent's clients are.
+"""
+
 import boto3
 from botocore.exceptions import ClientError
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import threading
+import time
+
+from cachetools import TLRUCache
+
+from agents.iam_agent._iam_cache import account_id, get_credential_report, report_date
+
+
+# Users whose activity is checked concurrently in an account-wide check
+_USER_CHECK_WORKERS = 16
+
+# list_users page size; small pages let workers start while later pages load
+_LIST_USERS_PAGE_SIZE = 100
+
+# Concurrent get_access_key_last_used lookups, shared by all users being checked
+_LAST_USED_WORKERS = 8
+
+# One pool for every rule instance; agents create rules per worker thread
+_last_used_pool = ThreadPoolExecutor(_LAST_USED_WORKERS, thread_name_prefix="iam-user-key-last-used")
+
+# Per-user activity results shared by every rule instance, for activity_cache_ttl seconds;
+# each entry expires after the TTL of the rule that stored it
+_ACTIVITY_CACHE_SIZE = 4096
+_ACTIVITY_CACHE_TTL = 600
+
+# Entries are (stored_at, ttl, user_info) keyed by (account, user name, threshold)
+_activity_cache = TLRUCache(maxsize=_ACTIVITY_CACHE_SIZE, ttu=lambda _key, entry, now: now + entry[1])
+_activity_cache_lock = threading.Lock()
+
+# Credential report columns for a user's two access key slots
+_REPORT_KEY_SLOTS = ('access_key_1', 'access_key_2')
+
+
+def _days_since(now_utc, moment):
+    """Whole days from moment (aware or naive UTC) to now_utc (naive UTC)."""
+    return (now_utc - moment.replace(tzinfo=None)).days
+
+
+def _new_activity_info(user_name, user_created, user_age_days):
+    """Activity record for a user before any activity has been looked up."""
+    return {
+        'user_name': user_name,
+        'creation_date': user_created.isoformat(),
+        'user_age_days': user_age_days,
+        'console_last_login': None,
+        'access_key_last_used': None,
+        'days_since_console_login': None,
+        'days_since_key_usage': None,
+        'has_console_access': False,
+        'active_access_keys': 0,
+        'total_access_keys': 0,
+        'attached_policies': 0,
+        'inline_policies': 0,
+        'group_memberships': 0,
+        'is_inactive': False,
+        'inactivity_reason': [],
+        'severity': 'low'
+    }
+
+
+def _report_console_activity(report_row, now_utc):
+    """Console activity from a credential report row; 'unknown' when the password was never used."""
+    has_console_access = report_row.get('password_enabled') == 'true'
+    last_login = report_date(report_row.get('password_last_used')) if has_console_access else None
+    return {
+        'has_console_access': has_console_access,
+        'console_last_login': last_login.isoformat() if last_login else ('unknown' if has_console_access else None),
+        'days_since_console_login': _days_since(now_utc, last_login) if last_login else None
+    }
+
+
+def _report_key_activity(report_row, now_utc):
+    """
+    Access key activity from a credential report row.
+    
+    The report has no key ids, so key_details are labelled with their
+    access_key_1/2 slot; a slot is in use when it has a rotation date.
+    """
+    key_info = {
+        'access_key_last_used': None,
+        'days_since_key_usage': None,
+        'active_access_keys': 0,
+        'total_access_keys': 0,
+        'key_details': []
+    }
+    most_recent_usage = None
+    
+    for slot in _REPORT_KEY_SLOTS:
+        created = report_date(report_row.get(f'{slot}_last_rotated'))
+        if created is None:
+            continue
+        
+        key_status = 'Active' if report_row.get(f'{slot}_active') == 'true' else 'Inactive'
+        key_info['total_access_keys'] += 1
+        if key_status == 'Active':
+            key_info['active_access_keys'] += 1
+        
+        last_used_date = report_date(report_row.get(f'{slot}_last_used_date'))
+        key_detail = {
+            'key_id': slot,
+            'status': key_status,
+            'age_days': _days_since(now_utc, created),
+            'last_used_date': last_used_date.isoformat() if last_used_date else None,
+            'last_used_service': report_row.get(f'{slot}_last_used_service', 'Unknown'),
+            'never_used': last_used_date is None
+        }
+        if last_used_date:
+            key_detail['days_since_last_use'] = _days_since(now_utc, last_used_date)
+            if not most_recent_usage or last_used_date > most_recent_usage:
+                most_recent_usage = last_used_date
+        
+        key_info['key_details'].append(key_detail)
+    
+    if most_recent_usage:
+        key_info['access_key_last_used'] = most_recent_usage.isoformat()
+        key_info['days_since_key_usage'] = _days_since(now_utc, most_recent_usage)
+    
+    return key_info
 
 
 class InactiveUserRule:
@@ -14,35 +141,54 @@ class InactiveUserRule:
     id = "iam_inactive_user"
     detection = "IAM user has been inactive for extended period"
     auto_safe = True  # Can safely disable inactive users
+    applies_to = frozenset({"user"})  # Only users log in
     
-    def __init__(self):
+    def __init__(self, activity_cache_ttl=_ACTIVITY_CACHE_TTL):
         self.fix_instructions = None
         self.can_auto_fix = True
         self.fix_type = None
         self.inactive_users = None
         self.inactive_threshold_days = 90
         self.warning_threshold_days = 60
+        # 0 makes every check a one-shot scan that neither reads nor stores cached activity
+        self.activity_cache_ttl = activity_cache_ttl
     
     def check(self, client, user_name=None, inactive_days_threshold=90):
         """Check for inactive users."""
         self.inactive_threshold_days = inactive_days_threshold
         self.warning_threshold_days = inactive_days_threshold - 30
         
+        # One reference time (naive UTC) for every age in this check
+        now_utc = datetime.utcnow()
+        
         try:
             inactive_users = []
             
             if user_name:
                 # Check specific user
-                user_info = self._check_user_activity(client, user_name)
+                user_info = self._cached_activity(
+                    client, user_name,
+                    lambda: self._check_user_activity(client, client.get_user(UserName=user_name)['User'], now_utc)
+                )
                 if user_info and user_info['is_inactive']:
                     inactive_users.append(user_info)
             else:
-                # Check all users in account
-                users = client.list_users()
-                for user in users.get('Users', [])[:100]:  # Limit to first 100 users
-                    user_info = self._check_user_activity(client, user['UserName'])
-                    if user_info and user_info['is_inactive']:
-                        inactive_users.append(user_info)
+                # Check all users in account; the credential report covers every user in one call
+                report = get_credential_report(client)
+                if report is not None:
+                    inactive_users = self._check_via_credential_report(client, report, now_utc)
+                else:
+                    # Without a report each user is looked up; the calls are I/O bound, so users are checked concurrently
+                    pages = client.get_paginator('list_users').paginate(PaginationConfig={'PageSize': _LIST_USERS_PAGE_SIZE})
+                    users = (user for page in pages for user in page.get('Users', []))
+                    with ThreadPoolExecutor(max_workers=_USER_CHECK_WORKERS) as pool:
+                        check_user = lambda user: self._cached_activity(
+                            client, user['UserName'], lambda: self._check_user_activity(client, user, now_utc)
+                        )
+                        # map submits users as each page arrives and keeps results in list_users order
+                        for user_info in pool.map(check_user, users):
+                            if user_info and user_info['is_inactive']:
+                                inactive_users.append(user_info)
             
             if inactive_users:
                 self.inactive_users = inactive_users
@@ -57,45 +203,56 @@ class InactiveUserRule:
             print(f"❌ Error checking inactive users: {e}")
             return False
     
-    def _check_user_activity(self, client, user_name):
-        """Check activity for a specific user."""
+    def _cached_activity(self, client, user_name, check_user):
+        """
+        Return check_user() for a user, reusing a result cached in the last activity_cache_ttl seconds.
+        
+        Cached results are shared between rule instances; treat them as read-only.
+        Exceptions from check_user are not cached, so the next check retries the user.
+        """
+        if not self.activity_cache_ttl:
+            return check_user()
+        
+        key = (account_id(client), user_name, self.inactive_threshold_days)
+        with _activity_cache_lock:
+            entry = _activity_cache.get(key)
+        
+        # An entry stored by a rule with a longer TTL may be too old for this one
+        if entry is not None and time.monotonic() - entry[0] < self.activity_cache_ttl:
+            return entry[2]
+        
+        user_info = check_user()
+        with _activity_cache_lock:
+            _activity_cache[key] = (time.monotonic(), self.activity_cache_ttl, user_info)
+        return user_info
+    
+    def _check_user_activity(self, client, user, now_utc=None):
+        """
+        Check activity for a user, measured from now_utc (naive UTC, default now).
+        
+        user is an entry from list_users or get_user; its CreateDate lets very
+        new users be skipped before any API call.
+        """
+        now_utc = now_utc or datetime.utcnow()
+        user_name = user['UserName']
+        
+        # boto3 returns UTC datetimes; compare them as naive UTC
+        user_created = user['CreateDate'].replace(tzinfo=None)
+        user_age_days = _days_since(now_utc, user_created)
+        
+        # Skip very new users
+        if user_age_days < 7:
+            return None
+        
         try:
-            # Get user creation date
-            user_info = client.get_user(UserName=user_name)
-            user_created = user_info['User']['CreateDate']
-            if hasattr(user_created, 'replace'):
-                user_created = user_created.replace(tzinfo=None)
-            
-            user_age_days = (datetime.utcnow() - user_created).days
-            
-            # Skip very new users
-            if user_age_days < 7:
-                return None
-            
-            activity_info = {
-                'user_name': user_name,
-                'creation_date': user_created.isoformat(),
-                'user_age_days': user_age_days,
-                'console_last_login': None,
-                'access_key_last_used': None,
-                'days_since_console_login': None,
-                'days_since_key_usage': None,
-                'has_console_access': False,
-                'active_access_keys': 0,
-                'total_access_keys': 0,
-                'attached_policies': 0,
-                'group_memberships': 0,
-                'is_inactive': False,
-                'inactivity_reason': [],
-                'severity': 'low'
-            }
+            activity_info = _new_activity_info(user_name, user_created, user_age_days)
             
             # Check console activity
-            console_activity = self._get_console_activity(client, user_name)
+            console_activity = self._get_console_activity(client, user, now_utc)
             activity_info.update(console_activity)
             
             # Check access key activity
-            key_activity = self._get_access_key_activity(client, user_name)
+            key_activity = self._get_access_key_activity(client, user_name, now_utc)
             activity_info.update(key_activity)
             
             # Check user permissions and associations
@@ -112,8 +269,52 @@ class InactiveUserRule:
             print(f"⚠️ Error checking activity for user {user_name}: {e}")
             return None
     
-    def _get_console_activity(self, client, user_name):
-        """Get console login activity."""
+    def _check_via_credential_report(self, client, report, now_utc):
+        """Check every user in the credential report; returns the inactive users in report order."""
+        with ThreadPoolExecutor(max_workers=_USER_CHECK_WORKERS) as pool:
+            check_user = lambda item: self._cached_activity(
+                client, item[0], lambda: self._check_report_row(client, *item, now_utc)
+            )
+            return [user_info for user_info in pool.map(check_user, report.items()) if user_info]
+    
+    def _check_report_row(self, client, user_name, report_row, now_utc):
+        """Check activity for a user from its credential report row; permissions are fetched only when needed."""
+        try:
+            user_created = report_date(report_row.get('user_creation_time'))
+            if user_created is None:
+                return None
+            
+            user_age_days = _days_since(now_utc, user_created)
+            
+            # Skip very new users
+            if user_age_days < 7:
+                return None
+            
+            activity_info = _new_activity_info(user_name, user_created, user_age_days)
+            activity_info.update(_report_console_activity(report_row, now_utc))
+            activity_info.update(_report_key_activity(report_row, now_utc))
+            
+            # Permissions only affect the verdict for users with no console access and no active keys
+            if activity_info['has_console_access'] or activity_info['active_access_keys'] > 0:
+                inactivity_analysis = self._analyze_inactivity(activity_info)
+                if not inactivity_analysis['is_inactive']:
+                    return None
+            
+            permissions_info = self._get_user_permissions_info(client, user_name)
+            activity_info.update(permissions_info)
+            
+            inactivity_analysis = self._analyze_inactivity(activity_info)
+            activity_info.update(inactivity_analysis)
+            
+            return activity_info if activity_info['is_inactive'] else None
+            
+        except ClientError as e:
+            print(f"⚠️ Error checking activity for user {user_name}: {e}")
+            return None
+    
+    def _get_console_activity(self, client, user, now_utc):
+        """Get console login activity; the login date is the user's PasswordLastUsed when listed."""
+        user_name = user['UserName']
         console_info = {
             'has_console_access': False,
             'console_last_login': None,
@@ -125,10 +326,14 @@ class InactiveUserRule:
             login_profile = client.get_login_profile(UserName=user_name)
             console_info['has_console_access'] = True
             
-            # Try to get password last used (not always available in basic IAM)
-            # This would require CloudTrail or other logging services
-            # For now, we'll mark as unknown
-            console_info['console_last_login'] = 'unknown'
+            # PasswordLastUsed is omitted when the password has never been used
+            # (or not since IAM began tracking it), so the login is unknown
+            last_login = user.get('PasswordLastUsed')
+            if last_login:
+                console_info['console_last_login'] = last_login.replace(tzinfo=None).isoformat()
+                console_info['days_since_console_login'] = _days_since(now_utc, last_login)
+            else:
+                console_info['console_last_login'] = 'unknown'
             
         except ClientError as e:
             if e.response['Error']['Code'] != 'NoSuchEntity':
@@ -136,8 +341,8 @@ class InactiveUserRule:
         
         return console_info
     
-    def _get_access_key_activity(self, client, user_name):
-        """Get access key usage activity."""
+    def _get_access_key_activity(self, client, user_name, now_utc):
+        """Get access key usage activity, measured from now_utc (naive UTC)."""
         key_info = {
             'access_key_last_used': None,
             'days_since_key_usage': None,
@@ -148,62 +353,72 @@ class InactiveUserRule:
         
         try:
             access_keys = client.list_access_keys(UserName=user_name)
-            key_info['total_access_keys'] = len(access_keys.get('AccessKeyMetadata', []))
+            key_metadata_list = access_keys.get('AccessKeyMetadata', [])
+            key_info['total_access_keys'] = len(key_metadata_list)
+            
+            # Look up last use of every key at once
+            last_used = _last_used_pool.map(
+                lambda key_metadata: self._get_key_last_used(client, key_metadata['AccessKeyId']),
+                key_metadata_list
+            )
             
             most_recent_usage = None
             
-            for key_metadata in access_keys.get('AccessKeyMetadata', []):
+            for key_metadata, (last_used_data, error) in zip(key_metadata_list, last_used):
                 access_key_id = key_metadata['AccessKeyId']
                 key_status = key_metadata['Status']
-                key_age = (datetime.utcnow() - key_metadata['CreateDate'].replace(tzinfo=None)).days
+                key_age = _days_since(now_utc, key_metadata['CreateDate'])
                 
                 if key_status == 'Active':
                     key_info['active_access_keys'] += 1
                 
-                # Get last used info
-                try:
-                    last_used_response = client.get_access_key_last_used(AccessKeyId=access_key_id)
-                    last_used_data = last_used_response.get('AccessKeyLastUsed', {})
-                    last_used_date = last_used_data.get('LastUsedDate')
-                    
-                    key_detail = {
-                        'key_id': access_key_id[:8] + '***',
-                        'status': key_status,
-                        'age_days': key_age,
-                        'last_used_date': last_used_date.isoformat() if last_used_date else None,
-                        'last_used_service': last_used_data.get('ServiceName', 'Unknown'),
-                        'never_used': last_used_date is None
-                    }
-                    
-                    if last_used_date:
-                        if hasattr(last_used_date, 'replace'):
-                            last_used_date = last_used_date.replace(tzinfo=None)
-                        
-                        key_detail['days_since_last_use'] = (datetime.utcnow() - last_used_date).days
-                        
-                        # Track most recent usage across all keys
-                        if not most_recent_usage or last_used_date > most_recent_usage:
-                            most_recent_usage = last_used_date
-                    
-                    key_info['key_details'].append(key_detail)
-                    
-                except ClientError as e:
+                if error is not None:
                     key_info['key_details'].append({
                         'key_id': access_key_id[:8] + '***',
                         'status': key_status,
                         'age_days': key_age,
-                        'error': str(e)
+                        'error': str(error)
                     })
+                    continue
+                
+                last_used_date = last_used_data.get('LastUsedDate')
+                
+                key_detail = {
+                    'key_id': access_key_id[:8] + '***',
+                    'status': key_status,
+                    'age_days': key_age,
+                    'last_used_date': last_used_date.isoformat() if last_used_date else None,
+                    'last_used_service': last_used_data.get('ServiceName', 'Unknown'),
+                    'never_used': last_used_date is None
+                }
+                
+                if last_used_date:
+                    last_used_date = last_used_date.replace(tzinfo=None)
+                    key_detail['days_since_last_use'] = _days_since(now_utc, last_used_date)
+                    
+                    # Track most recent usage across all keys
+                    if not most_recent_usage or last_used_date > most_recent_usage:
+                        most_recent_usage = last_used_date
+                
+                key_info['key_details'].append(key_detail)
             
             if most_recent_usage:
                 key_info['access_key_last_used'] = most_recent_usage.isoformat()
-                key_info['days_since_key_usage'] = (datetime.utcnow() - most_recent_usage).days
+                key_info['days_since_key_usage'] = _days_since(now_utc, most_recent_usage)
             
         except ClientError as e:
             print(f"⚠️ Error checking access keys for {user_name}: {e}")
         
         return key_info
     
+    def _get_key_last_used(self, client, access_key_id):
+        """Return (AccessKeyLastUsed data, None), or (None, error) if the lookup failed."""
+        try:
+            response = client.get_access_key_last_used(AccessKeyId=access_key_id)
+            return response.get('AccessKeyLastUsed', {}), None
+        except ClientError as e:
+            return None, e
+    
     def _get_user_permissions_info(self, client, user_name):
         """Get user permissions and group information."""
         permissions_info = {
@@ -243,11 +458,16 @@ class InactiveUserRule:
         user_age = activity_info['user_age_days']
         
         # Check console inactivity
+        days_since_login = activity_info['days_since_console_login']
         if activity_info['has_console_access']:
             if activity_info['console_last_login'] == 'unknown':
                 if user_age > self.inactive_threshold_days:
                     inactivity_reasons.append(f"Console access enabled but no recent login data (user age: {user_age} days)")
-            # If we had actual login dates, we'd check them here
+            elif days_since_login is not None and days_since_login > self.inactive_threshold_days:
+                # Login dates come from the credential report
+                inactivity_reasons.append(f"Console not used for {days_since_login} days")
+                is_inactive = True
+                severity = 'medium'
         
         # Check access key inactivity
         if activity_info['days_since_key_usage']:
@@ -278,8 +498,8 @@ class InactiveUserRule:
             inactivity_reasons.append("Has permissions but no way to use them (no console access or active keys)")
             is_inactive = True
         
-        # Special case: Very old users with no recent activity
-        if user_age > self.inactive_threshold_days * 2:  # 180 days default
+        # Special case: Very old users with no recent activity (a known recent login is clear activity)
+        if user_age > self.inactive_threshold_days * 2 and days_since_login is None:  # 180 days default
             if not inactivity_reasons:  # No specific reasons found, but very old
                 inactivity_reasons.append(f"Very old user ({user_age} days) with unclear activity status")
                 is_inactive = True
@@ -294,9 +514,13 @@ class InactiveUserRule:
     
     def _set_fix_instructions(self, inactive_users):
         """Set instructions for handling inactive users."""
-        critical_users = [u for u in inactive_users if u['severity'] == 'high']
-        medium_users = [u for u in inactive_users if u['severity'] == 'medium']
-        low_users = [u for u in inactive_users if u['severity'] == 'low']
+        # Bucket users by severity in one pass
+        users_by_severity = defaultdict(list)
+        for user in inactive_users:
+            users_by_severity[user['severity']].append(user)
+        critical_users = users_by_severity['high']
+        medium_users = users_by_severity['medium']
+        low_users = users_by_severity['low']
         
         self.fix_instructions = [
             f"👤 Inactive User Management",
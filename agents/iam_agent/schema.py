@@ -0,0 +1,62 @@
+# agents/iam_agent/schema.py
+
+"""
+Typed finding record for the IAM agent.
+Executor methods accept either a Finding or the equivalent dict.
+"""
+
+from dataclasses import dataclass, fields
+from typing import Any, Optional
+
+
+@dataclass(slots=True)
+class Finding:
+    """A single IAM finding; field names match the dict schema from format_for_fixer."""
+    service: str = "iam"
+    resource: str = ""
+    resource_type: str = "user"
+    issue: str = ""
+    fix: Optional[dict] = None
+    auto_safe: bool = False
+    note: Any = None
+    rule_id: str = ""
+    intent: Optional[str] = None
+    intent_confidence: Optional[float] = None
+    intent_reasoning: Optional[str] = None
+    fix_instructions: Optional[list] = None
+    can_auto_fix: Optional[bool] = None
+    fix_type: Optional[str] = None
+    source: Optional[str] = None
+    tier: Optional[int] = None
+    severity: Optional[str] = None
+    description: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Finding from a finding dict, ignoring keys outside the schema."""
+        return cls(**{name: data[name] for name in FINDING_FIELDS if name in data})
+
+    def to_dict(self):
+        """Return the finding as a plain dict in schema order."""
+        return {name: getattr(self, name) for name in FINDING_FIELDS}
+
+
+FINDING_FIELDS = tuple(field.name for field in fields(Finding))
+
+# Fields validate_findings requires, one bit each in this order
+REQUIRED_FIELDS = ("service", "resource", "issue", "rule_id")
+REQUIRED_MASK = (1 << len(REQUIRED_FIELDS)) - 1
+
+# Missing-field bitmask -> names of the missing required fields
+MISSING_FIELDS = tuple(
+    tuple(name for bit, name in enumerate(REQUIRED_FIELDS) if missing & (1 << bit))
+    for missing in range(REQUIRED_MASK + 1)
+)
+
+
+def required_mask(finding):
+    """Bitmask of the required fields that are set (not None) on a Finding."""
+    return ((finding.service is not None)
+            | (finding.resource is not None) << 1
+            | (finding.issue is not None) << 2
+            | (finding.rule_id is not None) << 3)
@@ -0,0 +1,25 @@
+"""
+JSON helpers shared by the detection tiers.
+Uses orjson when it is installed and falls back to the standard json module.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional speedup
+    orjson = None
+
+
+def dumps_config(configuration, indent: bool = False) -> str:
+    """
+    Serialize a resource configuration to a JSON string.
+    
+    Values JSON cannot represent (e.g. boto3 datetimes) are written as strings.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(configuration, default=str, option=option).decode()
+    return json.dumps(configuration, indent=2 if indent else None, default=str)
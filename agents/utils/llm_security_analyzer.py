@@ -5,8 +5,11 @@ This is Tier 3 of the detection pipeline (fallback when rules and RAG don't find
 
 import os
 import json
+import asyncio
 import google.generativeai as genai
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+from agents.utils.json_utils import dumps_config
 
 
 class LLMSecurityAnalyzer:
@@ -92,6 +95,39 @@ class LLMSecurityAnalyzer:
             print(f"[LLM] Security analysis failed: {e}")
             return []
     
+    def analyze_security_issues_batch(
+        self,
+        service: str,
+        items: List[Tuple[str, Dict, str]],
+        user_context: str = "",
+        max_concurrency: int = 8
+    ) -> List[List[Dict]]:
+        """
+        Analyze several resources with concurrent Gemini requests
+        
+        Args:
+            service: AWS service (s3, lambda, ec2, iam)
+            items: (resource_name, configuration, intent) tuples, one per resource
+            user_context: Optional user query for context, shared by all resources
+            max_concurrency: Maximum Gemini requests in flight, to respect API quotas
+            
+        Returns:
+            One list of finding dicts per item, in input order
+        """
+        return asyncio.run(self._analyze_batch_async(service, list(items), user_context, max_concurrency))
+    
+    async def _analyze_batch_async(self, service, items, user_context, max_concurrency):
+        """Gather one threaded analyze_security_issues call per item, bounded by a semaphore"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def analyze(resource_name, configuration, intent):
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self.analyze_security_issues, service, resource_name, configuration, intent, user_context
+                )
+        
+        return await asyncio.gather(*(analyze(*item) for item in items))
+    
     def _build_security_prompt(
         self,
         service: str,
@@ -103,7 +139,7 @@ class LLMSecurityAnalyzer:
         """Build the prompt for Gemini API"""
         
         # Sanitize configuration for JSON serialization
-        config_str = json.dumps(configuration, indent=2, default=str)
+        config_str = dumps_config(configuration, indent=True)
         
         prompt = f"""You are an AWS security expert analyzing cloud resources for vulnerabilities.
 
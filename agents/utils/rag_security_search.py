@@ -10,6 +10,8 @@ from typing import List, Dict, Tuple
 from pathlib import Path
 import numpy as np
 
+from agents.utils.json_utils import dumps_config
+
 
 class RAGSecuritySearch:
     """RAG-based security documentation search using simple TF-IDF similarity"""
@@ -31,6 +33,7 @@ class RAGSecuritySearch:
         self.documents = {}
         self.vocabulary = set()
         self.idf = {}
+        self._doc_vectors = {}  # service -> [(doc_id, doc, tf_idf)], built on first search
         
         # Load knowledge base
         self._load_knowledge_base()
@@ -193,15 +196,64 @@ class RAGSecuritySearch:
         Returns:
             List of finding dicts with relevant documentation
         """
+        return self.search_security_issues_batch(service, [(configuration, intent)], top_k)[0]
+    
+    def search_security_issues_batch(
+        self,
+        service: str,
+        items: List[Tuple[Dict, str]],
+        top_k: int = 5
+    ) -> List[List[Dict]]:
+        """
+        Search security knowledge base for several resources in one call
+        
+        Document TF-IDF vectors come from _service_doc_vectors instead of being rebuilt per query.
+        
+        Args:
+            service: AWS service (s3, lambda, ec2, iam)
+            items: (configuration, intent) pairs, one per resource
+            top_k: Number of similar documents to return per resource
+            
+        Returns:
+            One list of finding dicts per item, in input order
+        """
         if not self.enabled:
             print(f"[RAG] Search skipped - RAG not enabled")
-            return []
+            return [[] for _ in items]
         
+        doc_vectors = self._service_doc_vectors(service)
+        return [
+            self._rank_documents(service, configuration, intent, doc_vectors, top_k)
+            for configuration, intent in items
+        ]
+    
+    def _service_doc_vectors(self, service: str) -> List[Tuple[str, Dict, Dict[str, float]]]:
+        """TF-IDF vectors of one service's documents, computed on first use"""
+        doc_vectors = self._doc_vectors.get(service)
+        if doc_vectors is None:
+            # Only search documents for this service
+            doc_vectors = [
+                (doc_id, doc, self._compute_tf_idf(doc['content']))
+                for doc_id, doc in self.documents.items()
+                if doc['service'] == service
+            ]
+            self._doc_vectors[service] = doc_vectors
+        return doc_vectors
+    
+    def _rank_documents(
+        self,
+        service: str,
+        configuration: Dict,
+        intent: str,
+        doc_vectors: List[Tuple[str, Dict, Dict[str, float]]],
+        top_k: int
+    ) -> List[Dict]:
+        """Rank precomputed document vectors against one resource configuration"""
         # Build search query from configuration and intent
         query_parts = [
             f"service: {service}",
             f"intent: {intent}",
-            f"configuration: {json.dumps(configuration)}"
+            f"configuration: {dumps_config(configuration)}"
         ]
         query = " ".join(query_parts)
         
@@ -210,14 +262,7 @@ class RAGSecuritySearch:
         
         # Find similar documents
         similarities = []
-        for doc_id, doc in self.documents.items():
-            # Only search documents for this service
-            if doc['service'] != service:
-                continue
-            
-            # Compute document TF-IDF
-            doc_vec = self._compute_tf_idf(doc['content'])
-            
+        for doc_id, doc, doc_vec in doc_vectors:
             # Compute similarity
             similarity = self._cosine_similarity(query_vec, doc_vec)
             